@@ -80,6 +80,14 @@ class Config:
     OPENROUTER_VLM_MODEL = os.getenv("OPENROUTER_VLM_MODEL", "google/gemini-2.5-flash")
     OPENROUTER_IMAGE_MODEL = os.getenv("OPENROUTER_IMAGE_MODEL", "black-forest-labs/flux-2-pro")
 
+    # HTTP Connection Pooling (shared keep-alive clients for all providers)
+    HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("QUPLED_HTTP_MAX_PER_HOST", "16"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("QUPLED_HTTP_KEEPALIVE", "30"))
+    HTTP2_ENABLED = os.getenv("QUPLED_HTTP2", "false").lower() == "true"
+
+    # Batch generation (LLMManager.generate_many)
+    LLM_MAX_CONCURRENCY = int(os.getenv("QUPLED_LLM_MAX_CONCURRENCY", "8"))
+
     # Processing Settings
     PDF_MAX_SIZE_MB = 50
     IMAGE_MAX_SIZE_MB = 10
@@ -94,6 +102,45 @@ class Config:
     # Cache Settings
     CACHE_ENABLED = True
     CACHE_TTL = 3600  # seconds
+    LLM_CACHE_PATH = CACHE_PATH / "llm_cache.db"
+    LLM_CACHE_MAX_BYTES = int(os.getenv("QUPLED_LLM_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    LLM_MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("QUPLED_LLM_MEMORY_CACHE_MAX_ENTRIES", "2048"))
+    LLM_MEMORY_CACHE_MAX_BYTES = int(
+        os.getenv("QUPLED_LLM_MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+
+    # Embedding backend (core/embedding_backends.py):
+    # openrouter | ollama | sentence-transformers | hashing (offline, deterministic)
+    EMBEDDING_BACKEND = os.getenv("QUPLED_EMBEDDING_BACKEND", "openrouter")
+    HASHING_EMBEDDING_DIM = int(os.getenv("QUPLED_HASHING_EMBEDDING_DIM", "512"))
+    # Keep only the first N embedding dimensions (Matryoshka truncation, e.g. 512 or 1024;
+    # 0 = full backend dimension). See scripts/evaluate_embedding_dims.py for the trade-off.
+    EMBEDDING_DIMENSIONS = int(os.getenv("QUPLED_EMBEDDING_DIMENSIONS", "0"))
+
+    # Embedding store (core/features.py): float32 vectors on disk + in-memory LRU
+    # (one subdirectory per backend namespace and dimension)
+    EMBEDDING_STORE_PATH = CACHE_PATH / "embeddings"
+    EMBEDDING_MEMORY_CACHE_SIZE = int(os.getenv("QUPLED_EMBEDDING_MEMORY_CACHE_SIZE", "2048"))
+    # Concurrent compute_embedding misses are sent together (up to N texts / wait ms)
+    EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("QUPLED_EMBEDDING_BATCH_MAX_SIZE", "64"))
+    EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("QUPLED_EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+
+    # Merger: max groups compared per new item (top-k by embedding; 0 = all)
+    MERGER_MAX_CANDIDATES = int(os.getenv("QUPLED_MERGER_MAX_CANDIDATES", "20"))
+
+    # Merger: new items classified per reasoner prompt when no active classifier
+    # is used (1 = one prompt per item, identical to sequential classification)
+    MERGER_CLASSIFY_BATCH_SIZE = int(os.getenv("QUPLED_MERGER_CLASSIFY_BATCH_SIZE", "1"))
+
+    # Active learning committee snapshots (core/model_snapshots.py): a saved
+    # committee is reused until this many training records were added since
+    ACTIVE_LEARNING_MODEL_PATH = CACHE_PATH / "active_learning"
+    ACTIVE_LEARNING_RETRAIN_THRESHOLD = int(os.getenv("QUPLED_AL_RETRAIN_THRESHOLD", "50"))
+    # Background retrain (ActiveClassifier.start_background_retrain): also retrain
+    # pending records older than this many seconds
+    ACTIVE_LEARNING_RETRAIN_MAX_STALENESS = float(
+        os.getenv("QUPLED_AL_RETRAIN_MAX_STALENESS", "600")
+    )
 
     # Procedure Pattern Caching (Option 3 - Performance Optimization)
     PROCEDURE_CACHE_ENABLED = os.getenv("QUPLED_PROCEDURE_CACHE_ENABLED", "true").lower() == "true"
@@ -177,6 +224,10 @@ class Config:
     )
 
     # Rate Limiting Settings
+    # "local": per-process tracker; "shared": one SQLite-backed budget for all
+    # processes on this host (use with multiple workers)
+    RATE_LIMIT_BACKEND = os.getenv("QUPLED_RATE_LIMIT_BACKEND", "local").lower()
+    RATE_LIMIT_DB_PATH = CACHE_PATH / "rate_limits.db"
     PROVIDER_RATE_LIMITS = {
         "ollama": {"requests_per_minute": None, "tokens_per_minute": None, "burst_size": 1},
         "deepseek": {"requests_per_minute": None, "tokens_per_minute": None, "burst_size": 1},
@@ -4,19 +4,26 @@ Active learning classifier for knowledge item grouping.
 Learns from past LLM decisions to reduce future LLM calls by 70-90%.
 Uses Query by Committee (QBC) for uncertainty estimation with CatBoost.
 
-Training is designed to be triggered externally (e.g., via Celery background task)
-for non-blocking operation at scale.
+Training runs off the hot path: either triggered externally, or in-process by
+RetrainScheduler, with fitted committees swapped in atomically.
 """
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
 from threading import Lock
 
 import numpy as np
 from catboost import CatBoostClassifier
 
+from config import Config
+from core.fast_inference import CompiledCommittee
 from core.features import PairFeatures, should_add_to_training
+from core.model_snapshots import ModelSnapshotStore
+from core.retrain_scheduler import RetrainScheduler
 from core.transitive import TransitiveInference
 
 logger = logging.getLogger(__name__)
@@ -42,9 +49,20 @@ class CatBoostActiveLearner:
     Optimized for small datasets (< 1K samples) with 7 features.
     """
 
-    def __init__(self, n_estimators: int = 3):
+    def __init__(
+        self, n_estimators: int = 3, n_jobs: int | None = None, fast_inference: bool = True
+    ):
+        """
+        Args:
+            n_estimators: Number of committee members
+            n_jobs: Members fitted concurrently (default: min(n_estimators, CPU count))
+            fast_inference: Predict with the compiled NumPy trees instead of CatBoost
+        """
         self.n_estimators = n_estimators
+        self.n_jobs = n_jobs or min(n_estimators, os.cpu_count() or 1)
+        self.fast_inference = fast_inference
         self.committee: list = []
+        self._compiled: CompiledCommittee | None = None
         self.X_train: list[np.ndarray] = []
         self.y_train: list[int] = []
         self.is_fitted = False
@@ -61,7 +79,7 @@ class CatBoostActiveLearner:
             "border_count": 32,  # Fewer bins for 7 continuous features
             "verbose": False,
             "allow_writing_files": False,
-            "thread_count": 1,  # Thread safety - single thread per model
+            "thread_count": 1,  # One thread per model; members are fitted in parallel
             "loss_function": "Logloss",  # For well-calibrated probabilities
         }
 
@@ -75,18 +93,12 @@ class CatBoostActiveLearner:
         if len(unique_classes) < 2:
             return
 
-        self.committee = []
-        for i in range(self.n_estimators):
-            clf = CatBoostClassifier(
-                **self._catboost_params,
-                random_seed=i * 42,
-            )
-            clf.fit(X, y, verbose=False)
-            self.committee.append(clf)
+        self.committee = self._fit_members(self._catboost_params, X, y)
 
         self.X_train = list(X)
         self.y_train = list(y)
         self.is_fitted = True
+        self._compile()
 
     def fit_with_early_stopping(
         self, X: np.ndarray, y: np.ndarray, val_fraction: float = 0.2
@@ -147,33 +159,107 @@ class CatBoostActiveLearner:
             }
         )
 
-        self.committee = []
-        for i in range(self.n_estimators):
-            clf = CatBoostClassifier(
-                **early_stop_params,
-                random_seed=i * 42,
-            )
+        self.committee = self._fit_members(
+            early_stop_params,
+            X_train,
+            y_train,
+            eval_set=(X_val, y_val),
+            early_stopping_rounds=50,
+        )
 
-            # Fit with early stopping
-            clf.fit(
-                X_train,
-                y_train,
-                eval_set=(X_val, y_val),
-                early_stopping_rounds=50,
-                verbose=False,
-            )
+        self.X_train = list(X)
+        self.y_train = list(y)
+        self.is_fitted = True
+        self._compile()
+
+    def _fit_members(self, params: dict, X: np.ndarray, y: np.ndarray, **fit_kwargs) -> list:
+        """
+        Fit the committee members concurrently.
+
+        CatBoost releases the GIL while fitting, so a thread pool runs members
+        on separate cores. Each member keeps its seed (i * 42) and a single
+        training thread, so results do not depend on n_jobs.
+        """
+
+        def fit_member(i: int) -> CatBoostClassifier:
+            clf = CatBoostClassifier(**params, random_seed=i * 42)
+            clf.fit(X, y, verbose=False, **fit_kwargs)
+            return clf
+
+        if self.n_jobs <= 1 or self.n_estimators <= 1:
+            return [fit_member(i) for i in range(self.n_estimators)]
+        with ThreadPoolExecutor(max_workers=self.n_jobs, thread_name_prefix="catboost") as pool:
+            return list(pool.map(fit_member, range(self.n_estimators)))
+
+    def fresh(self) -> "CatBoostActiveLearner":
+        """Return an unfitted learner with the same configuration."""
+        learner = CatBoostActiveLearner(
+            n_estimators=self.n_estimators, n_jobs=self.n_jobs, fast_inference=self.fast_inference
+        )
+        learner._catboost_params = dict(self._catboost_params)
+        return learner
+
+    def params_fingerprint(self) -> dict:
+        """Hyperparameters that must match for a saved committee to be reused."""
+        return dict(self._catboost_params)
+
+    def save_models(self, directory: Path) -> list[str]:
+        """
+        Save committee members as CatBoost .cbm files.
+
+        Args:
+            directory: Existing directory to write into
 
-            self.committee.append(clf)
+        Returns:
+            File names of the saved members, in committee order
+        """
+        names = []
+        for i, clf in enumerate(self.committee):
+            name = f"member_{i}.cbm"
+            clf.save_model(str(directory / name), format="cbm")
+            names.append(name)
+        return names
+
+    def load_models(self, directory: Path, names: list[str], X: np.ndarray, y: np.ndarray) -> None:
+        """
+        Load committee members saved by save_models (no refit).
 
+        Args:
+            directory: Directory holding the .cbm files
+            names: Member file names, in committee order
+            X, y: Current training set (kept for incremental teach)
+        """
+        committee = []
+        for name in names:
+            clf = CatBoostClassifier()
+            clf.load_model(str(directory / name), format="cbm")
+            committee.append(clf)
+
+        self.committee = committee
         self.X_train = list(X)
         self.y_train = list(y)
         self.is_fitted = True
+        self._compile()
+
+    def _compile(self) -> None:
+        """Export the fitted committee for fast inference (falls back to CatBoost on failure)."""
+        self._compiled = None
+        if not self.fast_inference:
+            return
+        try:
+            self._compiled = CompiledCommittee.from_catboost(self.committee)
+        except Exception as e:
+            logger.warning(f"Fast inference unavailable, using CatBoost predict_proba: {e}")
 
     def predict_proba(self, X: np.ndarray) -> np.ndarray:
         """Get average probability from committee."""
         if not self.is_fitted:
             return np.full((len(X), 2), 0.5)
 
+        compiled = self._compiled
+        if compiled is not None:
+            return compiled.predict_proba(X)
+
         probas = np.array([clf.predict_proba(X) for clf in self.committee])
         return probas.mean(axis=0)
 
@@ -191,7 +277,11 @@ class CatBoostActiveLearner:
             return np.ones(len(X))
 
         # Get P(match) from each committee member
-        probas = np.array([clf.predict_proba(X)[:, 1] for clf in self.committee])
+        compiled = self._compiled
+        if compiled is not None:
+            probas = compiled.member_probas(X)
+        else:
+            probas = np.array([clf.predict_proba(X)[:, 1] for clf in self.committee])
 
         # Standard deviation across committee (max possible std is 0.5 for binary)
         std = probas.std(axis=0)
@@ -286,8 +376,8 @@ class ActiveClassifier:
     Transitive graph is per-session (item relationships).
 
     Uses CatBoost for the committee ensemble.
-    Training is designed to be triggered externally (e.g., via Celery background task)
-    for non-blocking operation at scale.
+    Training can run in a background thread (start_background_retrain): new
+    committees are fitted off the hot path and swapped in atomically.
     """
 
     high_confidence: float = 0.85  # Above this -> use prediction
@@ -299,27 +389,160 @@ class ActiveClassifier:
     )
     transitive: TransitiveInference = field(default_factory=TransitiveInference)
     stats: ActiveClassifierStats = field(default_factory=ActiveClassifierStats)
+    # Saved committees: reused at load time until retrain_threshold new records arrive
+    snapshots: ModelSnapshotStore | None = None
+    retrain_threshold: int = field(default_factory=lambda: Config.ACTIVE_LEARNING_RETRAIN_THRESHOLD)
     _training_records: list[TrainingRecord] = field(default_factory=list)
     _lock: Lock = field(default_factory=Lock)  # Thread safety for parallel processing
+    _swap_lock: Lock = field(default_factory=Lock)  # Serializes committee swaps
+    _fitted_records: int = 0  # Training records behind the published committee
+    _data_generation: int = 0  # Bumped whenever the training set is replaced
+    _fitted_generation: int = 0  # Data generation of the published committee
+    _retrainer: RetrainScheduler | None = None
 
     def load_training_data(self, records: list[dict]) -> None:
         """
         Load training data from database.
 
+        With a snapshot store, the saved committee is loaded instead of refit
+        when it was trained on these records (plus fewer than retrain_threshold
+        newer ones).
+
         Args:
             records: List of dicts with 'features' and 'label' keys
         """
-        self._training_records = [
+        training_records = [
             TrainingRecord(features=r["features"], label=r["label"]) for r in records
         ]
+        with self._lock:
+            # Fits of the previous training set can no longer be published
+            self._training_records = training_records
+            self._data_generation += 1
+            generation = self._data_generation
+            self.stats.training_samples = len(training_records)
+
+        if len(training_records) >= self.min_training_samples:
+            X = np.array([r.features for r in training_records])
+            y = np.array([r.label for r in training_records])
+            learner = self.learner.fresh()
+            snapshot_samples = (
+                self.snapshots.restore(learner, X, y, max_new_samples=self.retrain_threshold)
+                if self.snapshots
+                else None
+            )
+            if snapshot_samples is not None:
+                # Records newer than the snapshot still count towards pending_records
+                self._publish(learner, snapshot_samples, generation)
+                logger.info(f"ActiveClassifier loaded {len(X)} training samples (snapshot)")
+            else:
+                self.refit(X, y, generation=generation)
+                logger.info(f"ActiveClassifier loaded {len(X)} training samples")
 
-        if len(self._training_records) >= self.min_training_samples:
-            X = np.array([r.features for r in self._training_records])
-            y = np.array([r.label for r in self._training_records])
-            self.learner.fit(X, y)
-            logger.info(f"ActiveClassifier loaded {len(X)} training samples")
+    def refit(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        early_stopping: bool = False,
+        generation: int | None = None,
+    ) -> bool:
+        """
+        Fit a new committee, swap it in, and snapshot it (if a snapshot store is set).
+
+        The current committee keeps serving decide() until the new one is ready.
 
-        self.stats.training_samples = len(self._training_records)
+        Args:
+            X: Training features
+            y: Training labels
+            early_stopping: Fit with fit_with_early_stopping (else plain fit)
+            generation: Data generation X and y were taken from (see
+                training_snapshot; default: the current one)
+
+        Returns:
+            True if a fitted committee was published
+        """
+        if generation is None:
+            generation = self._data_generation
+        learner = self.learner.fresh()
+        if early_stopping:
+            learner.fit_with_early_stopping(X, y)
+        else:
+            learner.fit(X, y)
+        if not learner.is_fitted or not self._publish(learner, len(X), generation):
+            return False
+
+        if self.snapshots:
+            try:
+                self.snapshots.save(learner, X, y)
+            except OSError as e:
+                logger.warning(f"Failed to save committee snapshot: {e}")
+        return True
+
+    def _publish(self, learner: CatBoostActiveLearner, n_records: int, generation: int) -> bool:
+        """Atomically replace the committee unless a newer one is already published.
+
+        Fits are ordered by (data generation, record count): a fit of a replaced
+        training set never wins over one of the current set, whatever its size.
+        """
+        with self._swap_lock:
+            if (generation, n_records) < (self._fitted_generation, self._fitted_records):
+                return False
+            self.learner = learner  # Single reference assignment: readers never block
+            self._fitted_generation = generation
+            self._fitted_records = n_records
+        return True
+
+    @property
+    def pending_records(self) -> int:
+        """Training records added since the published committee was fitted."""
+        with self._swap_lock:
+            if self._fitted_generation != self._data_generation:
+                return len(self._training_records)  # Committee predates the training set
+            return max(0, len(self._training_records) - self._fitted_records)
+
+    def training_snapshot(self) -> tuple[np.ndarray, np.ndarray, int] | None:
+        """Copy of the current training set as (X, y, generation), or None if too small to fit."""
+        with self._lock:
+            records = list(self._training_records)
+            generation = self._data_generation
+        if len(records) < self.min_training_samples:
+            return None
+        X = np.array([r.features for r in records])
+        return X, np.array([r.label for r in records]), generation
+
+    def start_background_retrain(
+        self,
+        min_new_records: int | None = None,
+        max_staleness: float | None = None,
+        poll_interval: float = 5.0,
+    ) -> RetrainScheduler:
+        """
+        Retrain in a background thread instead of inline in record_decision.
+
+        Args:
+            min_new_records: Retrain once this many records were added
+                (default: retrain_threshold)
+            max_staleness: Retrain pending records after this many seconds
+                (default: Config.ACTIVE_LEARNING_RETRAIN_MAX_STALENESS)
+            poll_interval: Seconds between staleness checks
+
+        Returns:
+            The running RetrainScheduler
+        """
+        if self._retrainer is None:
+            self._retrainer = RetrainScheduler(
+                self,
+                min_new_records=min_new_records or self.retrain_threshold,
+                max_staleness=max_staleness or Config.ACTIVE_LEARNING_RETRAIN_MAX_STALENESS,
+                poll_interval=poll_interval,
+            )
+            self._retrainer.start()
+        return self._retrainer
+
+    def stop_background_retrain(self, timeout: float | None = None) -> None:
+        """Stop the background retrain thread (a fit in progress still publishes)."""
+        if self._retrainer is not None:
+            self._retrainer.stop(timeout)
+            self._retrainer = None
 
     def export_training_data(self) -> dict:
         """
@@ -388,19 +611,74 @@ class ActiveClassifier:
         # Step 1: Check transitive inference
         item_a_id = str(item_a.get("id", id(item_a)))
         item_b_id = str(item_b.get("id", id(item_b)))
+        self.transitive.load([item_a_id, item_b_id])
         transitive_result = self.transitive.infer(item_a_id, item_b_id)
 
         if transitive_result is not None:
             is_match, conf = transitive_result
             return ("match" if is_match else "no_match", conf, False)
 
-        # Step 2: Check learner prediction
-        if not self.learner.is_fitted:
+        # Step 2: Check learner prediction (one reference: a retrain may swap it)
+        learner = self.learner
+        if not learner.is_fitted:
             return ("uncertain", 0.5, True)
 
         X = features.to_vector().reshape(1, -1)
-        proba = self.learner.predict_proba(X)[0][1]  # P(match)
+        proba = learner.predict_proba(X)[0][1]  # P(match)
+        return self._decision_from_proba(proba)
 
+    def decide_batch(
+        self,
+        item_a: dict,
+        items_b: list[dict],
+        features_list: list[PairFeatures],
+    ) -> list[tuple[str, float, bool]]:
+        """
+        Decide how to classify item_a against many items at once.
+
+        Gives the same results as calling decide() for each pair, but pairs not
+        settled by transitive inference are scored with a single predict_proba
+        call over an N x 7 feature matrix.
+
+        Args:
+            item_a: Item being classified
+            items_b: Items to compare against
+            features_list: Extracted features for each (item_a, items_b[i]) pair
+
+        Returns:
+            List of (decision, confidence, needs_llm) tuples aligned with items_b
+        """
+        decisions: list[tuple[str, float, bool] | None] = [None] * len(items_b)
+
+        # Step 1: Check transitive inference
+        item_a_id = str(item_a.get("id", id(item_a)))
+        items_b_ids = [str(item_b.get("id", id(item_b))) for item_b in items_b]
+        self.transitive.load([item_a_id, *items_b_ids])  # Stored decisions, if persistent
+        pending: list[int] = []
+        for i, item_b_id in enumerate(items_b_ids):
+            transitive_result = self.transitive.infer(item_a_id, item_b_id)
+            if transitive_result is not None:
+                is_match, conf = transitive_result
+                decisions[i] = ("match" if is_match else "no_match", conf, False)
+            else:
+                pending.append(i)
+
+        # Step 2: Check learner prediction (one model call per committee member)
+        learner = self.learner
+        if pending:
+            if not learner.is_fitted:
+                for i in pending:
+                    decisions[i] = ("uncertain", 0.5, True)
+            else:
+                X = np.vstack([features_list[i].to_vector() for i in pending])
+                probas = learner.predict_proba(X)[:, 1]  # P(match)
+                for i, proba in zip(pending, probas):
+                    decisions[i] = self._decision_from_proba(proba)
+
+        return decisions
+
+    def _decision_from_proba(self, proba: float) -> tuple[str, float, bool]:
+        """Map P(match) to (decision, confidence, needs_llm) using the thresholds."""
         if proba >= self.high_confidence:
             return ("match", float(proba), False)
         elif proba <= self.low_confidence:
@@ -428,8 +706,9 @@ class ActiveClassifier:
             features: Extracted features for this pair
             is_match: Whether the LLM determined this is a match
             llm_confidence: Confidence from the LLM (0-1)
-            trigger_retrain: If True, retrain model after adding record.
-                           Set False when using background Celery retrain (default).
+            trigger_retrain: If True, retrain after adding the record: wakes the
+                           background retrainer if one is running, else refits
+                           here on a copy of the training set (no lock held).
 
         Returns:
             True if added to training data, False if filtered by quality gate
@@ -452,13 +731,16 @@ class ActiveClassifier:
             item_b_id = str(item_b.get("id", id(item_b)))
             self.transitive.add_edge(item_a_id, item_b_id, is_match, llm_confidence)
 
-            # Only retrain if explicitly requested (for non-Celery usage)
-            if trigger_retrain and len(self._training_records) >= self.min_training_samples:
-                X = np.array([r.features for r in self._training_records])
-                y = np.array([r.label for r in self._training_records])
-                self.learner.fit(X, y)
-
             self.stats.training_samples = len(self._training_records)
+
+        retrainer = self._retrainer
+        if retrainer is not None:
+            retrainer.notify(force=trigger_retrain)
+        elif trigger_retrain:
+            training = self.training_snapshot()
+            if training is not None:
+                X, y, generation = training
+                self.refit(X, y, generation=generation)
         return True
 
     def classify(
@@ -488,10 +770,12 @@ class ActiveClassifier:
                 method="prediction",
             )
 
-        # Pre-compute embedding for new item
-        from core.features import compute_embedding, extract_features
+        # Features for every group in one pass (one embedding batch, one matmul)
+        from core.features import extract_features_matrix
 
-        new_embedding = compute_embedding(new_item.get("description", ""))
+        feature_matrix = extract_features_matrix([new_item], existing_groups)[0]
+        features_list = [PairFeatures.from_vector(row) for row in feature_matrix]
+        decisions = self.decide_batch(new_item, existing_groups, features_list)
 
         # Compare against each existing group
         best_match = None
@@ -499,12 +783,9 @@ class ActiveClassifier:
         best_method = "prediction"
         uncertain_pairs: list[tuple[dict, PairFeatures, float]] = []
 
-        for group in existing_groups:
-            group_embedding = compute_embedding(group.get("description", ""))
-            features = extract_features(new_item, group, new_embedding, group_embedding)
-
-            decision, confidence, needs_llm = self.decide(new_item, group, features)
-
+        for group, features, (decision, confidence, needs_llm) in zip(
+            existing_groups, features_list, decisions
+        ):
             if decision == "match" and confidence > best_confidence:
                 best_match = group
                 best_confidence = confidence
@@ -515,10 +796,11 @@ class ActiveClassifier:
 
         # If we have a high-confidence match, use it
         if best_match and best_confidence >= self.high_confidence:
-            if best_method == "prediction":
-                self.stats.predictions += 1
-            else:
-                self.stats.transitive_inferences += 1
+            with self._lock:
+                if best_method == "prediction":
+                    self.stats.predictions += 1
+                else:
+                    self.stats.transitive_inferences += 1
 
             return ClassificationResult(
                 group_id=str(best_match.get("id")),
@@ -535,7 +817,8 @@ class ActiveClassifier:
             # Query LLM for top uncertain cases (limit queries)
             for group, features, _ in uncertain_pairs[:3]:
                 llm_result = llm_classify_fn(new_item, [group])
-                self.stats.llm_calls += 1
+                with self._lock:
+                    self.stats.llm_calls += 1
 
                 is_match = not llm_result.get("is_new", True)
                 llm_confidence = llm_result.get("confidence", 0.5)
@@ -561,4 +844,5 @@ class ActiveClassifier:
 
     def get_stats(self) -> dict:
         """Get classification statistics."""
-        return self.stats.to_dict()
+        with self._lock:
+            return self.stats.to_dict()
@@ -9,7 +9,7 @@ import re
 from dataclasses import dataclass
 from typing import List, Optional
 
-from models.llm_manager import LLMManager
+from models.llm_manager import LLMManager, LLMResponse
 
 logger = logging.getLogger(__name__)
 
@@ -107,6 +107,49 @@ class ExerciseAnalyzer:
             json_mode=True,
         )
 
+        return self._parse_analysis_response(response, exercise_text)
+
+    def analyze_exercises(
+        self,
+        exercises: List[dict],
+        course_name: str,
+        max_concurrency: Optional[int] = None,
+    ) -> List[AnalysisResult]:
+        """Analyze many exercises concurrently.
+
+        Args:
+            exercises: List of dicts with 'exercise_text' and optional
+                'exercise_context' and 'is_sub_question'
+            course_name: Course name for context
+            max_concurrency: Maximum concurrent LLM requests
+
+        Returns:
+            AnalysisResult per exercise, in input order
+        """
+        specs = [
+            {
+                "prompt": self._build_analysis_prompt(
+                    ex["exercise_text"],
+                    course_name,
+                    ex.get("exercise_context"),
+                    ex.get("is_sub_question", False),
+                ),
+                "model": self.llm.primary_model,
+                "temperature": 0.3,
+                "json_mode": True,
+            }
+            for ex in exercises
+        ]
+
+        responses = self.llm.generate_many(specs, max_concurrency=max_concurrency)
+
+        return [
+            self._parse_analysis_response(response, ex["exercise_text"])
+            for ex, response in zip(exercises, responses)
+        ]
+
+    def _parse_analysis_response(self, response: LLMResponse, exercise_text: str) -> AnalysisResult:
+        """Convert an LLM analysis response into an AnalysisResult."""
         if not response.success:
             print(f"[ERROR] LLM failed for exercise: {response.error}")
             print(f"  Text preview: {exercise_text[:100]}...")
@@ -0,0 +1,128 @@
+"""
+Micro-batching dispatcher for batch-capable APIs.
+
+Concurrent callers (threads or coroutines) submit single inputs; a background
+worker collects them for a few milliseconds, or until a batch is full, and
+makes one batched call. Results are fanned back out through
+``concurrent.futures.Future`` objects, so callers can block on them or await
+them via ``asyncio.wrap_future``.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class BatchDispatcher:
+    """Collects single submissions into batched calls.
+
+    Identical inputs submitted in the same window are sent once.
+
+    Example:
+        dispatcher = BatchDispatcher(embed_texts, max_batch_size=64, max_wait=0.005)
+        vector = dispatcher.submit("some text").result()
+        vector = await dispatcher.submit_async("some text")
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list], Sequence[Any]],
+        max_batch_size: int = 64,
+        max_wait: float = 0.005,
+        name: str = "batch-dispatcher",
+    ):
+        """Initialize the dispatcher (the worker thread starts on first submit).
+
+        Args:
+            batch_fn: Function taking a list of inputs and returning results in order
+            max_batch_size: Maximum distinct inputs per batched call
+            max_wait: Seconds to wait for more inputs after the first one arrives
+            name: Worker thread name
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        self._queue: "queue.Queue[tuple[Hashable, Future]]" = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+        self.batches = 0  # Batched calls made
+        self.submitted = 0  # Inputs submitted
+
+    def submit(self, item: Hashable) -> Future:
+        """Queue an input for the next batch.
+
+        Args:
+            item: Input to pass to batch_fn (must be hashable for deduplication)
+
+        Returns:
+            Future resolving to this input's result
+        """
+        future: Future = Future()
+        with self._lock:
+            self.submitted += 1
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+        self._queue.put((item, future))
+        return future
+
+    async def submit_async(self, item: Hashable) -> Any:
+        """Queue an input and await its result without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(item))
+
+    def _collect(self) -> dict[Hashable, list[Future]]:
+        """Block for one input, then gather more until the batch is full or max_wait passes."""
+        item, future = self._queue.get()
+        pending: dict[Hashable, list[Future]] = {item: [future]}
+        deadline = time.monotonic() + self.max_wait
+
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item, future = self._queue.get(timeout=remaining)
+                else:
+                    item, future = self._queue.get_nowait()  # Drain what is already queued
+            except queue.Empty:
+                break
+            pending.setdefault(item, []).append(future)
+        return pending
+
+    def _live(self, pending: dict[Hashable, list[Future]]) -> dict[Hashable, list[Future]]:
+        """Mark futures running, dropping cancelled ones (and inputs nobody waits for)."""
+        live: dict[Hashable, list[Future]] = {}
+        for item, futures in pending.items():
+            running = [future for future in futures if future.set_running_or_notify_cancel()]
+            if running:
+                live[item] = running
+        return live
+
+    def _run(self):
+        while True:
+            # Running futures can no longer be cancelled, so fan-out below cannot fail
+            pending = self._live(self._collect())
+            if not pending:
+                continue
+            items = list(pending)
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise ValueError(f"batch_fn returned {len(results)} results for {len(items)}")
+            except Exception as e:
+                logger.debug(f"{self.name}: batch of {len(items)} failed: {e}")
+                for futures in pending.values():
+                    for future in futures:
+                        future.set_exception(e)
+            else:
+                for item, result in zip(items, results):
+                    for future in pending[item]:
+                        future.set_result(result)
+            self.batches += 1
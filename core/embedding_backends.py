@@ -0,0 +1,268 @@
+"""
+Embedding backends for feature extraction.
+
+Every backend embeds batches of texts and describes itself with a dimension,
+a maximum batch size, and a cache namespace (the embedding store keeps one
+directory per namespace, so vectors of different models never mix).
+
+Backends:
+- ``openrouter``: Qwen3-Embedding-8B via the OpenRouter API (default)
+- ``ollama``: local Ollama server (``/api/embed``)
+- ``sentence-transformers``: local model (optional dependency)
+- ``hashing``: CPU-only hashed word/character n-grams; no downloads, fully
+  deterministic. Meant for CI, benchmarks and air-gapped deployments.
+
+Select with ``QUPLED_EMBEDDING_BACKEND``.
+"""
+
+import os
+import re
+import zlib
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from config import Config
+from models.http_clients import get_httpx_client, get_session
+
+
+class EmbeddingBackend(ABC):
+    """Abstract batch embedding provider."""
+
+    #: Vectors per request accepted by the backend
+    max_batch_size: int = 64
+    #: Whether results are worth persisting in the embedding store
+    persistent_cache: bool = True
+
+    @property
+    @abstractmethod
+    def dim(self) -> int:
+        """Embedding dimension."""
+
+    @property
+    @abstractmethod
+    def namespace(self) -> str:
+        """Cache namespace (unique per model and dimension, filesystem-safe)."""
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[np.ndarray]:
+        """Embed texts.
+
+        Args:
+            texts: Non-empty texts to embed
+
+        Returns:
+            One float32 vector of length ``dim`` per text, in order
+
+        Raises:
+            Exception: On provider errors (callers fall back to zero vectors)
+        """
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "--", name)
+
+
+class OpenRouterBackend(EmbeddingBackend):
+    """Embeddings from the OpenRouter embeddings API."""
+
+    URL = "https://openrouter.ai/api/v1/embeddings"
+    TIMEOUT = 60
+    max_batch_size = 128
+
+    def __init__(self, model: str | None = None, dim: int = 4096):
+        """
+        Args:
+            model: OpenRouter model id (default: Config.OPENROUTER_EMBED_MODEL)
+            dim: Dimension returned by the model
+        """
+        self.model = model or Config.OPENROUTER_EMBED_MODEL
+        self._dim = dim
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    @property
+    def namespace(self) -> str:
+        return _slug(self.model)
+
+    def embed(self, texts: list[str]) -> list[np.ndarray]:
+        api_key = os.environ.get("OPENROUTER_API_KEY", "")
+        if not api_key:
+            raise ValueError("OPENROUTER_API_KEY environment variable not set")
+
+        # Shared keep-alive client: avoids a TCP/TLS handshake per call
+        response = get_httpx_client().post(
+            self.URL,
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            json={"model": self.model, "input": texts},
+            timeout=self.TIMEOUT,
+        )
+        response.raise_for_status()
+
+        # Extract embeddings in order
+        data = sorted(response.json()["data"], key=lambda x: x["index"])
+        return [np.asarray(item["embedding"], dtype=np.float32) for item in data]
+
+
+class OllamaBackend(EmbeddingBackend):
+    """Embeddings from a local Ollama server."""
+
+    # Dimensions of common Ollama embedding models
+    KNOWN_DIMS = {"nomic-embed-text": 768, "mxbai-embed-large": 1024, "all-minilm": 384}
+    TIMEOUT = 60
+
+    def __init__(self, model: str | None = None, dim: int | None = None):
+        """
+        Args:
+            model: Ollama model (default: Config.LLM_EMBED_MODEL)
+            dim: Dimension (required for models not in KNOWN_DIMS)
+
+        Raises:
+            ValueError: If the dimension is unknown
+        """
+        self.model = model or Config.LLM_EMBED_MODEL
+        dim = dim or self.KNOWN_DIMS.get(self.model.split(":")[0])
+        if dim is None:
+            raise ValueError(f"Unknown dimension for Ollama model '{self.model}'; pass dim=")
+        self._dim = dim
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    @property
+    def namespace(self) -> str:
+        return f"ollama--{_slug(self.model)}"
+
+    def embed(self, texts: list[str]) -> list[np.ndarray]:
+        response = get_session().post(
+            f"{Config.OLLAMA_BASE_URL}/api/embed",
+            json={"model": self.model, "input": texts},
+            timeout=self.TIMEOUT,
+        )
+        response.raise_for_status()
+        return [np.asarray(e, dtype=np.float32) for e in response.json()["embeddings"]]
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Embeddings from a local sentence-transformers model (optional dependency)."""
+
+    def __init__(self, model: str | None = None):
+        """
+        Args:
+            model: Model name or path (default: Config.SEMANTIC_EMBEDDING_MODEL)
+
+        Raises:
+            ImportError: If sentence-transformers is not installed
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "sentence-transformers backend requires: pip install sentence-transformers"
+            ) from e
+
+        self.model = model or Config.SEMANTIC_EMBEDDING_MODEL
+        self._model = SentenceTransformer(self.model)
+
+    @property
+    def dim(self) -> int:
+        return self._model.get_sentence_embedding_dimension()
+
+    @property
+    def namespace(self) -> str:
+        return f"st--{_slug(self.model)}"
+
+    def embed(self, texts: list[str]) -> list[np.ndarray]:
+        vectors = self._model.encode(texts, convert_to_numpy=True)
+        return [np.asarray(v, dtype=np.float32) for v in vectors]
+
+
+class HashingBackend(EmbeddingBackend):
+    """Deterministic CPU-local embedder (feature hashing of n-grams).
+
+    Each text becomes a signed, log-scaled bag of lowercase word unigrams and
+    bigrams plus character n-grams, hashed into ``dim`` buckets with CRC32 and
+    L2-normalized. Texts sharing words or word fragments get high cosine
+    similarity; true synonyms do not, so this is a stand-in, not a replacement
+    for a learned model.
+    """
+
+    max_batch_size = 1024
+    persistent_cache = False  # Cheaper to recompute than to look up
+
+    def __init__(self, dim: int = 512, char_ngrams: tuple[int, ...] = (3, 4, 5)):
+        """
+        Args:
+            dim: Number of hash buckets
+            char_ngrams: Character n-gram sizes (within word boundaries)
+        """
+        self._dim = dim
+        self.char_ngrams = char_ngrams
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    @property
+    def namespace(self) -> str:
+        sizes = "".join(str(n) for n in self.char_ngrams)
+        return f"hashing--{self._dim}--c{sizes}"
+
+    def _features(self, text: str) -> list[str]:
+        words = re.findall(r"\w+", text.lower())
+        features = [f"w:{w}" for w in words]
+        features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"<{word}>"
+            for n in self.char_ngrams:
+                features += [f"c:{padded[i : i + n]}" for i in range(len(padded) - n + 1)]
+        return features
+
+    def embed(self, texts: list[str]) -> list[np.ndarray]:
+        results = []
+        for text in texts:
+            hashes = np.fromiter(
+                (zlib.crc32(f.encode("utf-8")) for f in self._features(text)), dtype=np.uint32
+            )
+            vector = np.zeros(self._dim, dtype=np.float32)
+            if len(hashes):
+                buckets = (hashes % self._dim).astype(np.int64)
+                signs = np.where((hashes >> 31) & 1, -1.0, 1.0).astype(np.float32)
+                np.add.at(vector, buckets, signs)
+                vector = np.sign(vector) * np.log1p(np.abs(vector))
+                norm = np.linalg.norm(vector)
+                if norm > 0:
+                    vector /= norm
+            results.append(vector.astype(np.float32))
+        return results
+
+
+def create_embedding_backend(name: str | None = None) -> EmbeddingBackend:
+    """Create an embedding backend by name.
+
+    Args:
+        name: "openrouter", "ollama", "sentence-transformers" or "hashing"
+            (default: Config.EMBEDDING_BACKEND)
+
+    Returns:
+        EmbeddingBackend instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = (name or Config.EMBEDDING_BACKEND).lower()
+    if name == "openrouter":
+        return OpenRouterBackend()
+    if name == "ollama":
+        return OllamaBackend()
+    if name in ("sentence-transformers", "sentence_transformers"):
+        return SentenceTransformerBackend()
+    if name == "hashing":
+        return HashingBackend(dim=Config.HASHING_EMBEDDING_DIM)
+    raise ValueError(
+        f"Unknown embedding backend '{name}' "
+        "(expected openrouter, ollama, sentence-transformers or hashing)"
+    )
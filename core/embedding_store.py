@@ -0,0 +1,331 @@
+"""
+Persistent embedding store for feature extraction.
+
+Embeddings are kept in a memory-mapped float32 matrix on disk, with a SQLite
+index mapping a content hash of each text to its row. Provides:
+- Reuse of embeddings across processes and restarts (no repeat API calls)
+- A bounded in-memory working set with least-recently-used eviction
+- Safe concurrent writers (row allocation runs in a SQLite write transaction)
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Matrix file grows by doubling, starting from this many rows
+INITIAL_CAPACITY = 256
+
+# Max host parameters per IN (...) query
+_QUERY_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    row INTEGER NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def content_key(text: str) -> str:
+    """Content hash used as the store key for a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Disk-backed embedding matrix with an LRU working set in memory.
+
+    One store holds vectors of a single model and dimension; use a separate
+    directory per embedding model.
+
+    Example:
+        store = EmbeddingStore(Config.EMBEDDING_STORE_PATH / "qwen3", dim=4096)
+        store.put_many({"some text": vector})
+        vectors = store.get_many(["some text", "other text"])  # [array, None]
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        dim: int,
+        max_memory_entries: int = 2048,
+        dtype: str = "float32",
+    ):
+        """Open (or create) the store.
+
+        Args:
+            path: Directory holding ``index.db`` and ``vectors.bin``
+            dim: Embedding dimension
+            max_memory_entries: Size cap of the in-memory working set
+            dtype: On-disk element type ("float32" or "float16")
+
+        Raises:
+            ValueError: If an existing store was created with another dim/dtype
+        """
+        self.path = Path(path)
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.max_memory_entries = max_memory_entries
+        self._index_path = self.path / "index.db"
+        self._matrix_path = self.path / "vectors.bin"
+
+        self._local = threading.local()
+        self._lock = threading.RLock()  # Guards the mapping and the working set
+        self._matrix: Optional[np.memmap] = None
+        self._capacity = 0
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._matrix_path.touch(exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        self._check_meta(conn)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get (or open) this thread's index connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; write transactions are opened explicitly
+            conn = sqlite3.connect(str(self._index_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _check_meta(self, conn: sqlite3.Connection):
+        """Record dim/dtype on first use and refuse to reopen with different ones."""
+        expected = {"dim": str(self.dim), "dtype": self.dtype.name}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for name, value in expected.items():
+                conn.execute(
+                    "INSERT OR IGNORE INTO store_meta (name, value) VALUES (?, ?)", (name, value)
+                )
+            stored = dict(conn.execute("SELECT name, value FROM store_meta").fetchall())
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        for name, value in expected.items():
+            if stored.get(name) != value:
+                raise ValueError(
+                    f"Embedding store at {self.path} has {name}={stored.get(name)}, expected {value}"
+                )
+
+    def _map(self, min_rows: int = 0):
+        """(Re)map the matrix file, growing it to hold at least min_rows. Caller holds lock.
+
+        Growing must happen inside an index write transaction so that only one
+        process resizes the file at a time.
+        """
+        row_bytes = self.dim * self.dtype.itemsize
+        file_rows = self._matrix_path.stat().st_size // row_bytes
+
+        if file_rows < min_rows:
+            new_rows = max(INITIAL_CAPACITY, file_rows)
+            while new_rows < min_rows:
+                new_rows *= 2
+            with open(self._matrix_path, "r+b") as f:
+                f.truncate(new_rows * row_bytes)
+            file_rows = new_rows
+
+        if file_rows != self._capacity or self._matrix is None:
+            self._matrix = (
+                np.memmap(
+                    self._matrix_path, dtype=self.dtype, mode="r+", shape=(file_rows, self.dim)
+                )
+                if file_rows
+                else None
+            )
+            self._capacity = file_rows
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Add to the working set, evicting least-recently-used entries. Caller holds lock."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Look up the embedding of a text.
+
+        Args:
+            text: Embedded text
+
+        Returns:
+            Read-only float32 vector, or None if not stored
+        """
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: Sequence[str]) -> list[Optional[np.ndarray]]:
+        """Look up embeddings for several texts.
+
+        Args:
+            texts: Embedded texts
+
+        Returns:
+            List aligned with texts; None for texts not in the store
+        """
+        keys = [content_key(text) for text in texts]
+        results: list[Optional[np.ndarray]] = [None] * len(texts)
+        pending: Dict[str, list[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    results[i] = vector
+                else:
+                    pending.setdefault(key, []).append(i)
+
+        if not pending:
+            return results
+
+        rows: Dict[str, int] = {}
+        conn = self._conn()
+        pending_keys = list(pending)
+        for start in range(0, len(pending_keys), _QUERY_CHUNK):
+            chunk = pending_keys[start : start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows.update(
+                conn.execute(
+                    f"SELECT key, row FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+            )
+
+        with self._lock:
+            if rows and max(rows.values()) >= self._capacity:
+                self._map()  # Another process grew the file
+
+            for key, indices in pending.items():
+                row = rows.get(key)
+                if row is None:
+                    self.misses += len(indices)
+                    continue
+                vector = np.array(self._matrix[row], dtype=np.float32)
+                vector.flags.writeable = False
+                self._remember(key, vector)
+                self.disk_hits += len(indices)
+                for i in indices:
+                    results[i] = vector
+
+        return results
+
+    def put(self, text: str, vector: np.ndarray):
+        """Store the embedding of a text.
+
+        Args:
+            text: Embedded text
+            vector: Embedding of length ``dim``
+        """
+        self.put_many({text: vector})
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        """Store several embeddings in one transaction. Existing texts are kept.
+
+        Args:
+            items: Mapping of text to embedding of length ``dim``
+
+        Raises:
+            ValueError: If a vector has the wrong dimension
+        """
+        entries: Dict[str, np.ndarray] = {}
+        for text, vector in items.items():
+            vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+            if vector.shape[0] != self.dim:
+                raise ValueError(f"Expected embedding of dim {self.dim}, got {vector.shape[0]}")
+            vector.flags.writeable = False
+            entries[content_key(text)] = vector
+
+        if not entries:
+            return
+
+        conn = self._conn()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                keys = list(entries)
+                existing = set()
+                for start in range(0, len(keys), _QUERY_CHUNK):
+                    chunk = keys[start : start + _QUERY_CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    existing.update(
+                        key
+                        for (key,) in conn.execute(
+                            f"SELECT key FROM embeddings WHERE key IN ({placeholders})", chunk
+                        )
+                    )
+                new_keys = [key for key in keys if key not in existing]
+
+                if new_keys:
+                    next_row = conn.execute(
+                        "SELECT COALESCE(MAX(row) + 1, 0) FROM embeddings"
+                    ).fetchone()[0]
+                    self._map(min_rows=next_row + len(new_keys))
+                    for offset, key in enumerate(new_keys):
+                        self._matrix[next_row + offset] = entries[key]
+                    # Vectors hit the file before the index points at them
+                    self._matrix.flush()
+                    conn.executemany(
+                        "INSERT INTO embeddings (key, row) VALUES (?, ?)",
+                        [(key, next_row + offset) for offset, key in enumerate(new_keys)],
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            for key, vector in entries.items():
+                self._remember(key, vector)
+
+    def stats(self) -> Dict[str, int]:
+        """Get store statistics.
+
+        Returns:
+            Dict with stored entries, working-set size, and hit/miss counters
+        """
+        entries = self._conn().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        with self._lock:
+            return {
+                "entries": entries,
+                "memory_entries": len(self._memory),
+                "max_memory_entries": self.max_memory_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+    def clear_memory(self):
+        """Drop the in-memory working set (the disk store is kept)."""
+        with self._lock:
+            self._memory.clear()
+
+    def close(self):
+        """Unmap the matrix and close this thread's index connection."""
+        with self._lock:
+            self._matrix = None
+            self._capacity = 0
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -193,34 +193,53 @@ def _get_context_summaries(
     standalone_exercises: List[Dict[str, Any]],
     logger,
 ) -> Dict[str, Optional[str]]:
-    """Pass 2: Get context summaries from DeepSeek for parents and standalone exercises."""
-    import json
-    import re
-
-    import requests
+    """Pass 2: Get context summaries from DeepSeek for parents and standalone exercises.
 
+    Requests go through LLMManager.generate_many: cached prompts are not re-sent,
+    and the rest run concurrently under the provider rate limiter.
+    """
     from config import Config
+    from models.llm_manager import LLMManager
 
-    api_key = Config.DEEPSEEK_API_KEY
-    if not api_key:
+    if not Config.DEEPSEEK_API_KEY:
         logger.warning("DEEPSEEK_API_KEY not configured, skipping context extraction")
         return {}
 
     model = Config.DEEPSEEK_MODEL or "deepseek-chat"
 
-    results = {}
-
-    # Process parents
-    for parent_num, data in parent_data.items():
-        prompt = CONTEXT_EXTRACTION_PROMPT_PARENT.format(exercise_text=data["text"])
-        context = _call_deepseek_for_context(api_key, model, prompt, logger)
-        results[parent_num] = context
+    # Parents first, then standalone exercises
+    jobs = [
+        (parent_num, CONTEXT_EXTRACTION_PROMPT_PARENT.format(exercise_text=data["text"]))
+        for parent_num, data in parent_data.items()
+    ] + [
+        (
+            ex["exercise_number"],
+            CONTEXT_EXTRACTION_PROMPT_STANDALONE.format(exercise_text=ex["text"]),
+        )
+        for ex in standalone_exercises
+    ]
 
-    # Process standalone exercises
-    for ex in standalone_exercises:
-        prompt = CONTEXT_EXTRACTION_PROMPT_STANDALONE.format(exercise_text=ex["text"])
-        context = _call_deepseek_for_context(api_key, model, prompt, logger)
-        results[ex["exercise_number"]] = context
+    results = {}
+    if jobs:
+        llm = LLMManager(provider="deepseek", quiet=True)
+        responses = llm.generate_many(
+            [
+                {
+                    "prompt": prompt,
+                    "model": model,
+                    "system": CONTEXT_EXTRACTION_SYSTEM,
+                    "temperature": 0.0,
+                    "max_tokens": 500,
+                }
+                for _, prompt in jobs
+            ]
+        )
+        for (key, _), response in zip(jobs, responses):
+            if not response.success:
+                logger.warning(f"DeepSeek context extraction failed: {response.error}")
+                results[key] = None
+                continue
+            results[key] = _parse_context_summary(response.text, logger)
 
     parent_count = len(parent_data)
     standalone_count = len(standalone_exercises)
@@ -233,41 +252,12 @@ def _get_context_summaries(
     return results
 
 
-def _call_deepseek_for_context(
-    api_key: str,
-    model: str,
-    prompt: str,
-    logger,
-) -> Optional[str]:
-    """Call DeepSeek API for context extraction."""
+def _parse_context_summary(text: str, logger) -> Optional[str]:
+    """Extract context_summary from a DeepSeek context extraction response."""
     import json
     import re
 
-    import requests
-
     try:
-        response = requests.post(
-            "https://api.deepseek.com/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": model,
-                "messages": [
-                    {"role": "system", "content": CONTEXT_EXTRACTION_SYSTEM},
-                    {"role": "user", "content": prompt},
-                ],
-                "temperature": 0.0,
-                "max_tokens": 500,
-            },
-            timeout=30,
-        )
-        response.raise_for_status()
-
-        result = response.json()
-        text = result["choices"][0]["message"]["content"]
-
         # Parse JSON response
         json_match = re.search(r"\{[\s\S]*\}", text)
         if json_match:
@@ -282,7 +272,7 @@ def _call_deepseek_for_context(
 
     except Exception as e:
         logger.warning(f"DeepSeek context extraction failed: {e}")
-        logger.debug(f"Raw response text: {text[:500] if 'text' in dir() else 'N/A'}")
+        logger.debug(f"Raw response text: {text[:500]}")
 
     return None
 
@@ -407,6 +397,7 @@ def extract_exercises(
     import requests
 
     from config import Config
+    from models.http_clients import get_session
 
     logger = logging.getLogger(__name__)
 
@@ -460,7 +451,7 @@ def extract_exercises(
     model = Config.OPENROUTER_VLM_MODEL
 
     try:
-        response = requests.post(
+        response = get_session().post(
             "https://openrouter.ai/api/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
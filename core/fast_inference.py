@@ -0,0 +1,144 @@
+"""
+Vectorized NumPy inference for the CatBoost committee.
+
+CatBoost models are oblivious trees: every level of a tree tests one
+``feature > border`` split, so a sample's leaf index is just the bits of its
+split results. The committee's trees are exported once into flat arrays
+(split feature indices, borders, leaf values) and evaluated for a whole batch
+with a few array operations, avoiding CatBoost's per-call Python overhead,
+which dominates for 7-feature inputs.
+"""
+
+import json
+import os
+import tempfile
+from typing import Sequence
+
+import numpy as np
+
+
+class CompiledCommittee:
+    """All committee trees as flat arrays, evaluated in one vectorized pass.
+
+    Example:
+        compiled = CompiledCommittee.from_catboost(learner.committee)
+        member_probas = compiled.member_probas(X)  # (members, N) P(match)
+    """
+
+    def __init__(
+        self,
+        features: np.ndarray,
+        borders: np.ndarray,
+        leaf_values: np.ndarray,
+        tree_member: np.ndarray,
+        scales: np.ndarray,
+        biases: np.ndarray,
+    ):
+        """
+        Args:
+            features: (trees, depth) feature index tested at each level
+            borders: (trees, depth) split borders (+inf pads shallower trees)
+            leaf_values: (trees, 2**depth) raw leaf values
+            tree_member: (trees,) committee member owning each tree (sorted; every
+                member owns at least one tree)
+            scales, biases: (members,) raw score = scale * sum(leaves) + bias
+        """
+        self.features = features
+        self.borders = borders
+        self.leaf_values = leaf_values
+        self.scales = scales
+        self.biases = biases
+        self.n_members = len(scales)
+
+        n_trees, depth = features.shape
+        # Each distinct (feature, border) split is evaluated once per sample;
+        # leaf index of tree t = sum over levels of bit(split) << level, as a matmul
+        split_keys = np.stack([features.ravel(), borders.ravel().view(np.int32)], axis=1)
+        unique, split_ids = np.unique(split_keys, axis=0, return_inverse=True)
+        self._split_features = unique[:, 0]
+        self._split_borders = unique[:, 1].astype(np.int32).view(np.float32)
+        self._leaf_weights = np.zeros((len(unique), n_trees), dtype=np.float32)
+        np.add.at(
+            self._leaf_weights,
+            (split_ids.reshape(-1), np.repeat(np.arange(n_trees), depth)),
+            np.tile((1 << np.arange(depth)).astype(np.float32), n_trees),
+        )
+        self._leaf_offsets = np.arange(n_trees) * leaf_values.shape[1]
+        self._flat_leaves = leaf_values.ravel()
+        # Trees are grouped by member: first tree of each member, for per-row sums
+        # that do not depend on batch size (a BLAS matmul would)
+        self._member_starts = np.searchsorted(tree_member, np.arange(self.n_members))
+
+    @classmethod
+    def from_catboost(cls, models: Sequence) -> "CompiledCommittee":
+        """Export fitted CatBoost binary classifiers (float features only).
+
+        Raises:
+            ValueError: If a model uses anything but float-feature oblivious splits
+        """
+        trees, members, scales, biases = [], [], [], []
+        for member, model in enumerate(models):
+            exported = _export_json(model)
+            if "oblivious_trees" not in exported:
+                raise ValueError("Only oblivious-tree models can be compiled")
+            scale, bias = exported.get("scale_and_bias", [1.0, [0.0]])
+            scales.append(scale)
+            biases.append(bias[0] if isinstance(bias, list) else bias)
+            for tree in exported["oblivious_trees"]:
+                if len(tree["leaf_values"]) != 1 << len(tree["splits"]):
+                    raise ValueError("Only single-dimension (binary) models can be compiled")
+                if any(split.get("split_type") != "FloatFeature" for split in tree["splits"]):
+                    raise ValueError("Only float-feature splits can be compiled")
+                trees.append(tree)
+                members.append(member)
+
+        depth = max((len(tree["splits"]) for tree in trees), default=0)
+        features = np.zeros((len(trees), depth), dtype=np.int64)
+        borders = np.full((len(trees), depth), np.inf, dtype=np.float32)
+        leaf_values = np.zeros((len(trees), 1 << depth))
+        for t, tree in enumerate(trees):
+            # Padded levels never split (border +inf), so they add high bits of 0
+            for level, split in enumerate(tree["splits"]):
+                features[t, level] = split["float_feature_index"]
+                borders[t, level] = split["border"]
+            leaf_values[t, : len(tree["leaf_values"])] = tree["leaf_values"]
+
+        return cls(
+            features,
+            borders,
+            leaf_values,
+            np.array(members, dtype=np.int64),
+            np.array(scales, dtype=np.float64),
+            np.array(biases, dtype=np.float64),
+        )
+
+    def raw_scores(self, X: np.ndarray) -> np.ndarray:
+        """Raw (log-odds) scores, shape (members, N)."""
+        # CatBoost compares features as float32
+        X = np.asarray(X, dtype=np.float32).reshape(len(X), -1)
+        bits = (X[:, self._split_features] > self._split_borders).astype(np.float32)
+        leaves = (bits @ self._leaf_weights).astype(np.int64)  # (N, trees), exact below 2**24
+        values = self._flat_leaves[leaves + self._leaf_offsets]  # (N, trees)
+        sums = np.add.reduceat(values, self._member_starts, axis=1)  # (N, members)
+        return sums.T * self.scales[:, None] + self.biases[:, None]
+
+    def member_probas(self, X: np.ndarray) -> np.ndarray:
+        """P(match) from each member, shape (members, N)."""
+        return 1.0 / (1.0 + np.exp(-self.raw_scores(X)))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Committee-average class probabilities, shape (N, 2)."""
+        p = self.member_probas(X).mean(axis=0)
+        return np.column_stack([1.0 - p, p])
+
+
+def _export_json(model) -> dict:
+    """Export a CatBoost model to its JSON representation."""
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        model.save_model(path, format="json")
+        with open(path) as f:
+            return json.load(f)
+    finally:
+        os.unlink(path)
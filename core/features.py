@@ -2,97 +2,206 @@
 Feature extraction for active learning classifier.
 
 Extracts numerical features from item pairs for ML classification.
-Key feature: embedding_similarity using Qwen3-Embedding-8B via OpenRouter.
+Key feature: embedding_similarity using a pluggable embedding backend
+(Qwen3-Embedding-8B via OpenRouter by default, see core/embedding_backends.py).
 """
 
-import os
+import threading
 from dataclasses import dataclass
 from functools import lru_cache
+from typing import Optional
 
-import httpx
 import numpy as np
 
-# OpenRouter configuration
+from config import Config
+from core.batch_dispatcher import BatchDispatcher
+from core.embedding_backends import EmbeddingBackend, create_embedding_backend
+from core.embedding_store import EmbeddingStore
+
+# Optional: sparse matrices for pairwise Jaccard (installed with catboost)
+try:
+    import scipy.sparse as _sparse
+except ImportError:
+    _sparse = None
+
+# Default (OpenRouter) embedding model
 MODEL_NAME = "qwen/qwen3-embedding-8b"
 EMBEDDING_DIM = 4096
-OPENROUTER_EMBEDDINGS_URL = "https://openrouter.ai/api/v1/embeddings"
-API_TIMEOUT = 60
+
+# Embedding backend, store and dispatcher (created on first use)
+_embedding_backend: Optional[EmbeddingBackend] = None
+_embedding_store: Optional[EmbeddingStore] = None
+_embedding_dispatcher: Optional[BatchDispatcher] = None
+_embedding_store_lock = threading.Lock()
 
 
-def _get_api_key() -> str:
-    """Get OpenRouter API key from environment."""
-    key = os.environ.get("OPENROUTER_API_KEY", "")
-    if not key:
-        raise ValueError("OPENROUTER_API_KEY environment variable not set")
-    return key
+def get_embedding_backend() -> EmbeddingBackend:
+    """Get the configured embedding backend (Config.EMBEDDING_BACKEND)."""
+    global _embedding_backend
+    if _embedding_backend is None:
+        with _embedding_store_lock:
+            if _embedding_backend is None:
+                _embedding_backend = create_embedding_backend()
+    return _embedding_backend
 
 
-def _call_openrouter_embeddings(texts: list[str]) -> list[list[float]]:
+def set_embedding_backend(backend: EmbeddingBackend | str):
     """
-    Call OpenRouter embeddings API.
+    Switch the embedding backend. The store and dispatcher are reopened for the
+    new backend, so cached vectors of different backends never mix.
 
     Args:
-        texts: List of texts to embed
+        backend: EmbeddingBackend instance or backend name
+    """
+    global _embedding_backend, _embedding_store, _embedding_dispatcher
+    if isinstance(backend, str):
+        backend = create_embedding_backend(backend)
+    with _embedding_store_lock:
+        if _embedding_store is not None:
+            _embedding_store.close()
+        _embedding_backend = backend
+        _embedding_store = None
+        _embedding_dispatcher = None
+
+
+def get_embedding_dim() -> int:
+    """
+    Dimension of the embeddings returned by this module: the backend's, or
+    Config.EMBEDDING_DIMENSIONS if set and smaller (Matryoshka truncation).
+    """
+    backend_dim = get_embedding_backend().dim
+    return min(Config.EMBEDDING_DIMENSIONS or backend_dim, backend_dim)
+
+
+def normalize_embeddings(vectors: list, dim: int | None = None) -> list[np.ndarray]:
+    """
+    Truncate embeddings to their first dim components and L2-normalize them,
+    so cosine similarity becomes a plain dot product. Zero vectors stay zero.
+
+    Args:
+        vectors: Embeddings (sequences or arrays of equal length)
+        dim: Target dimension (default: get_embedding_dim())
 
     Returns:
-        List of embedding vectors (each 4096 floats)
+        List of unit-norm (or zero) float32 arrays of length dim
     """
-    api_key = _get_api_key()
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-
-    payload = {
-        "model": MODEL_NAME,
-        "input": texts,
-    }
-
-    with httpx.Client(timeout=API_TIMEOUT) as client:
-        response = client.post(
-            OPENROUTER_EMBEDDINGS_URL,
-            headers=headers,
-            json=payload,
-        )
-        response.raise_for_status()
-        data = response.json()
+    if not len(vectors):
+        return []
+    dim = dim or get_embedding_dim()
+    matrix = np.asarray(vectors, dtype=np.float32)[:, :dim]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms >= 1e-8)
+    return list(matrix)
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """Get the on-disk embedding store for the active backend (shared by all callers)."""
+    global _embedding_store
+    backend = get_embedding_backend()
+    if _embedding_store is None:
+        with _embedding_store_lock:
+            if _embedding_store is None:
+                # Stored vectors are truncated + normalized: one directory per dimension
+                dim = get_embedding_dim()
+                _embedding_store = EmbeddingStore(
+                    Config.EMBEDDING_STORE_PATH / f"{backend.namespace}--unit{dim}",
+                    dim=dim,
+                    max_memory_entries=Config.EMBEDDING_MEMORY_CACHE_SIZE,
+                )
+    return _embedding_store
+
+
+def _embed_and_store(texts: list[str]) -> list[np.ndarray]:
+    """Embed texts with one backend call, normalize and persist the results."""
+    backend = get_embedding_backend()
+    embeddings = normalize_embeddings(backend.embed(texts))
+    if backend.persistent_cache:
+        get_embedding_store().put_many(dict(zip(texts, embeddings)))
+    return embeddings
+
+
+def get_embedding_dispatcher() -> BatchDispatcher:
+    """Get the process-wide embedding dispatcher (created on first use).
+
+    Micro-batches concurrent compute_embedding misses into shared backend calls.
+    """
+    global _embedding_dispatcher
+    backend = get_embedding_backend()
+    if _embedding_dispatcher is None:
+        with _embedding_store_lock:
+            if _embedding_dispatcher is None:
+                _embedding_dispatcher = BatchDispatcher(
+                    _embed_and_store,
+                    max_batch_size=min(Config.EMBEDDING_BATCH_MAX_SIZE, backend.max_batch_size),
+                    max_wait=Config.EMBEDDING_BATCH_MAX_WAIT_MS / 1000,
+                    name="embedding-dispatcher",
+                )
+    return _embedding_dispatcher
+
+
+def compute_embedding(text: str) -> np.ndarray:
+    """
+    Compute embedding for text. Read through the persistent embedding store,
+    so repeated texts never hit the API again (across processes and restarts).
+    Misses from concurrent callers are micro-batched into shared API requests.
+
+    Args:
+        text: Text to embed
+
+    Returns:
+        Unit-norm float32 embedding of length get_embedding_dim()
+        (zeros for empty text or on API failure)
+    """
+    backend = get_embedding_backend()
+    if not text or not text.strip():
+        return np.zeros(get_embedding_dim(), dtype=np.float32)
 
-    # Extract embeddings in order
-    embeddings_data = sorted(data["data"], key=lambda x: x["index"])
-    return [item["embedding"] for item in embeddings_data]
+    # Local backends are cheaper to recompute than to look up
+    if not backend.persistent_cache:
+        return _embed_and_store([text])[0]
 
+    # Check store
+    store = get_embedding_store()
+    cached = store.get(text)
+    if cached is not None:
+        return cached
 
-# Cache for embeddings (text -> embedding)
-_embedding_cache: dict[str, np.ndarray] = {}
+    # Call API (batched with other threads' misses)
+    try:
+        return get_embedding_dispatcher().submit(text).result()
+    except Exception:
+        # Return zeros on API failure (feature extraction continues)
+        return np.zeros(get_embedding_dim(), dtype=np.float32)
 
 
-def compute_embedding(text: str) -> np.ndarray:
+async def compute_embedding_async(text: str) -> np.ndarray:
     """
-    Compute embedding for text. Cached to avoid API calls for repeated texts.
+    Async counterpart of compute_embedding; awaits the shared dispatcher
+    instead of blocking the event loop on the API call.
 
     Args:
         text: Text to embed
 
     Returns:
-        Embedding as numpy array (4096 floats)
+        Unit-norm float32 embedding of length get_embedding_dim()
+        (zeros for empty text or on API failure)
     """
+    backend = get_embedding_backend()
     if not text or not text.strip():
-        return np.zeros(EMBEDDING_DIM)
+        return np.zeros(get_embedding_dim(), dtype=np.float32)
 
-    # Check cache
-    if text in _embedding_cache:
-        return _embedding_cache[text]
+    if not backend.persistent_cache:
+        return _embed_and_store([text])[0]
+
+    cached = get_embedding_store().get(text)
+    if cached is not None:
+        return cached
 
-    # Call API
     try:
-        embeddings = _call_openrouter_embeddings([text])
-        embedding = np.array(embeddings[0])
-        _embedding_cache[text] = embedding
-        return embedding
+        return await get_embedding_dispatcher().submit_async(text)
     except Exception:
         # Return zeros on API failure (feature extraction continues)
-        return np.zeros(EMBEDDING_DIM)
+        return np.zeros(get_embedding_dim(), dtype=np.float32)
 
 
 def compute_embeddings_batch(texts: list[str]) -> list[np.ndarray]:
@@ -103,33 +212,40 @@ def compute_embeddings_batch(texts: list[str]) -> list[np.ndarray]:
         texts: List of texts to embed
 
     Returns:
-        List of embeddings as numpy arrays
+        List of unit-norm float32 embeddings (zeros for empty or failed texts)
     """
     if not texts:
         return []
 
+    backend = get_embedding_backend()
+
     # Filter out empty texts and track indices
     non_empty_texts = []
     non_empty_indices = []
-    results: list[np.ndarray] = [np.zeros(EMBEDDING_DIM)] * len(texts)
-
-    for i, text in enumerate(texts):
-        if text and text.strip():
-            # Check cache first
-            if text in _embedding_cache:
-                results[i] = _embedding_cache[text]
-            else:
-                non_empty_texts.append(text)
-                non_empty_indices.append(i)
-
-    # Call API for uncached texts
-    if non_empty_texts:
+    dim = get_embedding_dim()
+    results = [np.zeros(dim, dtype=np.float32) for _ in texts]  # One array per slot
+
+    candidates = [i for i, text in enumerate(texts) if text and text.strip()]
+    if backend.persistent_cache:
+        # Check store first (one index lookup for the whole batch)
+        cached = get_embedding_store().get_many([texts[i] for i in candidates])
+    else:
+        cached = [None] * len(candidates)
+
+    for i, vector in zip(candidates, cached):
+        if vector is not None:
+            results[i] = vector
+        else:
+            non_empty_texts.append(texts[i])
+            non_empty_indices.append(i)
+
+    # Call backend for uncached texts, in chunks it accepts
+    step = backend.max_batch_size
+    for start in range(0, len(non_empty_texts), step):
+        chunk = non_empty_texts[start : start + step]
         try:
-            embeddings = _call_openrouter_embeddings(non_empty_texts)
-            for idx, embedding in zip(non_empty_indices, embeddings):
-                arr = np.array(embedding)
-                results[idx] = arr
-                _embedding_cache[texts[idx]] = arr
+            for idx, embedding in zip(non_empty_indices[start:], _embed_and_store(chunk)):
+                results[idx] = embedding
         except Exception:
             # Return zeros for failed texts
             pass
@@ -138,7 +254,12 @@ def compute_embeddings_batch(texts: list[str]) -> list[np.ndarray]:
 
 
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
-    """Compute cosine similarity between two vectors."""
+    """
+    Compute cosine similarity between two arbitrary vectors.
+
+    Embeddings from compute_embedding(s) are already unit-norm; compare those
+    with a plain dot product instead.
+    """
     norm_a = np.linalg.norm(a)
     norm_b = np.linalg.norm(b)
     if norm_a < 1e-8 or norm_b < 1e-8:
@@ -146,28 +267,86 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return float(np.dot(a, b) / (norm_a * norm_b))
 
 
-def levenshtein_ratio(s1: str, s2: str) -> float:
-    """Compute normalized Levenshtein similarity (0-1)."""
-    if not s1 and not s2:
-        return 1.0
-    if not s1 or not s2:
-        return 0.0
+def levenshtein_distance(s1: str, s2: str, max_distance: int | None = None) -> int:
+    """
+    Compute Levenshtein edit distance with the Myers/Hyyro bit-parallel algorithm.
 
+    Each DP column is packed into a Python int (one bit per character of the
+    shorter string), so a row costs a handful of integer operations instead of
+    a Python loop over the other string.
+
+    Args:
+        s1, s2: Strings to compare
+        max_distance: Optional bound; once the distance is known to exceed it,
+            stop early and return max_distance + 1
+
+    Returns:
+        Edit distance (or max_distance + 1 if it exceeds max_distance)
+    """
     if len(s1) < len(s2):
         s1, s2 = s2, s1
+    m, n = len(s2), len(s1)  # Pattern is the shorter string
+    if max_distance is not None and n - m > max_distance:
+        return max_distance + 1
+    if m == 0:
+        return n
+
+    # Bitmask of pattern positions for each character
+    peq: dict[str, int] = {}
+    for i, c in enumerate(s2):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv = mask, 0  # Vertical +1 / -1 deltas
+    score = m
+    for j, c in enumerate(s1, 1):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        # Score can drop by at most 1 per remaining character
+        if max_distance is not None and score - (n - j) > max_distance:
+            return max_distance + 1
+
+    return score
+
+
+def levenshtein_ratio(s1: str, s2: str, min_ratio: float | None = None) -> float:
+    """
+    Compute normalized Levenshtein similarity (0-1).
+
+    Args:
+        s1, s2: Strings to compare
+        min_ratio: Optional threshold; if the ratio is below it, 0.0 may be
+            returned early (exact values are returned at or above it)
 
-    distances = list(range(len(s2) + 1))
-    for i, c1 in enumerate(s1):
-        new_distances = [i + 1]
-        for j, c2 in enumerate(s2):
-            if c1 == c2:
-                new_distances.append(distances[j])
-            else:
-                new_distances.append(1 + min(distances[j], distances[j + 1], new_distances[-1]))
-        distances = new_distances
+    Returns:
+        1 - edit_distance / max_len
+    """
+    if not s1 and not s2:
+        return 1.0
+    if not s1 or not s2:
+        return 0.0
 
     max_len = max(len(s1), len(s2))
-    return 1 - (distances[-1] / max_len)
+    max_distance = None
+    if min_ratio is not None:
+        # +1 guards against float rounding; only clearly-below-threshold pairs exit early
+        max_distance = int((1 - min_ratio) * max_len) + 1
+    distance = levenshtein_distance(s1, s2, max_distance)
+    if max_distance is not None and distance > max_distance:
+        return 0.0
+    return 1 - (distance / max_len)
 
 
 @dataclass
@@ -200,6 +379,19 @@ class PairFeatures:
         """Convert to list for JSON serialization."""
         return self.to_vector().tolist()
 
+    @classmethod
+    def from_vector(cls, vector: np.ndarray) -> "PairFeatures":
+        """Inverse of to_vector (e.g. a row of extract_features_matrix)."""
+        return cls(
+            embedding_similarity=float(vector[0]),
+            token_jaccard=float(vector[1]),
+            trigram_jaccard=float(vector[2]),
+            desc_length_ratio=float(vector[3]),
+            same_category=bool(vector[4] > 0.5),
+            verb_match=bool(vector[5] > 0.5),
+            name_similarity=float(vector[6]),
+        )
+
 
 def extract_features(
     item_a: dict,
@@ -212,7 +404,8 @@ def extract_features(
 
     Args:
         item_a, item_b: Items with 'description', 'name', 'category'
-        embedding_a, embedding_b: Pre-computed embeddings (optional)
+        embedding_a, embedding_b: Pre-computed embeddings (optional; normalized
+            here, so raw vectors are fine)
 
     Returns:
         PairFeatures for ML classification
@@ -222,12 +415,17 @@ def extract_features(
     name_a = item_a.get("name", "") or ""
     name_b = item_b.get("name", "") or ""
 
-    # EMBEDDING SIMILARITY (the key feature)
+    # EMBEDDING SIMILARITY (the key feature): dot product of unit vectors.
+    # Store embeddings are already unit-norm; only caller-supplied ones are normalized.
     if embedding_a is None:
         embedding_a = compute_embedding(desc_a)
+    else:
+        embedding_a = _unit_rows(np.asarray(embedding_a, dtype=np.float32)[None, :])[0]
     if embedding_b is None:
         embedding_b = compute_embedding(desc_b)
-    embedding_similarity = cosine_similarity(embedding_a, embedding_b)
+    else:
+        embedding_b = _unit_rows(np.asarray(embedding_b, dtype=np.float32)[None, :])[0]
+    embedding_similarity = float(np.dot(embedding_a, embedding_b))
 
     # Token Jaccard
     tokens_a = set(desc_a.lower().split())
@@ -272,6 +470,157 @@ def extract_features(
     )
 
 
+@dataclass
+class _TextProfile:
+    """Per-item values reused across every pair in extract_features_matrix."""
+
+    tokens: set[str]
+    trigrams: set[str]
+    verb: str
+    length: int
+    name: str
+    category: object
+
+
+def _profile(item: dict) -> _TextProfile:
+    desc = item.get("description", "") or ""
+    words = desc.split()
+    return _TextProfile(
+        tokens=set(desc.lower().split()),
+        trigrams=set(desc[i : i + 3] for i in range(len(desc) - 2)) if len(desc) >= 3 else set(),
+        verb=words[0].lower() if words else "",
+        length=len(desc),
+        name=(item.get("name", "") or "").lower(),
+        category=item.get("category"),
+    )
+
+
+def _jaccard_matrix(sets_a: list[set[str]], sets_b: list[set[str]]) -> np.ndarray:
+    """Pairwise Jaccard similarity of two lists of sets (0.0 when both are empty)."""
+    vocab: dict[str, int] = {}
+    for s in sets_a + sets_b:
+        for term in s:
+            vocab.setdefault(term, len(vocab))
+
+    def indicator(sets: list[set[str]]):
+        rows = np.repeat(np.arange(len(sets)), [len(s) for s in sets])
+        cols = np.fromiter((vocab[t] for s in sets for t in s), dtype=np.int64, count=len(rows))
+        if _sparse is not None:
+            data = np.ones(len(rows), dtype=np.float64)
+            return _sparse.csr_matrix((data, (rows, cols)), shape=(len(sets), max(len(vocab), 1)))
+        dense = np.zeros((len(sets), max(len(vocab), 1)), dtype=np.float64)
+        dense[rows, cols] = 1.0
+        return dense
+
+    # Intersection sizes via one (sparse) matrix product; counts are exact integers
+    intersection = indicator(sets_a) @ indicator(sets_b).T
+    if _sparse is not None:
+        intersection = intersection.toarray()
+
+    sizes_a = np.array([len(s) for s in sets_a], dtype=np.float64)
+    sizes_b = np.array([len(s) for s in sets_b], dtype=np.float64)
+    union = sizes_a[:, None] + sizes_b[None, :] - intersection
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, intersection / union, 0.0)
+
+
+def _codes(values: list, exclude) -> np.ndarray:
+    """Integer code per value (-1 for the excluded value) for vectorized equality."""
+    lookup: dict = {}
+    return np.array(
+        [-1 if v == exclude else lookup.setdefault(v, len(lookup)) for v in values],
+        dtype=np.int64,
+    )
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize the rows of a matrix (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms >= 1e-8)
+
+
+def extract_features_matrix(
+    items: list[dict],
+    groups: list[dict],
+    item_embeddings: list[np.ndarray] | None = None,
+    group_embeddings: list[np.ndarray] | None = None,
+) -> np.ndarray:
+    """
+    Extract features for every (item, group) pair at once.
+
+    Each item's tokens, trigrams, verb and length are computed once; embedding
+    similarity is a single float32 matmul and the Jaccard features are sparse
+    indicator products. Equivalent to calling extract_features for each pair
+    (similarity agrees to float rounding, the other features exactly).
+
+    Args:
+        items: N items with 'description', 'name', 'category'
+        groups: M items to compare against
+        item_embeddings, group_embeddings: Pre-computed embeddings (optional;
+            missing ones are fetched with one compute_embeddings_batch call)
+
+    Returns:
+        Array of shape (N, M, 7) in PairFeatures.to_vector() column order
+    """
+    n, m = len(items), len(groups)
+    features = np.zeros((n, m, 7))
+    if n == 0 or m == 0:
+        return features
+
+    # Embedding similarity: dot product of unit-norm rows (zero vectors -> 0.0).
+    # Store embeddings are already unit-norm; only caller-supplied ones are normalized.
+    if item_embeddings is not None:
+        item_matrix = _unit_rows(np.asarray(item_embeddings, dtype=np.float32))
+    if group_embeddings is not None:
+        group_matrix = _unit_rows(np.asarray(group_embeddings, dtype=np.float32))
+    if item_embeddings is None or group_embeddings is None:
+        embedded = compute_embeddings_batch(
+            [item.get("description", "") or "" for item in items + groups]
+        )
+        if item_embeddings is None:
+            item_matrix = np.asarray(embedded[:n], dtype=np.float32)
+        if group_embeddings is None:
+            group_matrix = np.asarray(embedded[n:], dtype=np.float32)
+    features[:, :, 0] = item_matrix @ group_matrix.T
+
+    profiles_a = [_profile(item) for item in items]
+    profiles_b = [_profile(group) for group in groups]
+
+    # Token and 3-gram Jaccard
+    features[:, :, 1] = _jaccard_matrix(
+        [p.tokens for p in profiles_a], [p.tokens for p in profiles_b]
+    )
+    features[:, :, 2] = _jaccard_matrix(
+        [p.trigrams for p in profiles_a], [p.trigrams for p in profiles_b]
+    )
+
+    # Length ratio
+    len_a = np.array([p.length for p in profiles_a], dtype=np.float64)[:, None]
+    len_b = np.array([p.length for p in profiles_b], dtype=np.float64)[None, :]
+    max_len = np.maximum(len_a, len_b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features[:, :, 3] = np.where(max_len > 0, np.minimum(len_a, len_b) / max_len, 1.0)
+
+    # Category and verb match (None category / empty verb never match)
+    categories = _codes([p.category for p in profiles_a + profiles_b], exclude=None)
+    verbs = _codes([p.verb for p in profiles_a + profiles_b], exclude="")
+    for column, codes in ((4, categories), (5, verbs)):
+        codes_a, codes_b = codes[:n, None], codes[None, n:]
+        features[:, :, column] = (codes_a == codes_b) & (codes_a >= 0)
+
+    # Name similarity (computed once per distinct name pair)
+    ratios: dict[tuple[str, str], float] = {}
+    for i, pa in enumerate(profiles_a):
+        for j, pb in enumerate(profiles_b):
+            key = (pa.name, pb.name)
+            ratio = ratios.get(key)
+            if ratio is None:
+                ratio = ratios[key] = levenshtein_ratio(pa.name, pb.name)
+            features[i, j, 6] = ratio
+
+    return features
+
+
 def should_add_to_training(
     features: PairFeatures,
     llm_confidence: float,
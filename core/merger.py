@@ -12,8 +12,11 @@ from __future__ import annotations
 import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
+from config import Config
+from core.vector_index import CandidateIndex
 from models.llm_manager import LLMManager
 
 if TYPE_CHECKING:
@@ -227,12 +230,192 @@ Or: {{"group": "NEW", "confidence": <0.0-1.0>}}"""
         return {"group_id": None, "is_new": True, "confidence": 0.5}
 
 
+def classify_item_batch(
+    new_items: list[dict],
+    existing_groups: list[dict],
+    llm: LLMManager,
+    confidence_threshold: float = 0.7,
+) -> list[dict | None]:
+    """
+    Classify several new items against one shared group list in a single prompt.
+
+    Besides an existing group or NEW, an item may be judged the same skill as
+    an earlier item of the batch ("same_as"), so duplicates within the batch
+    are still merged.
+
+    Args:
+        new_items: Dicts with 'name' and 'description'
+        existing_groups: List of dicts with 'id', 'name', 'description'
+        llm: LLMManager instance
+        confidence_threshold: Minimum confidence to accept match (default 0.7)
+
+    Returns:
+        One entry per new item: a classify_item result, optionally with
+        "same_as" (index of the earlier item in new_items it belongs with,
+        instead of "group_id"); None if its answer was missing or malformed
+        (classify it with classify_item instead)
+    """
+    if not new_items:
+        return []
+
+    groups_text = (
+        "\n".join(
+            f"{i + 1}. {g.get('display_name', g['name'])} - {g['description']}"
+            for i, g in enumerate(existing_groups)
+        )
+        or "(none)"
+    )
+    items_text = "\n".join(
+        f"Item {i + 1}: {item['description']}" for i, item in enumerate(new_items)
+    )
+
+    system = "You are a teacher organizing study materials."
+
+    prompt = f"""Classify each new item into an existing group, with an earlier new item, or mark as NEW.
+
+Existing groups:
+{groups_text}
+
+New items:
+{items_text}
+
+Same group = tests the **SAME** skill, would go on the same flashcard.
+NEW = tests a **DIFFERENT** skill, needs separate study.
+An item that tests the same skill as an earlier new item (and no existing group) uses "same_as".
+
+Return JSON with one entry per item:
+{{"items": [{{"item": <item_number>, "group": <group_number>, "confidence": <0.0-1.0>}},
+           {{"item": <item_number>, "group": "NEW", "confidence": <0.0-1.0>}},
+           {{"item": <item_number>, "same_as": <earlier_item_number>, "confidence": <0.0-1.0>}}]}}"""
+
+    results: list[dict | None] = [None] * len(new_items)
+    try:
+        response = llm.generate(
+            prompt=prompt,
+            model="deepseek-reasoner",
+            system=system,
+            temperature=0.0,
+            json_mode=True,
+        )
+        if not response or not response.text:
+            logger.warning("Empty response from classify_item_batch")
+            return results
+        entries = json.loads(response.text).get("items")
+    except Exception as e:
+        logger.warning(f"classify_item_batch failed: {e}")
+        return results
+
+    for entry in entries if isinstance(entries, list) else []:
+        try:
+            index = int(entry["item"]) - 1  # Convert 1-indexed to 0-indexed
+            confidence = float(entry.get("confidence", 0.5))
+            if not 0 <= index < len(new_items) or results[index] is not None:
+                continue
+            if not 0.0 <= confidence <= 1.0:
+                continue
+
+            if entry.get("same_as") is not None:
+                target = int(entry["same_as"]) - 1
+                if not 0 <= target < index:
+                    continue
+                result = {
+                    "group_id": None,
+                    "is_new": False,
+                    "confidence": confidence,
+                    "same_as": target,
+                }
+            elif entry.get("group") == "NEW" or entry.get("group") is None:
+                result = {"group_id": None, "is_new": True, "confidence": confidence}
+            else:
+                group_idx = int(entry["group"]) - 1
+                if not 0 <= group_idx < len(existing_groups):
+                    continue
+                result = {
+                    "group_id": existing_groups[group_idx]["id"],
+                    "is_new": False,
+                    "confidence": confidence,
+                }
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue  # Malformed entry: that item falls back to classify_item
+
+        if not result["is_new"] and confidence < confidence_threshold:
+            # Low confidence, treat as new
+            result = {"group_id": None, "is_new": True, "confidence": confidence}
+        results[index] = result
+
+    malformed = sum(result is None for result in results)
+    if malformed:
+        logger.info(f"classify_item_batch: {malformed}/{len(new_items)} items need a retry")
+    return results
+
+
+def _category_context(
+    existing_categories: list[str], display_categories: list[str]
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """What assign_category reads from the category lists: prompt list and fallback."""
+    return tuple(display_categories or existing_categories), tuple(existing_categories[:1])
+
+
+def _assign_categories(
+    items: list[dict],
+    existing_categories: list[str],
+    display_categories: list[str],
+    llm: LLMManager,
+    pool: ThreadPoolExecutor,
+    window: int,
+) -> None:
+    """
+    Assign categories to items without one, with the same results as one-by-one.
+
+    Each item's assignment only depends on the category context it sees (see
+    _category_context). Up to `window` items are assigned concurrently against
+    the current context and committed in order; once a commit changes the
+    context (a new category when the prompt lists existing_categories, or the
+    very first category), the rest of the window is re-assigned against the
+    new one. With display categories the context never changes.
+
+    Args:
+        items: Items to categorize (updated in place)
+        existing_categories: Known categories (snake_case), extended in place
+        display_categories: Title Case categories for the prompt
+        llm: LLMManager instance
+        pool: Executor for the LLM calls
+        window: Max assignments in flight
+    """
+    pending = [item for item in items if not item.get("category")]
+    while pending:
+        context = _category_context(existing_categories, display_categories)
+        # The first category is generated from scratch and changes every prompt
+        batch = pending[:window] if existing_categories else pending[:1]
+        snapshot = list(existing_categories)
+        futures = [
+            pool.submit(assign_category, item, snapshot, llm, display_categories) for item in batch
+        ]
+
+        done = 0
+        for item, future in zip(batch, futures):
+            if _category_context(existing_categories, display_categories) != context:
+                break
+            item_category, _ = future.result()
+            item["category"] = item_category
+            if item_category not in existing_categories:
+                existing_categories.append(item_category)
+            done += 1
+        for future in futures[done:]:
+            future.cancel()
+        pending = pending[done:]
+
+
 def classify_items(
     new_items: list[dict],
     existing_groups: list[dict],
     llm: LLMManager,
     confidence_threshold: float = 0.7,
     active_classifier: ActiveClassifier | None = None,
+    max_candidates: int | None = None,
+    candidate_index: CandidateIndex | None = None,
+    max_concurrency: int | None = None,
+    batch_size: int | None = None,
 ) -> tuple[list[dict], list[tuple[int, int]]]:
     """
     Classify new items into existing groups using O(N) classification.
@@ -245,12 +428,31 @@ def classify_items(
     When active_classifier is provided, uses ML predictions to skip LLM calls
     for high-confidence cases (70-90% reduction in LLM calls).
 
+    Large categories are narrowed to the top-k most similar groups (by
+    description embedding) before scoring or prompting.
+
+    Runs as a staged concurrent pipeline with the same results as processing
+    items one by one (with batch_size 1):
+    1. Category assignment runs concurrently (see _assign_categories)
+    2. Categories are classified concurrently; items of one category run in order
+       (categories run one at a time with an active_classifier, whose learner
+       and decision graph are shared across categories)
+    3. Names and descriptions of changed groups are regenerated concurrently
+
     Args:
         new_items: List of dicts with 'id', 'name', 'description', optional 'category'
         existing_groups: List of dicts with 'id', 'name', 'description', 'items', optional 'category'
         llm: LLMManager instance
         confidence_threshold: Minimum confidence to accept match
         active_classifier: Optional ActiveClassifier for ML-based predictions
+        max_candidates: Max groups compared per item (default
+            Config.MERGER_MAX_CANDIDATES; 0 = compare against all)
+        candidate_index: Optional CandidateIndex to reuse across calls
+        max_concurrency: Max concurrent LLM calls (default
+            Config.LLM_MAX_CONCURRENCY; 1 = sequential)
+        batch_size: New items of a category classified per prompt when no
+            active_classifier is given (default Config.MERGER_CLASSIFY_BATCH_SIZE;
+            1 = one prompt per item, see classify_item_batch)
 
     Returns:
         Tuple of:
@@ -282,81 +484,166 @@ def classify_items(
     existing_categories = list(set(g["category"] for g in groups if g.get("category")))
     display_categories = [snake_to_title(c) for c in existing_categories]
 
+    if max_candidates is None:
+        max_candidates = Config.MERGER_MAX_CANDIDATES
+    reuse_index = candidate_index is not None
+    if max_candidates and candidate_index is None:
+        candidate_index = CandidateIndex()  # Created up front: shared by category workers
+    workers = max(1, max_concurrency or Config.LLM_MAX_CONCURRENCY)
+    if batch_size is None:
+        batch_size = Config.MERGER_CLASSIFY_BATCH_SIZE
+    batch_size = 1 if active_classifier else max(1, batch_size)
+
     # LLM classify function for active learning fallback
     def llm_classify_fn(item: dict, candidate_groups: list[dict]) -> dict:
         return classify_item(item, candidate_groups, llm, confidence_threshold)
 
-    # Process each new item
-    for item in new_items:
-        # Step 1: Assign category (if not already set)
-        item_category = item.get("category")
-        if not item_category:
-            item_category, is_new = assign_category(item, existing_categories, llm, display_categories)
-            item["category"] = item_category
-            if item_category not in existing_categories:
-                existing_categories.append(item_category)
+    # Per item: (classification result, new group or matched group)
+    outcomes: list[tuple[dict, dict | None] | None] = [None] * len(new_items)
 
-        # Step 2: Filter groups to same category
-        same_category_groups = [g for g in groups if g.get("category") == item_category]
+    def candidates_for(item: dict, category_groups: list[dict]) -> list[dict]:
+        # Narrow large categories to nearest-neighbour candidates
+        if max_candidates and len(category_groups) > max_candidates:
+            return candidate_index.candidates(item, category_groups, max_candidates)
+        return category_groups
 
-        # Step 3: Classify within category (using active learning if available)
-        if same_category_groups:
-            if active_classifier:
-                # Use active learning - may skip LLM calls
-                al_result = active_classifier.classify(item, same_category_groups, llm_classify_fn)
-                result = {
-                    "is_new": al_result.is_new,
-                    "group_id": al_result.group_id,
-                    "confidence": al_result.confidence,
+    def classify_category(category: str, indices: list[int]):
+        # Only groups of this category are read or modified here
+        category_groups = [g for g in groups if g.get("category") == category]
+        category_by_id = {g["id"]: g for g in category_groups}
+
+        for start in range(0, len(indices), batch_size):
+            batch = indices[start : start + batch_size]
+
+            # Batched mode: one prompt for the batch over the union of its candidates
+            batch_results: list[dict | None] = [None] * len(batch)
+            if len(batch) > 1:
+                shared = {
+                    g["id"] for i in batch for g in candidates_for(new_items[i], category_groups)
                 }
-            else:
-                # Direct LLM call
-                result = classify_item(item, same_category_groups, llm, confidence_threshold)
-        else:
-            result = {"is_new": True, "group_id": None, "confidence": 1.0}
-
-        if result["is_new"]:
-            # Create new group with this item (in this category)
-            new_group = {
-                "id": item["id"],
-                "name": item["name"],
-                "display_name": item.get("display_name", item["name"]),
-                "description": item["description"],
-                "category": item_category,
-                "items": [item],
-            }
-            groups.append(new_group)
-            group_by_id[new_group["id"]] = new_group
-            logger.info(f"New group created: {item['name']} (category: {item_category})")
+                batch_results = classify_item_batch(
+                    [new_items[i] for i in batch],
+                    [g for g in category_groups if g["id"] in shared],
+                    llm,
+                    confidence_threshold,
+                )
+            batch_groups: list[dict | None] = []  # Group of each batch item so far
+
+            for i, result in zip(batch, batch_results):
+                item = new_items[i]
+
+                if result is not None and "same_as" in result:
+                    # Same skill as an earlier item of this batch: join its group
+                    target = batch_groups[result["same_as"]]
+                    result = {
+                        "is_new": target is None,
+                        "group_id": target["id"] if target else None,
+                        "confidence": result["confidence"],
+                    }
+                elif result is None:
+                    # Classify within category (using active learning if available)
+                    candidate_groups = candidates_for(item, category_groups)
+                    if candidate_groups:
+                        if active_classifier:
+                            # Use active learning - may skip LLM calls
+                            al_result = active_classifier.classify(
+                                item, candidate_groups, llm_classify_fn
+                            )
+                            result = {
+                                "is_new": al_result.is_new,
+                                "group_id": al_result.group_id,
+                                "confidence": al_result.confidence,
+                            }
+                        else:
+                            # Direct LLM call
+                            result = classify_item(
+                                item, candidate_groups, llm, confidence_threshold
+                            )
+                    else:
+                        result = {"is_new": True, "group_id": None, "confidence": 1.0}
+
+                if result["is_new"]:
+                    # Create new group with this item (in this category)
+                    group = {
+                        "id": item["id"],
+                        "name": item["name"],
+                        "display_name": item.get("display_name", item["name"]),
+                        "description": item["description"],
+                        "category": category,
+                        "items": [item],
+                    }
+                    category_groups.append(group)
+                    category_by_id[group["id"]] = group
+                else:
+                    # Add to existing group
+                    group = category_by_id.get(result["group_id"])
+                    if group:
+                        group["items"].append(item)
+                outcomes[i] = (result, group)
+                batch_groups.append(group)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="merger") as pool:
+        # Stage 1: Assign categories (if not already set)
+        _assign_categories(new_items, existing_categories, display_categories, llm, pool, workers)
+
+        # Stage 2: Classify, one task per category (items in order within it)
+        by_category: dict[str, list[int]] = {}
+        for i, item in enumerate(new_items):
+            by_category.setdefault(item["category"], []).append(i)
+        if active_classifier:
+            # Decisions in one category feed predictions in the next: keep them ordered
+            for category, indices in by_category.items():
+                classify_category(category, indices)
         else:
-            # Add to existing group
-            group_id = result["group_id"]
-            group = group_by_id.get(group_id)
-            if group:
-                group["items"].append(item)
-                changed_group_ids.add(group_id)
-                assignments.append((item["id"], group_id))
+            for future in [
+                pool.submit(classify_category, category, indices)
+                for category, indices in by_category.items()
+            ]:
+                future.result()
+
+        # Apply outcomes in item order (same groups order as one-by-one)
+        for item, (result, group) in zip(new_items, outcomes):
+            if result["is_new"]:
+                groups.append(group)
+                group_by_id[group["id"]] = group
+                logger.info(f"New group created: {item['name']} (category: {item['category']})")
+            elif group:
+                changed_group_ids.add(group["id"])
+                assignments.append((item["id"], group["id"]))
                 logger.info(
                     f"Item '{item['name']}' -> group '{group['name']}' "
-                    f"(category: {item_category}, conf: {result['confidence']:.2f})"
+                    f"(category: {item['category']}, conf: {result['confidence']:.2f})"
                 )
 
-    # Regenerate name/description for changed groups
-    for group_id in changed_group_ids:
-        group = group_by_id.get(group_id)
-        if not group or len(group["items"]) < 2:
-            continue
-
-        # Get canonical name (keep snake_case for storage/dedup)
-        item_names = [item["name"] for item in group["items"]]
-        group["name"] = get_canonical_name(item_names, llm)
-
-        # Regenerate description
-        item_descriptions = [item["description"] for item in group["items"] if item.get("description")]
-        if item_descriptions:
-            group["description"] = regenerate_description(item_descriptions, llm)
-
-        logger.info(f"Regenerated group: {group['name']} ({len(group['items'])} items)")
+        # Stage 3: Regenerate name/description for changed groups
+        regenerated = []
+        for group_id in changed_group_ids:
+            group = group_by_id.get(group_id)
+            if not group or len(group["items"]) < 2:
+                continue
+
+            # Get canonical name (keep snake_case for storage/dedup)
+            item_names = [item["name"] for item in group["items"]]
+            item_descriptions = [
+                item["description"] for item in group["items"] if item.get("description")
+            ]
+            name_future = pool.submit(get_canonical_name, item_names, llm)
+            description_future = None
+            if item_descriptions:
+                description_future = pool.submit(regenerate_description, item_descriptions, llm)
+            regenerated.append((group, name_future, description_future))
+
+        for group, name_future, description_future in regenerated:
+            group["name"] = name_future.result()
+            if description_future is not None:
+                group["description"] = description_future.result()
+            logger.info(f"Regenerated group: {group['name']} ({len(group['items'])} items)")
+
+    # Re-embed regenerated descriptions so a reused index stays current
+    if reuse_index:
+        candidate_index.sync(
+            [g for g in groups if g["id"] in changed_group_ids and g["id"] in candidate_index]
+        )
 
     # Log active learning stats if used
     if active_classifier:
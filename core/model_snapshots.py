@@ -0,0 +1,180 @@
+"""
+Versioned on-disk snapshots of the active learning committee.
+
+Each snapshot is a directory of CatBoost ``.cbm`` files plus a
+``manifest.json`` recording the training-set hash, sample count, feature
+schema and hyperparameters. ``current.json`` points at the latest snapshot, so
+a process starting with unchanged (or barely changed) training data loads the
+committee instead of refitting it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from dataclasses import fields
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from config import Config
+from core.features import PairFeatures
+
+if TYPE_CHECKING:
+    from core.active_learning import CatBoostActiveLearner
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout changes
+SNAPSHOT_FORMAT = 1
+
+# Column order of the feature vectors the committee was trained on
+FEATURE_SCHEMA = [f.name for f in fields(PairFeatures)]
+
+
+def training_hash(X: np.ndarray, y: np.ndarray) -> str:
+    """Content hash of a training set (features and labels, in order)."""
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.int64)
+    digest = hashlib.sha256()
+    digest.update(repr(X.shape).encode())
+    digest.update(X.tobytes())
+    digest.update(y.tobytes())
+    return digest.hexdigest()
+
+
+def _write_json(path: Path, data: dict):
+    """Write JSON atomically (temp file + rename)."""
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+class ModelSnapshotStore:
+    """Saves and reloads fitted committees.
+
+    Example:
+        snapshots = ModelSnapshotStore()
+        if snapshots.restore(learner, X, y, max_new_samples=50) is None:
+            learner.fit(X, y)
+            snapshots.save(learner, X, y)
+    """
+
+    def __init__(self, path: Path | None = None, keep: int = 3):
+        """
+        Args:
+            path: Directory holding snapshot subdirectories and current.json
+                (default: Config.ACTIVE_LEARNING_MODEL_PATH)
+            keep: Number of most recent snapshots kept on disk
+        """
+        self.path = Path(path or Config.ACTIVE_LEARNING_MODEL_PATH)
+        self.keep = keep
+
+    def current(self) -> Optional[dict]:
+        """Manifest of the latest snapshot, or None if there is none (or it is unreadable)."""
+        try:
+            pointer = json.loads((self.path / "current.json").read_text())
+            snapshot_dir = self.path / pointer["snapshot"]
+            manifest = json.loads((snapshot_dir / "manifest.json").read_text())
+        except (OSError, ValueError, KeyError):
+            return None
+        manifest["path"] = str(snapshot_dir)
+        return manifest
+
+    def save(self, learner: "CatBoostActiveLearner", X: np.ndarray, y: np.ndarray) -> Path:
+        """Write a snapshot of a fitted learner and make it current.
+
+        Args:
+            learner: Fitted committee
+            X, y: Training set the committee was fitted on
+
+        Returns:
+            Snapshot directory
+        """
+        digest = training_hash(X, y)
+        name = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{digest[:12]}"
+        snapshot_dir = self.path / name
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+        members = learner.save_models(snapshot_dir)
+        _write_json(
+            snapshot_dir / "manifest.json",
+            {
+                "format": SNAPSHOT_FORMAT,
+                "created_at": datetime.utcnow().isoformat(),
+                "training_hash": digest,
+                "n_samples": len(X),
+                "feature_schema": FEATURE_SCHEMA,
+                "n_estimators": learner.n_estimators,
+                "params": learner.params_fingerprint(),
+                "members": members,
+            },
+        )
+        _write_json(self.path / "current.json", {"snapshot": name})
+        self._prune(keep=name)
+        logger.info(f"Saved committee snapshot {name} ({len(X)} samples)")
+        return snapshot_dir
+
+    def restore(
+        self,
+        learner: "CatBoostActiveLearner",
+        X: np.ndarray,
+        y: np.ndarray,
+        max_new_samples: int = 0,
+    ) -> int | None:
+        """Load the current snapshot into learner if it fits this training set.
+
+        The snapshot is used when it was trained on a prefix of (X, y) that is
+        missing fewer than max_new_samples records (or on exactly (X, y)), with
+        the same feature schema and hyperparameters.
+
+        Args:
+            learner: Learner to load the committee into
+            X, y: Current training set
+            max_new_samples: Records added since the snapshot that are tolerated
+
+        Returns:
+            Number of samples the loaded committee was trained on, or None if
+            no snapshot fits (refit needed)
+        """
+        manifest = self.current()
+        if manifest is None:
+            return None
+
+        n = manifest.get("n_samples", -1)
+        new_samples = len(X) - n
+        if (
+            manifest.get("format") != SNAPSHOT_FORMAT
+            or manifest.get("feature_schema") != FEATURE_SCHEMA
+            or manifest.get("n_estimators") != learner.n_estimators
+            or manifest.get("params") != learner.params_fingerprint()
+            or not 0 <= new_samples < max(max_new_samples, 1)
+            or training_hash(X[:n], y[:n]) != manifest.get("training_hash")
+        ):
+            return None
+
+        try:
+            learner.load_models(Path(manifest["path"]), manifest["members"], X, y)
+        except Exception as e:
+            logger.warning(f"Failed to load committee snapshot {manifest['path']}: {e}")
+            return None
+
+        logger.info(
+            f"Loaded committee snapshot {Path(manifest['path']).name} "
+            f"({n} samples, {new_samples} newer records)"
+        )
+        return n
+
+    def _prune(self, keep: str):
+        """Delete all but the newest snapshots (never the one just written)."""
+        snapshots = sorted(
+            (p for p in self.path.iterdir() if p.is_dir() and (p / "manifest.json").exists()),
+            key=lambda p: p.name,
+            reverse=True,
+        )
+        for old in snapshots[self.keep :]:
+            if old.name != keep:
+                shutil.rmtree(old, ignore_errors=True)
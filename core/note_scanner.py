@@ -164,6 +164,7 @@ def _call_vlm_for_ocr(images: List[bytes]) -> str:
     import requests
 
     from config import Config
+    from models.http_clients import get_session
 
     logger = logging.getLogger(__name__)
 
@@ -190,7 +191,7 @@ def _call_vlm_for_ocr(images: List[bytes]) -> str:
     model = Config.OPENROUTER_VLM_MODEL
 
     try:
-        response = requests.post(
+        response = get_session().post(
             "https://openrouter.ai/api/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
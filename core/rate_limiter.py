@@ -2,24 +2,37 @@
 Generic rate limiting tracker for LLM API providers.
 
 This module provides provider-agnostic rate limiting with:
-- Sliding window tracking
+- Sliding window tracking with running totals (constant-time checks)
 - Request and token counting
 - Thread-safe operations
-- Persistent caching across CLI runs
+- Non-blocking asyncio admission (FIFO waiters)
+- Persistent caching across CLI runs (debounced background flush)
 - Configurable limits per provider
+- Optional SQLite backend shared by all processes on a host
 """
 
+import asyncio
+import atexit
 import json
 import logging
+import os
+import sqlite3
 import threading
 import time
+import weakref
 from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Seconds to coalesce state changes before writing the cache file
+FLUSH_INTERVAL = 2.0
+
+# Trackers with unsaved state, flushed at interpreter exit
+_live_trackers: "weakref.WeakSet[RateLimitTracker]" = weakref.WeakSet()
+
 
 @dataclass
 class UsageWindow:
@@ -27,13 +40,20 @@ class UsageWindow:
 
     requests: deque  # Timestamps of requests
     tokens: deque  # (timestamp, token_count) tuples
+    token_total: int  # Running sum of token counts in `tokens`
     last_reset: float  # Last reset timestamp
 
     def __init__(self):
         self.requests = deque()
         self.tokens = deque()
+        self.token_total = 0
         self.last_reset = time.time()
 
+    def add_tokens(self, timestamp: float, count: int):
+        """Append a token entry and update the running total."""
+        self.tokens.append((timestamp, count))
+        self.token_total += count
+
 
 @dataclass
 class ProviderLimits:
@@ -54,7 +74,7 @@ class RateLimitTracker:
     Features:
     - Sliding window rate limiting (not fixed minute boundaries)
     - Thread-safe operations
-    - Persistent state across CLI runs
+    - Persistent state across CLI runs (debounced background flush)
     - Configurable per-provider limits
     - Automatic cleanup of old entries
 
@@ -68,9 +88,11 @@ class RateLimitTracker:
 
         # Before making request
         wait_time = tracker.wait_if_needed("groq")
+        # ...or from a coroutine, without blocking the event loop
+        wait_time = await tracker.wait_if_needed_async("groq")
 
-        # After request completes
-        tracker.record_request("groq", tokens_used=150)
+        # After request completes (slot was reserved by the wait above)
+        tracker.record_request("groq", tokens_used=150, count_request=False)
     """
 
     def __init__(self, provider_limits: Dict[str, Dict], cache_path: Optional[Path] = None):
@@ -87,6 +109,12 @@ class RateLimitTracker:
         self.limits = {name: ProviderLimits(**limits) for name, limits in provider_limits.items()}
         self.usage: Dict[str, UsageWindow] = {}
         self.lock = threading.RLock()
+        # FIFO queues of asyncio waiters per provider (futures may belong to different loops)
+        self._async_waiters: Dict[str, deque] = {}
+        # Debounced persistence: state changes mark dirty, a timer writes the file
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._write_lock = threading.Lock()  # One snapshot-write-rename at a time
 
         # Setup cache
         if cache_path is None:
@@ -98,6 +126,7 @@ class RateLimitTracker:
 
         # Load cached state
         self._load_cache()
+        _live_trackers.add(self)
 
     def _load_cache(self):
         """Load cached usage data from disk."""
@@ -126,7 +155,7 @@ class RateLimitTracker:
                 for entry in data.get("tokens", []):
                     timestamp, count = entry
                     if current_time - timestamp < 60:
-                        window.tokens.append((timestamp, count))
+                        window.add_tokens(timestamp, count)
 
                 window.last_reset = data.get("last_reset", current_time)
                 self.usage[provider] = window
@@ -137,21 +166,53 @@ class RateLimitTracker:
 
     def _save_cache(self):
         """Save usage data to disk for persistence."""
-        try:
-            cache_data = {}
-
-            for provider, window in self.usage.items():
-                cache_data[provider] = {
-                    "requests": list(window.requests),
-                    "tokens": list(window.tokens),
-                    "last_reset": window.last_reset,
-                }
-
-            with open(self.cache_path, "w") as f:
-                json.dump(cache_data, f, indent=2)
+        # Timer and explicit/atexit flushes may overlap: the later snapshot wins
+        with self._write_lock:
+            with self.lock:
+                cache_data = {}
+
+                for provider, window in self.usage.items():
+                    cache_data[provider] = {
+                        "requests": list(window.requests),
+                        "tokens": list(window.tokens),
+                        "last_reset": window.last_reset,
+                    }
+                self._dirty = False
+
+            try:
+                # Write-then-rename so readers never see a partial file
+                tmp_path = self.cache_path.with_name(
+                    f"{self.cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+                )
+                with open(tmp_path, "w") as f:
+                    json.dump(cache_data, f, separators=(",", ":"))
+                os.replace(tmp_path, self.cache_path)
+
+            except Exception as e:
+                logger.warning(f"Failed to save rate limit cache: {e}")
+
+    def _mark_dirty(self):
+        """Schedule a cache write, coalescing changes within FLUSH_INTERVAL. Caller holds lock."""
+        self._dirty = True
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FLUSH_INTERVAL, self._flush_from_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush_from_timer(self):
+        with self.lock:
+            self._flush_timer = None
+        self.flush()
 
-        except Exception as e:
-            logger.warning(f"Failed to save rate limit cache: {e}")
+    def flush(self):
+        """Write pending usage state to disk now (no-op if nothing changed)."""
+        with self.lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+        self._save_cache()
 
     def _get_or_create_window(self, provider: str) -> UsageWindow:
         """Get or create usage window for provider."""
@@ -169,7 +230,7 @@ class RateLimitTracker:
 
         # Clean tokens
         while window.tokens and window.tokens[0][0] < cutoff_time:
-            window.tokens.popleft()
+            window.token_total -= window.tokens.popleft()[1]
 
     def check_limit(self, provider: str) -> bool:
         """Check if provider is within rate limits.
@@ -190,54 +251,156 @@ class RateLimitTracker:
             if not limits.has_limits():
                 return True  # No limits
 
-            window = self._get_or_create_window(provider)
-            current_time = time.time()
-
-            # Clean old entries
-            self._cleanup_old_entries(window, current_time)
+            requests_used, tokens_used, _, _ = self._usage(provider, time.time())
 
             # Check request limit
             if limits.requests_per_minute is not None:
-                if len(window.requests) >= limits.requests_per_minute:
+                if requests_used >= limits.requests_per_minute:
                     return False
 
             # Check token limit
             if limits.tokens_per_minute is not None:
-                total_tokens = sum(count for _, count in window.tokens)
-                if total_tokens >= limits.tokens_per_minute:
+                if tokens_used >= limits.tokens_per_minute:
                     return False
 
             return True
 
-    def record_request(self, provider: str, tokens_used: int = 0):
+    def record_request(self, provider: str, tokens_used: int = 0, count_request: bool = True):
         """Record a request for rate tracking.
 
         Args:
             provider: Provider name
             tokens_used: Number of tokens used (if available)
+            count_request: Set False when the request slot was already reserved
+                by wait_if_needed() / wait_if_needed_async()
         """
         with self.lock:
             if provider not in self.limits:
                 return  # Skip if provider not configured
 
-            window = self._get_or_create_window(provider)
-            current_time = time.time()
+            self._record(provider, time.time(), 1 if count_request else 0, tokens_used)
+
+    def wait_if_needed(self, provider: str) -> float:
+        """Wait until the provider has capacity and reserve a request slot.
+
+        Because the slot is reserved here, callers should record the completed
+        call with ``record_request(..., count_request=False)``.
+
+        Args:
+            provider: Provider name
+
+        Returns:
+            Time waited in seconds (0 if no wait needed)
+        """
+        # Check if provider has limits
+        if provider not in self.limits or not self.limits[provider].has_limits():
+            return 0.0
+
+        waited = 0.0
+        while True:
+            delay = self._reserve(provider)
+            if delay <= 0:
+                return waited
+
+            # Sleep outside the lock so other providers and threads are not stalled
+            logger.info(f"Rate limit reached for '{provider}', waiting {delay:.1f}s")
+            time.sleep(delay)
+            waited += delay
+
+    def _usage(
+        self, provider: str, current_time: float
+    ) -> Tuple[int, int, Optional[float], Optional[float]]:
+        """Usage in the last 60 seconds. Caller holds lock.
 
-            # Record request
+        Returns:
+            Tuple of (requests, tokens, oldest request timestamp, oldest token timestamp)
+        """
+        window = self._get_or_create_window(provider)
+        self._cleanup_old_entries(window, current_time)
+        return (
+            len(window.requests),
+            window.token_total,
+            window.requests[0] if window.requests else None,
+            window.tokens[0][0] if window.tokens else None,
+        )
+
+    def _record(self, provider: str, current_time: float, requests: int, tokens: int):
+        """Add requests/tokens to the provider's window. Caller holds lock."""
+        window = self._get_or_create_window(provider)
+
+        # Record request
+        if requests:
             window.requests.append(current_time)
 
-            # Record tokens if provided
-            if tokens_used > 0:
-                window.tokens.append((current_time, tokens_used))
+        # Record tokens if provided
+        if tokens > 0:
+            window.add_tokens(current_time, tokens)
 
-            # Clean old entries
-            self._cleanup_old_entries(window, current_time)
+        # Clean old entries
+        self._cleanup_old_entries(window, current_time)
 
-            # Save to cache
-            self._save_cache()
+        # Save to cache (debounced)
+        self._mark_dirty()
 
-    def wait_if_needed(self, provider: str) -> float:
-        """Wait if rate limit would be exceeded. Returns wait time.
+    def _time_until_available(self, provider: str, current_time: float) -> float:
+        """Seconds until provider has capacity (0 if available now). Caller holds lock."""
+        limits = self.limits[provider]
+        requests_used, tokens_used, oldest_request, oldest_token = self._usage(
+            provider, current_time
+        )
+
+        oldest_timestamp = None
+        if limits.requests_per_minute and requests_used >= limits.requests_per_minute:
+            oldest_timestamp = oldest_request
+
+        if limits.tokens_per_minute and oldest_token is not None:
+            if tokens_used >= limits.tokens_per_minute:
+                if oldest_timestamp is None or oldest_token < oldest_timestamp:
+                    oldest_timestamp = oldest_token
+
+        if oldest_timestamp is None:
+            return 0.0
+        # Wait until oldest entry expires (60 seconds old)
+        return max(0.0, 60 - (current_time - oldest_timestamp) + 0.1)  # Add buffer
+
+    def _reserve(self, provider: str) -> float:
+        """Reserve a request slot if capacity is available.
+
+        Returns:
+            0 if a slot was reserved, otherwise seconds until one may free up
+        """
+        with self.lock:
+            current_time = time.time()
+            delay = self._time_until_available(provider, current_time)
+            if delay <= 0:
+                self._record(provider, current_time, 1, 0)
+            return delay
+
+    async def _reserve_async(self, provider: str) -> float:
+        """_reserve() for the event loop (in-memory windows: cheap enough to run inline)."""
+        return self._reserve(provider)
+
+    @staticmethod
+    def _wake(waiter: "asyncio.Future"):
+        """Wake an asyncio waiter from any thread."""
+
+        def _set():
+            if not waiter.done():
+                waiter.set_result(None)
+
+        try:
+            waiter.get_loop().call_soon_threadsafe(_set)
+        except RuntimeError:
+            pass  # Waiter's loop is closed
+
+    async def wait_if_needed_async(self, provider: str) -> float:
+        """Await rate limit capacity without blocking the event loop.
+
+        Waiters are admitted in FIFO order: only the head of the queue polls the
+        window, and each admission reserves a request slot so that one freed slot
+        admits exactly one waiter. Because the slot is reserved here, callers
+        should record the completed call with ``record_request(...,
+        count_request=False)``. Other providers are never blocked.
 
         Args:
             provider: Provider name
@@ -245,51 +408,41 @@ class RateLimitTracker:
         Returns:
             Time waited in seconds (0 if no wait needed)
         """
-        with self.lock:
-            # Check if provider has limits
-            if provider not in self.limits:
-                return 0.0
+        if provider not in self.limits or not self.limits[provider].has_limits():
+            return 0.0
 
-            limits = self.limits[provider]
-            if not limits.has_limits():
-                return 0.0
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        ticket = loop.create_future()
 
-            window = self._get_or_create_window(provider)
-            current_time = time.time()
+        with self.lock:
+            queue = self._async_waiters.setdefault(provider, deque())
+            queue.append(ticket)
+            waited = queue[0] is not ticket
+            if not waited:
+                ticket.set_result(None)  # Head of line: proceed immediately
 
-            # Clean old entries
-            self._cleanup_old_entries(window, current_time)
-
-            # Check if we need to wait
-            if not self.check_limit(provider):
-                # Calculate wait time
-                oldest_timestamp = None
-
-                # Check which limit we're hitting
-                if (
-                    limits.requests_per_minute
-                    and len(window.requests) >= limits.requests_per_minute
-                ):
-                    oldest_timestamp = window.requests[0]
-
-                if limits.tokens_per_minute:
-                    total_tokens = sum(count for _, count in window.tokens)
-                    if total_tokens >= limits.tokens_per_minute and window.tokens:
-                        token_timestamp = window.tokens[0][0]
-                        if oldest_timestamp is None or token_timestamp < oldest_timestamp:
-                            oldest_timestamp = token_timestamp
-
-                if oldest_timestamp:
-                    # Wait until oldest entry expires (60 seconds old)
-                    wait_time = 60 - (current_time - oldest_timestamp) + 0.1  # Add buffer
-                    if wait_time > 0:
-                        logger.info(
-                            f"Rate limit reached for '{provider}', waiting {wait_time:.1f}s"
-                        )
-                        time.sleep(wait_time)
-                        return wait_time
-
-        return 0.0
+        try:
+            await ticket
+            while True:
+                # Reserve the slot before handing over to the next waiter
+                delay = await self._reserve_async(provider)
+                if delay <= 0:
+                    break
+                logger.info(f"Rate limit reached for '{provider}', waiting {delay:.1f}s (async)")
+                waited = True
+                await asyncio.sleep(delay)
+        finally:
+            with self.lock:
+                was_head = bool(queue) and queue[0] is ticket
+                try:
+                    queue.remove(ticket)
+                except ValueError:
+                    pass
+                if was_head and queue:
+                    self._wake(queue[0])
+
+        return time.monotonic() - start if waited else 0.0
 
     def get_usage_stats(self, provider: str) -> Dict[str, Any]:
         """Get current usage statistics.
@@ -318,20 +471,14 @@ class RateLimitTracker:
                     "tokens": {"limit": None, "used": 0, "remaining": "unlimited"},
                 }
 
-            window = self._get_or_create_window(provider)
             current_time = time.time()
 
-            # Clean old entries
-            self._cleanup_old_entries(window, current_time)
-
             # Calculate stats
-            requests_used = len(window.requests)
-            tokens_used = sum(count for _, count in window.tokens)
+            requests_used, tokens_used, oldest, _ = self._usage(provider, current_time)
 
             # Calculate time until reset (based on oldest entry)
             time_until_reset = 0.0
-            if window.requests:
-                oldest = window.requests[0]
+            if oldest is not None:
                 time_until_reset = max(0, 60 - (current_time - oldest))
 
             stats = {
@@ -372,14 +519,14 @@ class RateLimitTracker:
         with self.lock:
             if provider in self.usage:
                 self.usage[provider] = UsageWindow()
-                self._save_cache()
+                self._mark_dirty()
                 logger.info(f"Reset rate limits for '{provider}'")
 
     def reset_all(self):
         """Reset tracking for all providers."""
         with self.lock:
             self.usage.clear()
-            self._save_cache()
+            self._mark_dirty()
             logger.info("Reset rate limits for all providers")
 
     def get_all_stats(self) -> Dict[str, Dict[str, Any]]:
@@ -389,3 +536,164 @@ class RateLimitTracker:
             Dict mapping provider names to their stats
         """
         return {provider: self.get_usage_stats(provider) for provider in self.limits.keys()}
+
+
+_SHARED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_events (
+    id INTEGER PRIMARY KEY,
+    provider TEXT NOT NULL,
+    ts REAL NOT NULL,
+    requests INTEGER NOT NULL,
+    tokens INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rate_events_provider_ts ON rate_events(provider, ts);
+"""
+
+
+class SharedRateLimitTracker(RateLimitTracker):
+    """Rate limit tracker whose usage windows live in a SQLite file.
+
+    All processes on a host that point at the same database (gunicorn workers,
+    concurrent CLI runs) draw from one global per-provider budget. Checking
+    capacity and reserving a slot happen in a single ``BEGIN IMMEDIATE``
+    transaction, so two processes can never both take the last slot.
+
+    Example:
+        tracker = SharedRateLimitTracker(Config.PROVIDER_RATE_LIMITS)
+        tracker.wait_if_needed("deepseek")
+    """
+
+    def __init__(self, provider_limits: Dict[str, Dict], db_path: Optional[Path] = None):
+        """Initialize shared rate limiter.
+
+        Args:
+            provider_limits: Dict mapping provider names to their limits
+            db_path: Optional path for the shared database
+                (default: data/cache/rate_limits.db)
+        """
+        self._local = threading.local()
+        if db_path is None:
+            from config import Config
+
+            Config.ensure_dirs()
+            db_path = Config.RATE_LIMIT_DB_PATH
+        super().__init__(provider_limits, cache_path=Path(db_path))
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get (or open) this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; write transactions are opened explicitly
+            conn = sqlite3.connect(str(self.cache_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _load_cache(self):
+        """Create the shared schema (state itself is read on every check)."""
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(_SHARED_SCHEMA)
+
+    def flush(self):
+        """No-op: every change is committed immediately."""
+
+    def _usage(
+        self, provider: str, current_time: float
+    ) -> Tuple[int, int, Optional[float], Optional[float]]:
+        conn = self._conn()
+        row = conn.execute(
+            """
+            SELECT COALESCE(SUM(requests), 0),
+                   COALESCE(SUM(tokens), 0),
+                   MIN(CASE WHEN requests > 0 THEN ts END),
+                   MIN(CASE WHEN tokens > 0 THEN ts END)
+            FROM rate_events
+            WHERE provider = ? AND ts >= ?
+            """,
+            (provider, current_time - 60),
+        ).fetchone()
+        return row[0], row[1], row[2], row[3]
+
+    def _record(self, provider: str, current_time: float, requests: int, tokens: int):
+        if not requests and tokens <= 0:
+            return
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO rate_events (provider, ts, requests, tokens) VALUES (?, ?, ?, ?)",
+            (provider, current_time, requests, max(tokens, 0)),
+        )
+        conn.execute(
+            "DELETE FROM rate_events WHERE provider = ? AND ts < ?", (provider, current_time - 60)
+        )
+
+    def _reserve(self, provider: str) -> float:
+        with self.lock:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current_time = time.time()
+                delay = self._time_until_available(provider, current_time)
+                if delay <= 0:
+                    self._record(provider, current_time, 1, 0)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return delay
+
+    async def _reserve_async(self, provider: str) -> float:
+        """Run _reserve() in a worker thread: BEGIN IMMEDIATE may wait on other processes."""
+        return await asyncio.to_thread(self._reserve, provider)
+
+    def reset(self, provider: str):
+        """Reset tracking for a provider (for all processes).
+
+        Args:
+            provider: Provider name
+        """
+        with self.lock:
+            self._conn().execute("DELETE FROM rate_events WHERE provider = ?", (provider,))
+            logger.info(f"Reset rate limits for '{provider}'")
+
+    def reset_all(self):
+        """Reset tracking for all providers (for all processes)."""
+        with self.lock:
+            self._conn().execute("DELETE FROM rate_events")
+            logger.info("Reset rate limits for all providers")
+
+
+def create_rate_limiter(
+    provider_limits: Dict[str, Dict], backend: Optional[str] = None
+) -> RateLimitTracker:
+    """Create the rate limit tracker for the configured backend.
+
+    Args:
+        provider_limits: Dict mapping provider names to their limits
+        backend: "local" (per-process, JSON cache) or "shared" (SQLite, shared by
+            all processes on the host). Defaults to Config.RATE_LIMIT_BACKEND.
+
+    Returns:
+        RateLimitTracker instance
+
+    Raises:
+        ValueError: If backend is unknown
+    """
+    if backend is None:
+        from config import Config
+
+        backend = Config.RATE_LIMIT_BACKEND
+
+    if backend == "local":
+        return RateLimitTracker(provider_limits)
+    if backend == "shared":
+        return SharedRateLimitTracker(provider_limits)
+    raise ValueError(f"Unknown rate limit backend '{backend}' (expected 'local' or 'shared')")
+
+
+@atexit.register
+def _flush_live_trackers():
+    """Persist pending rate limit state before the interpreter exits."""
+    for tracker in list(_live_trackers):
+        tracker.flush()
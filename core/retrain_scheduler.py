@@ -0,0 +1,141 @@
+"""
+In-process background retraining for the active learning classifier.
+
+A daemon thread refits the committee when enough new training records have
+arrived, or when pending records have waited too long. The fit runs on a copy
+of the training set with no classifier lock held, and the fitted committee is
+published with a single reference swap, so ``decide()`` keeps using the
+previous committee until then and never waits for a fit.
+"""
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from core.active_learning import ActiveClassifier
+
+logger = logging.getLogger(__name__)
+
+
+class RetrainScheduler:
+    """Retrains an ActiveClassifier on record count or staleness.
+
+    Example:
+        scheduler = RetrainScheduler(classifier, min_new_records=50, max_staleness=600)
+        scheduler.start()
+        ...
+        classifier.record_decision(...)  # calls scheduler.notify()
+        ...
+        scheduler.stop()
+    """
+
+    def __init__(
+        self,
+        classifier: "ActiveClassifier",
+        min_new_records: int = 50,
+        max_staleness: float = 600.0,
+        poll_interval: float = 5.0,
+        early_stopping: bool = True,
+    ):
+        """
+        Args:
+            classifier: Classifier whose committee is retrained
+            min_new_records: Retrain as soon as this many records are pending
+            max_staleness: Retrain pending records that are older than this (seconds)
+            poll_interval: Seconds between staleness checks
+            early_stopping: Fit with fit_with_early_stopping (else plain fit)
+        """
+        self.classifier = classifier
+        self.min_new_records = min_new_records
+        self.max_staleness = max_staleness
+        self.poll_interval = poll_interval
+        self.early_stopping = early_stopping
+
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pending_since: Optional[float] = None
+        self._forced = False  # notify(force=True) since the last retrain
+
+        self.retrains = 0  # Committees published
+        self.last_error: Optional[Exception] = None
+
+    def start(self):
+        """Start the worker thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="al-retrain", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker thread and wait for it (up to timeout seconds)."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def notify(self, force: bool = False):
+        """Signal that a training record was added (cheap; called on the hot path).
+
+        Args:
+            force: Retrain now, however few records are pending
+        """
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+        if force:
+            self._forced = True
+        if force or self.classifier.pending_records >= self.min_new_records:
+            self._wake.set()
+
+    def due(self) -> bool:
+        """Whether a retrain should run now."""
+        pending = self.classifier.pending_records
+        if pending <= 0:
+            return False
+        if self._forced or pending >= self.min_new_records:
+            return True
+        since = self._pending_since
+        return since is not None and time.monotonic() - since >= self.max_staleness
+
+    def retrain_now(self) -> bool:
+        """Fit on the current training set and publish the result.
+
+        Returns:
+            True if a new committee was published
+        """
+        training = self.classifier.training_snapshot()
+        if training is None:
+            return False
+        X, y, generation = training
+
+        self._pending_since = None
+        self._forced = False
+        started = time.perf_counter()
+        published = self.classifier.refit(
+            X, y, early_stopping=self.early_stopping, generation=generation
+        )
+        if published:
+            self.retrains += 1
+            logger.info(
+                f"Retrained committee on {len(X)} samples in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+        if self.classifier.pending_records > 0 and self._pending_since is None:
+            self._pending_since = time.monotonic()  # Records arrived during the fit
+        return published
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stopped.is_set() or not self.due():
+                continue
+            try:
+                self.retrain_now()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                logger.warning(f"Background retrain failed: {e}")
@@ -3,10 +3,24 @@ Transitive inference engine for active learning.
 
 Infers matches from graph of past decisions without LLM calls.
 If A~B with high confidence and B~C with high confidence, infers A~C.
+If A~B and B!~C (both high confidence), infers A!~C.
 """
 
-from collections import deque
-from dataclasses import dataclass, field
+import heapq
+import logging
+import math
+import sqlite3
+import threading
+from dataclasses import InitVar, dataclass, field
+from pathlib import Path
+from threading import Lock, RLock
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterable, Mapping
+
+if TYPE_CHECKING:
+    from storage.database import Database
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -17,13 +31,62 @@ class TransitiveInference:
     If A~B with confidence 0.95 and B~C with confidence 0.9,
     infers A~C with confidence 0.95 * 0.9 = 0.855
 
-    Graph is per-user (stores actual item relationships).
+    Items get compact integer ids. High-confidence match edges are also kept
+    in a disjoint-set index (path compression + union by rank), with
+    high-confidence non-match edges stored as constraints between its
+    components, so pairs that cannot be inferred are rejected in near-constant
+    time before any path search.
+
+    Path searches run once per source item and are cached until an edge
+    touching a node the search reached is added.
+
+    Queries also update the index and the cache, so every public method holds
+    one re-entrant lock; an instance can be shared between threads.
+
+    Graph is per-user (stores actual item relationships). Pass ``graph`` (an
+    item_id -> {neighbor_id: (is_match, confidence)} mapping) to seed edges;
+    the ``graph`` attribute is a read-only snapshot, use add_edge() to change it.
     """
 
     min_confidence: float = 0.75
     max_path_length: int = 3
-    # Graph: item_id -> {neighbor_id: (is_match, confidence)}
-    graph: dict[str, dict[str, tuple[bool, float]]] = field(default_factory=dict)
+    graph: InitVar[Mapping[str, Mapping[str, tuple[bool, float]]] | None] = None
+
+    # Item id <-> compact node id
+    _ids: dict[str, int] = field(default_factory=dict)
+    _names: list[str] = field(default_factory=list)
+    # Adjacency: node -> {neighbor: (is_match, confidence)}
+    _edges: list[dict[int, tuple[bool, float]]] = field(default_factory=list)
+
+    # Disjoint sets over match edges with confidence >= min_confidence
+    _parent: list[int] = field(default_factory=list)
+    _rank: list[int] = field(default_factory=list)
+    _members: dict[int, list[int]] = field(default_factory=dict)  # root -> nodes
+    _conflicts: dict[int, set[int]] = field(default_factory=dict)  # root -> non-match roots
+    _index_stale: bool = False  # An edge was overwritten: rebuild before next query
+
+    # Memoized searches: source -> {target: (is_match, confidence)}
+    _paths: dict[int, dict[int, tuple[bool, float]]] = field(default_factory=dict)
+    _reached: dict[int, set[int]] = field(default_factory=dict)  # source -> nodes searched
+    _reached_by: dict[int, set[int]] = field(default_factory=dict)  # node -> cached sources
+    _lock: RLock = field(default_factory=RLock)  # Guards everything above
+
+    def __post_init__(self, graph: Mapping[str, Mapping[str, tuple[bool, float]]] | None):
+        for item_a, neighbors in (graph or {}).items():
+            for item_b, (is_match, confidence) in neighbors.items():
+                TransitiveInference.add_edge(self, item_a, item_b, is_match, confidence)
+
+    def _node(self, item_id: str) -> int:
+        """Get or allocate the node id of an item."""
+        node = self._ids.get(item_id)
+        if node is None:
+            node = self._ids[item_id] = len(self._names)
+            self._names.append(item_id)
+            self._edges.append({})
+            self._parent.append(node)
+            self._rank.append(0)
+            self._members[node] = [node]
+        return node
 
     def add_edge(
         self,
@@ -33,13 +96,93 @@ class TransitiveInference:
         confidence: float,
     ) -> None:
         """Add a decision edge to the graph."""
-        if item_a not in self.graph:
-            self.graph[item_a] = {}
-        if item_b not in self.graph:
-            self.graph[item_b] = {}
+        with self._lock:
+            a, b = self._node(item_a), self._node(item_b)
+            previous = self._edges[a].get(b)
+            self._edges[a][b] = (is_match, confidence)
+            self._edges[b][a] = (is_match, confidence)
+
+            # Searches that never reached a or b cannot use (or have used) this edge
+            for source in self._reached_by.get(a, set()) | self._reached_by.get(b, set()):
+                self._invalidate(source)
+
+            if previous is not None and previous != (is_match, confidence):
+                # Disjoint sets cannot delete edges: rebuild lazily
+                self._index_stale = True
+            elif not self._index_stale:
+                self._index_edge(a, b, is_match, confidence)
+
+    def load(self, item_ids: Iterable[str]) -> None:
+        """Make sure decisions touching these items are in memory (no-op here)."""
+
+    def _find(self, node: int) -> int:
+        """Root of node's component (with path halving)."""
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def _index_edge(self, a: int, b: int, is_match: bool, confidence: float) -> None:
+        """Add one edge to the disjoint-set index (weak edges are ignored)."""
+        if confidence < self.min_confidence:
+            return
+        root_a, root_b = self._find(a), self._find(b)
+        if not is_match:
+            self._conflicts.setdefault(root_a, set()).add(root_b)
+            self._conflicts.setdefault(root_b, set()).add(root_a)
+            return
+        if root_a == root_b:
+            return
+
+        # Union by rank; the new root inherits members and constraints
+        if self._rank[root_a] < self._rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        if self._rank[root_a] == self._rank[root_b]:
+            self._rank[root_a] += 1
+        self._members[root_a].extend(self._members.pop(root_b))
 
-        self.graph[item_a][item_b] = (is_match, confidence)
-        self.graph[item_b][item_a] = (is_match, confidence)
+        for other in self._conflicts.pop(root_b, ()):
+            other = root_a if other == root_b else other
+            self._conflicts.setdefault(root_a, set()).add(other)
+            constraints = self._conflicts.setdefault(other, set())
+            constraints.discard(root_b)
+            constraints.add(root_a)
+
+    def _rebuild_index(self) -> None:
+        """Rebuild the disjoint-set index from the adjacency lists."""
+        n = len(self._names)
+        self._parent = list(range(n))
+        self._rank = [0] * n
+        self._members = {node: [node] for node in range(n)}
+        self._conflicts = {}
+        self._index_stale = False
+        for a, neighbors in enumerate(self._edges):
+            for b, (is_match, confidence) in neighbors.items():
+                if a < b:
+                    self._index_edge(a, b, is_match, confidence)
+
+    def _roots(self, item_a: str, item_b: str) -> tuple[int, int] | None:
+        """Component roots of two known items, None if either is unknown (caller holds _lock)."""
+        a, b = self._ids.get(item_a), self._ids.get(item_b)
+        if a is None or b is None:
+            return None
+        if self._index_stale:
+            self._rebuild_index()
+        return self._find(a), self._find(b)
+
+    def same_component(self, item_a: str, item_b: str) -> bool:
+        """Whether a chain of high-confidence matches connects the two items."""
+        with self._lock:
+            roots = self._roots(item_a, item_b)
+        return roots is not None and roots[0] == roots[1]
+
+    def known_different(self, item_a: str, item_b: str) -> bool:
+        """Whether a high-confidence non-match separates the items' components."""
+        with self._lock:
+            roots = self._roots(item_a, item_b)
+            return roots is not None and roots[1] in self._conflicts.get(roots[0], ())
 
     def infer(
         self,
@@ -49,76 +192,245 @@ class TransitiveInference:
         """
         Try to infer match between item_a and item_b.
 
-        Uses BFS to find path with highest confidence.
+        A chain of matches infers a match; a chain with exactly one non-match
+        infers a non-match. A direct edge is returned as is; otherwise the
+        highest-confidence chain of at most max_path_length edges wins.
         Returns None if no inference possible.
         """
-        if item_a not in self.graph or item_b not in self.graph:
-            return None
+        with self._lock:
+            roots = self._roots(item_a, item_b)
+            if roots is None:
+                return None
+            a, b = self._ids[item_a], self._ids[item_b]
 
-        # Direct edge?
-        if item_b in self.graph.get(item_a, {}):
-            return self.graph[item_a][item_b]
+            # Direct edge?
+            if b in self._edges[a]:
+                return self._edges[a][b]
 
-        # BFS with confidence propagation
-        # Queue: (current_node, path_confidence, is_match_chain, path_length)
-        queue: deque[tuple[str, float, bool, int]] = deque([(item_a, 1.0, True, 0)])
-        visited = {item_a}
-        best_result: tuple[bool, float] | None = None
+            # Every edge of a qualifying path has confidence >= min_confidence, so
+            # the items must share a component or have conflicting components
+            root_a, root_b = roots
+            if root_a != root_b and root_b not in self._conflicts.get(root_a, ()):
+                return None
 
-        while queue:
-            current, path_conf, is_match_chain, path_len = queue.popleft()
+            # Reuse a search from either end (paths are symmetric)
+            paths = self._paths.get(a)
+            if paths is not None:
+                return paths.get(b)
+            paths = self._paths.get(b)
+            if paths is not None:
+                return paths.get(a)
+            return self._search(a).get(b)
 
-            if path_len >= self.max_path_length:
-                continue
+    def _search(self, source: int) -> dict[int, tuple[bool, float]]:
+        """
+        Best chain from source to every node within max_path_length hops.
 
-            for neighbor, (edge_match, edge_conf) in self.graph.get(current, {}).items():
-                if neighbor in visited:
-                    continue
+        Dijkstra over (node, chain type, hops) states with edge cost
+        -log(confidence), so the first time a target is settled it is via the
+        highest-confidence (max-product) chain. A state is skipped when the same
+        node and chain type was already settled in no more hops, since that
+        chain is at least as strong and can be extended at least as far.
+        The result is cached (caller holds _lock).
+        """
+        max_cost = -math.log(self.min_confidence) if self.min_confidence > 0 else math.inf
 
-                # Propagate confidence
-                new_conf = path_conf * edge_conf
+        # Heap: (cost, hops, node, is_match_chain)
+        heap: list[tuple[float, int, int, bool]] = [(0.0, 0, source, True)]
+        settled_hops: dict[tuple[int, bool], int] = {}
+        results: dict[int, tuple[bool, float]] = {}
 
-                # Chain of matches = match, any non-match breaks chain
-                new_is_match = is_match_chain and edge_match
+        while heap:
+            cost, hops, node, is_match_chain = heapq.heappop(heap)
+            key = (node, is_match_chain)
+            if settled_hops.get(key, self.max_path_length + 1) <= hops:
+                continue
+            settled_hops[key] = hops
+            if node != source and node not in results:
+                results[node] = (is_match_chain, math.exp(-cost))
 
-                if neighbor == item_b:
-                    # Found path to target
-                    if new_conf >= self.min_confidence:
-                        # Keep best result
-                        if best_result is None or new_conf > best_result[1]:
-                            best_result = (new_is_match, new_conf)
-                    continue
+            if hops >= self.max_path_length:
+                continue
+            for neighbor, (edge_match, edge_conf) in self._edges[node].items():
+                if not (is_match_chain or edge_match) or edge_conf <= 0:
+                    continue  # Two non-matches say nothing about each other
+                new_cost = cost - math.log(edge_conf)
+                if new_cost <= max_cost + 1e-12:
+                    heapq.heappush(
+                        heap, (new_cost, hops + 1, neighbor, is_match_chain and edge_match)
+                    )
 
-                if new_conf >= self.min_confidence:
-                    visited.add(neighbor)
-                    queue.append((neighbor, new_conf, new_is_match, path_len + 1))
+        self._paths[source] = results
+        self._reached[source] = {node for node, _ in settled_hops}
+        for node in self._reached[source]:
+            self._reached_by.setdefault(node, set()).add(source)
+        return results
 
-        return best_result
+    def _invalidate(self, source: int) -> None:
+        """Drop a cached search (caller holds _lock)."""
+        self._paths.pop(source, None)
+        for node in self._reached.pop(source, ()):
+            self._reached_by[node].discard(source)
 
     def get_component(self, item_id: str) -> set[str]:
         """Get all items transitively connected to item_id as matches."""
-        if item_id not in self.graph:
-            return {item_id}
-
-        component: set[str] = set()
-        stack = [item_id]
-
-        while stack:
-            current = stack.pop()
-            if current in component:
-                continue
-            component.add(current)
-
-            for neighbor, (is_match, conf) in self.graph.get(current, {}).items():
-                if is_match and conf >= self.min_confidence:
-                    stack.append(neighbor)
+        with self._lock:
+            node = self._ids.get(item_id)
+            if node is None:
+                return {item_id}
+            if self._index_stale:
+                self._rebuild_index()
+            return {self._names[member] for member in self._members[self._find(node)]}
 
-        return component
+    def _graph(self) -> Mapping[str, Mapping[str, tuple[bool, float]]]:
+        """Read-only snapshot: item_id -> {neighbor_id: (is_match, confidence)}."""
+        with self._lock:
+            return MappingProxyType(
+                {
+                    self._names[node]: MappingProxyType(
+                        {self._names[other]: edge for other, edge in neighbors.items()}
+                    )
+                    for node, neighbors in enumerate(self._edges)
+                }
+            )
 
     def clear(self) -> None:
         """Clear the graph."""
-        self.graph.clear()
+        with self._lock:
+            self._ids.clear()
+            self._names.clear()
+            self._edges.clear()
+            self._parent.clear()
+            self._rank.clear()
+            self._members.clear()
+            self._conflicts.clear()
+            self._index_stale = False
+            self._paths.clear()
+            self._reached.clear()
+            self._reached_by.clear()
 
     def __len__(self) -> int:
         """Number of nodes in graph."""
-        return len(self.graph)
+        return len(self._names)
+
+
+# ``graph`` is a constructor argument (InitVar) above; reading it gives the snapshot
+TransitiveInference.graph = property(TransitiveInference._graph)
+
+
+@dataclass
+class PersistentTransitiveInference(TransitiveInference):
+    """
+    Transitive inference over decisions persisted in the database.
+
+    Every edge added is also written to the ``transitive_edges`` table, scoped
+    by user_id. Stored edges are loaded lazily: load() pulls in only the
+    neighbourhood of the items about to be classified, deep enough for every
+    path of up to max_path_length edges between two of them. Item ids must be
+    stable across sessions (e.g. knowledge item ids).
+
+    Example:
+        transitive = PersistentTransitiveInference(user_id=user_id)
+        classifier = ActiveClassifier(transitive=transitive)
+    """
+
+    db_path: Path | None = None  # Default: Config.DB_PATH
+    user_id: str | None = None  # None = CLI mode
+
+    # Item -> hops of its stored neighbourhood already in memory
+    _loaded: dict[str, int] = field(default_factory=dict)
+    _local: threading.local = field(default_factory=threading.local)
+    _init_lock: Lock = field(default_factory=Lock)
+    _initialized: bool = False
+
+    def _db(self) -> "Database":
+        """Get (or open) this thread's database connection."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            from config import Config
+            from storage.database import Database
+
+            path = Path(self.db_path or Config.DB_PATH)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            db = Database(path)
+            db.connect()
+            with self._init_lock:
+                if not self._initialized:
+                    db.create_transitive_edges_table()  # Only the table this class uses
+                    db.conn.commit()
+                    self._initialized = True
+            self._local.db = db
+        return db
+
+    def load(self, item_ids: Iterable[str]) -> None:
+        """
+        Load stored decisions around the given items.
+
+        Expands ceil(max_path_length / 2) hops from the items along edges that
+        are strong enough to be part of an inference, so any qualifying path
+        between two of the items is fully in memory. Each item's stored edges
+        are fetched once; later expansions through it use the in-memory graph.
+        Holds the graph lock throughout, so queries never see a partial load.
+        """
+        hops = (self.max_path_length + 1) // 2
+        with self._lock:
+            budget = {i: hops for i in item_ids if self._loaded.get(i, 0) < hops}
+            try:
+                while budget:
+                    fetch = [i for i in budget if i not in self._loaded]
+                    if fetch:
+                        for edge in self._db().get_transitive_edges(fetch, self.user_id):
+                            self._add_stored_edge(edge)
+
+                    next_budget: dict[str, int] = {}
+                    for item_id, remaining in budget.items():
+                        self._loaded[item_id] = remaining
+                        node = self._ids.get(item_id)
+                        if remaining <= 1 or node is None:
+                            continue
+                        for neighbor, (_, confidence) in self._edges[node].items():
+                            name = self._names[neighbor]
+                            if (
+                                confidence >= self.min_confidence
+                                and self._loaded.get(name, 0) < remaining - 1
+                                and next_budget.get(name, 0) < remaining - 1
+                            ):
+                                next_budget[name] = remaining - 1
+                    budget = next_budget
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to load transitive decisions: {e}")
+
+    def _add_stored_edge(self, edge: dict) -> None:
+        """Add a stored edge unless this session already decided the pair (caller holds _lock)."""
+        a, b = self._ids.get(edge["item_a"]), self._ids.get(edge["item_b"])
+        if a is None or b is None or b not in self._edges[a]:
+            super().add_edge(edge["item_a"], edge["item_b"], edge["is_match"], edge["confidence"])
+
+    def add_edge(
+        self,
+        item_a: str,
+        item_b: str,
+        is_match: bool,
+        confidence: float,
+    ) -> None:
+        """Add a decision edge to the graph and persist it."""
+        super().add_edge(item_a, item_b, is_match, confidence)
+        try:
+            db = self._db()
+            db.store_transitive_edge(item_a, item_b, is_match, confidence, self.user_id)
+            db.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to persist transitive decision: {e}")
+
+    def clear(self) -> None:
+        """Clear the in-memory graph (stored decisions are kept)."""
+        with self._lock:
+            super().clear()
+            self._loaded.clear()
+
+    def close(self) -> None:
+        """Close this thread's database connection."""
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
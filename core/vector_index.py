@@ -0,0 +1,286 @@
+"""
+In-process approximate nearest-neighbour index for group embeddings.
+
+Used by the merger to pick the top-k candidate groups for a new item, so only
+those are scored by the active classifier or listed in the LLM prompt.
+Provides:
+- ``VectorIndex``: cosine-similarity IVF-flat index in NumPy (exact scan until
+  it holds enough vectors to be worth clustering) with incremental upserts
+- ``CandidateIndex``: per-category group indexes kept in sync with group
+  descriptions (re-embedded when a description is regenerated)
+"""
+
+import logging
+import math
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex:
+    """Cosine-similarity vector index with incremental inserts and updates.
+
+    Below ``min_train_size`` vectors every search is one exact matmul. Past
+    that, vectors are clustered with spherical k-means into ~sqrt(N) inverted
+    lists and searches only scan the ``nprobe`` lists closest to the query.
+    Lists are retrained when the index has grown 4x since the last training.
+
+    Example:
+        index = VectorIndex()
+        index.add("group-1", embedding)
+        index.search(query_embedding, k=20)  # [("group-1", 0.93), ...]
+    """
+
+    def __init__(self, min_train_size: int = 1024, nprobe: int = 8, seed: int = 0):
+        """Initialize an empty index.
+
+        Args:
+            min_train_size: Vector count at which inverted lists are built
+            nprobe: Number of inverted lists scanned per search
+            seed: Random seed for k-means initialization
+        """
+        self.min_train_size = min_train_size
+        self.nprobe = nprobe
+        self._rng = np.random.default_rng(seed)
+
+        self._vectors: Optional[np.ndarray] = None  # (capacity, dim) float32, unit rows
+        self._keys: list[Optional[Hashable]] = []  # row -> key (None = free row)
+        self._rows: dict[Hashable, int] = {}  # key -> row
+        self._free: list[int] = []
+
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: list[set[int]] = []
+        self._row_list: dict[int, int] = {}  # row -> inverted list
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm >= 1e-8 else np.zeros_like(vector)
+
+    def add(self, key: Hashable, vector: np.ndarray):
+        """Insert a vector, or replace the vector stored under key.
+
+        Args:
+            key: Identifier returned by search (e.g. group id)
+            vector: Embedding; all vectors must share one dimension
+
+        Raises:
+            ValueError: If the dimension differs from earlier vectors
+        """
+        vector = self._normalize(vector)
+        if self._vectors is None:
+            self._vectors = np.zeros((16, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self._vectors.shape[1]:
+            raise ValueError(
+                f"Expected vector of dim {self._vectors.shape[1]}, got {vector.shape[0]}"
+            )
+
+        row = self._rows.get(key)
+        if row is None:
+            row = self._free.pop() if self._free else len(self._keys)
+            if row == len(self._keys):
+                self._keys.append(None)
+                if row >= self._vectors.shape[0]:
+                    grown = np.zeros(
+                        (self._vectors.shape[0] * 2, self._vectors.shape[1]), np.float32
+                    )
+                    grown[:row] = self._vectors[:row]
+                    self._vectors = grown
+            self._keys[row] = key
+            self._rows[key] = row
+
+        self._vectors[row] = vector
+        if self._centroids is not None:
+            self._assign(row)
+
+        if len(self._rows) >= max(self.min_train_size, 4 * self._trained_size):
+            self._train()
+
+    def remove(self, key: Hashable):
+        """Remove a vector (no-op if key is absent)."""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        self._keys[row] = None
+        self._vectors[row] = 0.0
+        self._free.append(row)
+        list_id = self._row_list.pop(row, None)
+        if list_id is not None:
+            self._lists[list_id].discard(row)
+
+    def search(self, vector: np.ndarray, k: int) -> list[tuple[Hashable, float]]:
+        """Find the k most similar vectors.
+
+        Args:
+            vector: Query embedding
+            k: Number of results
+
+        Returns:
+            List of (key, cosine similarity), most similar first
+        """
+        if not self._rows or k <= 0:
+            return []
+        query = self._normalize(vector)
+
+        if self._centroids is None:
+            rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+        else:
+            closest = np.argsort(-(self._centroids @ query))[: self.nprobe]
+            rows = np.fromiter(
+                (row for list_id in closest for row in self._lists[list_id]), dtype=np.int64
+            )
+            if len(rows) < k:  # Probed lists too small: fall back to an exact scan
+                rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+
+        scores = self._vectors[rows] @ query
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._keys[rows[i]], float(scores[i])) for i in top]
+
+    def _assign(self, row: int):
+        """Put a row into the inverted list of its nearest centroid."""
+        list_id = int(np.argmax(self._centroids @ self._vectors[row]))
+        old = self._row_list.get(row)
+        if old is not None:
+            self._lists[old].discard(row)
+        self._lists[list_id].add(row)
+        self._row_list[row] = list_id
+
+    def _train(self, iterations: int = 10):
+        """Cluster current vectors with spherical k-means and rebuild the lists."""
+        rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+        data = self._vectors[rows]
+        n_lists = max(1, int(math.sqrt(len(rows))))
+
+        centroids = data[self._rng.choice(len(rows), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = data[labels == c]
+                if len(members) == 0:
+                    centroids[c] = data[self._rng.integers(len(rows))]  # Reseed empty list
+                    continue
+                mean = members.sum(axis=0)
+                norm = np.linalg.norm(mean)
+                centroids[c] = mean / norm if norm >= 1e-8 else mean
+
+        labels = np.argmax(data @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._lists = [set() for _ in range(n_lists)]
+        self._row_list = {}
+        for row, list_id in zip(rows.tolist(), labels.tolist()):
+            self._lists[list_id].add(row)
+            self._row_list[row] = list_id
+        self._trained_size = len(rows)
+        logger.debug(f"VectorIndex trained {n_lists} lists over {len(rows)} vectors")
+
+
+class CandidateIndex:
+    """Per-category vector indexes over group descriptions.
+
+    Keeps one ``VectorIndex`` per category and re-embeds a group whenever its
+    description changes, so it can be reused across ``classify_items`` calls.
+
+    Example:
+        index = CandidateIndex()
+        index.sync(groups)
+        candidates = index.candidates(item, same_category_groups, k=20)
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[list[str]], list[np.ndarray]]] = None,
+        **index_kwargs,
+    ):
+        """Initialize empty indexes.
+
+        Args:
+            embed_fn: Batch embedding function (default: compute_embeddings_batch)
+            **index_kwargs: Passed to each VectorIndex
+        """
+        if embed_fn is None:
+            from core.features import compute_embeddings_batch
+
+            embed_fn = compute_embeddings_batch
+        self.embed_fn = embed_fn
+        self.index_kwargs = index_kwargs
+        self._indexes: dict[Optional[str], VectorIndex] = {}
+        self._indexed: dict[Hashable, tuple[Optional[str], str]] = {}  # id -> (category, desc)
+        self._unembedded: set[Hashable] = set()  # Ids whose embedding came back all zeros
+
+    def __contains__(self, group_id: Hashable) -> bool:
+        return group_id in self._indexed
+
+    def sync(self, groups: list[dict]):
+        """Add new groups and re-embed groups whose category or description changed.
+
+        All groups needing an embedding are embedded in one batch.
+
+        Args:
+            groups: Dicts with 'id', 'description', optional 'category'
+        """
+        stale = [
+            g
+            for g in groups
+            if self._indexed.get(g["id"]) != (g.get("category"), g.get("description") or "")
+        ]
+        if not stale:
+            return
+
+        embeddings = self.embed_fn([g.get("description") or "" for g in stale])
+        for group, embedding in zip(stale, embeddings):
+            previous = self._indexed.get(group["id"])
+            if previous is not None and previous[0] != group.get("category"):
+                self._indexes[previous[0]].remove(group["id"])
+
+            category = group.get("category")
+            index = self._indexes.get(category)
+            if index is None:
+                index = self._indexes[category] = VectorIndex(**self.index_kwargs)
+            index.add(group["id"], embedding)
+            self._indexed[group["id"]] = (category, group.get("description") or "")
+            if np.any(embedding):
+                self._unembedded.discard(group["id"])
+            else:
+                self._unembedded.add(group["id"])
+
+    def candidates(self, item: dict, groups: list[dict], k: int) -> list[dict]:
+        """Return the k groups most similar to item, most similar first.
+
+        Args:
+            item: Dict with 'description'
+            groups: Groups of one category to choose from (synced if needed)
+            k: Number of candidates
+
+        Returns:
+            Up to k groups from ``groups``, or all of them if the item or any
+            group has no embedding (e.g. the embedding API is unavailable)
+        """
+        if len(groups) <= k:
+            return groups
+        self.sync(groups)
+
+        category = groups[0].get("category")
+        by_id = {g["id"]: g for g in groups}
+        if any(group_id in self._unembedded for group_id in by_id):
+            return groups  # Cannot be ranked: never hide a group from the caller
+        query = self.embed_fn([item.get("description") or ""])[0]
+        if not np.any(query):
+            return groups
+
+        # Over-fetch in case the category index also holds groups not passed in
+        hits = self._indexes[category].search(query, k + len(self._indexes[category]) - len(by_id))
+        return [by_id[key] for key, _ in hits if key in by_id][:k]
@@ -0,0 +1,173 @@
+"""
+Process-wide pooled HTTP clients.
+
+Every provider call and scanner request goes through the clients returned here
+instead of opening a new connection per call, so TCP connections and TLS
+sessions are reused (keep-alive). Provides:
+- ``get_session()``: shared ``requests.Session`` for sync provider/scanner calls
+- ``get_httpx_client()``: shared ``httpx.Client`` (optional HTTP/2)
+- ``get_aiohttp_session()``: one ``aiohttp.ClientSession`` per running event loop,
+  kept for the loop's lifetime and closed when the loop shuts down
+  (``asyncio.run`` does this) or on ``close_async_clients()``
+
+Connection limits per host come from ``Config.HTTP_MAX_CONNECTIONS_PER_HOST``.
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import logging
+import threading
+import weakref
+from typing import TYPE_CHECKING, AsyncGenerator, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Number of distinct hosts whose pools requests keeps (DeepSeek, OpenRouter, Groq, ...)
+_POOLED_HOSTS = 16
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_httpx_client: Optional[httpx.Client] = None
+# Loop -> (session, parked async generator that closes it at loop shutdown)
+_aiohttp_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple[aiohttp.ClientSession, AsyncGenerator]]" = (  # noqa: E501
+    weakref.WeakKeyDictionary()
+)
+
+
+def http2_available() -> bool:
+    """Check whether HTTP/2 is enabled and the ``h2`` package is installed."""
+    return Config.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def get_session() -> requests.Session:
+    """Get the shared requests session (created on first use).
+
+    The adapter blocks when a host's pool is exhausted, which caps concurrent
+    connections per host at ``Config.HTTP_MAX_CONNECTIONS_PER_HOST``.
+
+    Returns:
+        Process-wide requests.Session
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=_POOLED_HOSTS,
+                    pool_maxsize=Config.HTTP_MAX_CONNECTIONS_PER_HOST,
+                    pool_block=True,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_httpx_client() -> httpx.Client:
+    """Get the shared httpx client (created on first use).
+
+    Uses HTTP/2 when ``QUPLED_HTTP2`` is enabled and ``h2`` is installed.
+    Callers pass their own per-request ``timeout``.
+
+    Returns:
+        Process-wide httpx.Client
+    """
+    global _httpx_client
+    if _httpx_client is None:
+        with _lock:
+            if _httpx_client is None:
+                _httpx_client = httpx.Client(
+                    http2=http2_available(),
+                    limits=httpx.Limits(
+                        max_connections=Config.HTTP_MAX_CONNECTIONS_PER_HOST,
+                        max_keepalive_connections=Config.HTTP_MAX_CONNECTIONS_PER_HOST,
+                        keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY,
+                    ),
+                )
+    return _httpx_client
+
+
+def get_aiohttp_session() -> "aiohttp.ClientSession":
+    """Get the pooled aiohttp session for the running event loop.
+
+    aiohttp sessions are bound to the loop they were created on, so one session
+    is kept per loop. It stays open across requests (keep-alive) until the loop
+    shuts down its async generators, which ``asyncio.run`` does on exit.
+
+    Returns:
+        aiohttp.ClientSession shared by all coroutines on this loop
+
+    Raises:
+        ImportError: If aiohttp is not installed
+        RuntimeError: If called outside a running event loop
+    """
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    closer = None
+    with _lock:
+        entry = _aiohttp_sessions.get(loop)
+        if entry is None or entry[0].closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=Config.HTTP_MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=Config.HTTP_KEEPALIVE_EXPIRY,
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            closer = _close_at_loop_shutdown(session)
+            entry = _aiohttp_sessions[loop] = (session, closer)
+    if closer is not None:
+        # Starting the generator registers it with the loop's shutdown_asyncgens()
+        asyncio.ensure_future(closer.__anext__())
+    return entry[0]
+
+
+async def _close_at_loop_shutdown(session: "aiohttp.ClientSession") -> AsyncGenerator:
+    """Park until the loop finalizes its async generators, then close session."""
+    try:
+        yield
+    finally:
+        loop = asyncio.get_running_loop()
+        with _lock:
+            entry = _aiohttp_sessions.get(loop)
+            if entry is not None and entry[0] is session:
+                del _aiohttp_sessions[loop]
+        if not session.closed:
+            await session.close()
+
+
+async def close_async_clients():
+    """Close the running loop's pooled async clients now (e.g. on app shutdown).
+
+    They are recreated on next use.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        entry = _aiohttp_sessions.pop(loop, None)
+    if entry is not None and not entry[0].closed:
+        await entry[0].close()
+
+
+def close_all():
+    """Close the shared sync clients. They are recreated on next use."""
+    global _session, _httpx_client
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        if _httpx_client is not None:
+            _httpx_client.close()
+            _httpx_client = None
+
+
+atexit.register(close_all)
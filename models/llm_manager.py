@@ -7,7 +7,8 @@ import asyncio
 import hashlib
 import json
 import logging
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
@@ -21,12 +22,19 @@ except ImportError:
     AIOHTTP_AVAILABLE = False
 
 from config import Config
+from models.http_clients import get_aiohttp_session, get_session
+from models.response_cache import MemoryCache, ResponseCache
+from models.single_flight import SingleFlight
 
 # NOTE: RateLimitTracker imported lazily in __init__ to avoid circular import
 # Chain: models.llm_manager → core.rate_limiter → core/__init__ → core.analyzer → models.llm_manager
 
 logger = logging.getLogger(__name__)
 
+# Process-wide so that separate LLMManager instances (e.g. one per worker thread)
+# also share in-flight requests. Keys include the provider, so sharing is safe.
+_inflight_requests = SingleFlight()
+
 
 @dataclass
 class LLMResponse:
@@ -82,37 +90,62 @@ class LLMManager:
         # Cache settings
         self.cache_enabled = Config.CACHE_ENABLED
         self.cache_ttl = Config.CACHE_TTL
-        self.cache_dir = Config.CACHE_PATH / "llm"
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = (
+            ResponseCache(
+                Config.LLM_CACHE_PATH,
+                ttl=self.cache_ttl,
+                max_bytes=Config.LLM_CACHE_MAX_BYTES,
+                legacy_dir=Config.CACHE_PATH / "llm",  # One-shot import of old JSON files
+            )
+            if self.cache_enabled
+            else None
+        )
+        # L1 in-process tier in front of the disk cache (write-through)
+        self.memory_cache = MemoryCache(
+            ttl=self.cache_ttl,
+            max_entries=Config.LLM_MEMORY_CACHE_MAX_ENTRIES,
+            max_bytes=Config.LLM_MEMORY_CACHE_MAX_BYTES,
+        )
 
         # Cache statistics
         self.cache_hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
         self.cache_misses = 0
+        self.coalesced_requests = 0  # Duplicate concurrent calls served by another caller
+        self._stats_lock = threading.Lock()  # Callers on several threads share counters
 
         # Initialize rate limiter (lazy import to avoid circular dependency)
-        from core.rate_limiter import RateLimitTracker
+        from core.rate_limiter import create_rate_limiter
 
-        self.rate_limiter = RateLimitTracker(Config.PROVIDER_RATE_LIMITS)
+        self.rate_limiter = create_rate_limiter(Config.PROVIDER_RATE_LIMITS)
         logger.debug(f"Initialized LLMManager with provider '{provider}' and rate limiting")
 
         # Async HTTP session (initialized in __aenter__)
         self._session: Optional["aiohttp.ClientSession"] = None
+        self._session_holds = 0  # Nested/concurrent `async with` entries
 
     async def __aenter__(self):
-        """Async context manager entry - initializes aiohttp session."""
+        """Async context manager entry - attaches the pooled aiohttp session."""
         if not AIOHTTP_AVAILABLE:
             raise ImportError(
                 "aiohttp is required for async operations. Install with: pip install aiohttp"
             )
 
-        if self._session is None:
-            self._session = aiohttp.ClientSession()
+        # Pooled per-event-loop session shared with other managers (keep-alive)
+        self._session = get_aiohttp_session()
+        self._session_holds += 1
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit - closes aiohttp session."""
-        if self._session:
-            await self._session.close()
+        """Async context manager exit - detaches the shared aiohttp session.
+
+        The pooled session stays open for later requests on this event loop; it
+        is closed when the loop shuts down or on
+        models.http_clients.close_async_clients().
+        """
+        self._session_holds -= 1
+        if self._session_holds == 0:
             self._session = None
 
     def _generate_cache_key(
@@ -165,24 +198,23 @@ class LLMManager:
         if not self.cache_enabled:
             return None
 
-        cache_file = self.cache_dir / f"{cache_key}.json"
-
-        if not cache_file.exists():
-            return None
-
         try:
-            with open(cache_file, "r") as f:
-                cache_data = json.load(f)
-
-            # Check TTL
-            cached_time = cache_data.get("timestamp", 0)
-            if time.time() - cached_time > self.cache_ttl:
-                # Cache expired
-                cache_file.unlink()  # Delete expired cache
-                return None
+            cache_data = self.memory_cache.get(cache_key)
+            from_memory = cache_data is not None
+            if not from_memory:
+                entry = self.cache.get_entry(cache_key)
+                if entry is None:
+                    return None
+                cache_data, created_at = entry
+                self.memory_cache.set(cache_key, cache_data, created_at=created_at)
 
             # Cache hit!
-            self.cache_hits += 1
+            with self._stats_lock:
+                if from_memory:
+                    self.memory_hits += 1
+                else:
+                    self.disk_hits += 1
+                self.cache_hits += 1
             if not self.quiet:
                 print("  [CACHE HIT] Using cached response")
 
@@ -208,11 +240,8 @@ class LLMManager:
         if not self.cache_enabled:
             return
 
-        cache_file = self.cache_dir / f"{cache_key}.json"
-
         try:
             cache_data = {
-                "timestamp": time.time(),
                 "text": response.text,
                 "model": response.model,
                 "success": response.success,
@@ -220,12 +249,13 @@ class LLMManager:
                 "metadata": response.metadata,
             }
 
-            with open(cache_file, "w") as f:
-                json.dump(cache_data, f, indent=2)
+            self.memory_cache.set(cache_key, cache_data)
+            self.cache.set(cache_key, cache_data)
 
             if not self.quiet:
                 print("  [CACHE MISS] Response cached for future use")
-            self.cache_misses += 1
+            with self._stats_lock:
+                self.cache_misses += 1
 
         except Exception as e:
             print(f"  [CACHE ERROR] Failed to save cache: {e}")
@@ -234,22 +264,29 @@ class LLMManager:
         """Get cache statistics.
 
         Returns:
-            Dict with cache hits, misses, and hit rate
+            Dict with cache hits (total and per tier), misses, hit rate, and
+            number of duplicate in-flight requests coalesced
         """
         total = self.cache_hits + self.cache_misses
         hit_rate = (self.cache_hits / total * 100) if total > 0 else 0
 
         return {
             "hits": self.cache_hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
             "misses": self.cache_misses,
             "total": total,
             "hit_rate": round(hit_rate, 2),
+            "coalesced": self.coalesced_requests,
         }
 
     def reset_cache_stats(self):
         """Reset cache statistics counters."""
         self.cache_hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
         self.cache_misses = 0
+        self.coalesced_requests = 0
 
     def get_rate_limit_stats(self, provider: Optional[str] = None) -> Dict[str, Any]:
         """Get rate limit statistics.
@@ -295,6 +332,32 @@ class LLMManager:
         """
         model = model or self.fast_model
 
+        # Coalesce identical concurrent requests (same cache key and max_tokens,
+        # which can truncate the response) into one API call
+        cache_key = self._generate_cache_key(
+            self.provider, model, prompt, system, temperature, json_mode
+        )
+        response, shared = _inflight_requests.do(
+            f"{cache_key}:{max_tokens}",
+            lambda: self._dispatch_generate(
+                prompt, model, system, temperature, max_tokens, json_mode
+            ),
+        )
+        if shared:
+            with self._stats_lock:
+                self.coalesced_requests += 1
+        return response
+
+    def _dispatch_generate(
+        self,
+        prompt: str,
+        model: str,
+        system: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        json_mode: bool,
+    ) -> LLMResponse:
+        """Rate-limit, call the provider, and record usage (one real request)."""
         # Apply rate limiting before making request
         wait_time = self.rate_limiter.wait_if_needed(self.provider)
         if wait_time > 0:
@@ -344,7 +407,10 @@ class LLMManager:
                         # Try input + output tokens
                         tokens_used = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
 
-            self.rate_limiter.record_request(self.provider, tokens_used=tokens_used)
+            # Request slot was reserved by wait_if_needed; only add tokens
+            self.rate_limiter.record_request(
+                self.provider, tokens_used=tokens_used, count_request=False
+            )
 
         return response
 
@@ -372,13 +438,37 @@ class LLMManager:
         """
         model = model or self.fast_model
 
-        # Apply rate limiting before making request
-        wait_time = self.rate_limiter.wait_if_needed(self.provider)
+        # Coalesce identical concurrent requests (same cache key and max_tokens)
+        cache_key = self._generate_cache_key(
+            self.provider, model, prompt, system, temperature, json_mode
+        )
+        response, shared = await _inflight_requests.do_async(
+            f"{cache_key}:{max_tokens}",
+            lambda: self._dispatch_generate_async(
+                prompt, model, system, temperature, max_tokens, json_mode
+            ),
+        )
+        if shared:
+            with self._stats_lock:
+                self.coalesced_requests += 1
+        return response
+
+    async def _dispatch_generate_async(
+        self,
+        prompt: str,
+        model: str,
+        system: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        json_mode: bool,
+    ) -> LLMResponse:
+        """Async counterpart of _dispatch_generate."""
+        # Apply rate limiting before making request (awaits without blocking the loop)
+        wait_time = await self.rate_limiter.wait_if_needed_async(self.provider)
         if wait_time > 0:
             print(
-                f"  [RATE LIMIT] Waiting {wait_time:.1f}s for '{self.provider}' (rate limit protection)"
+                f"  [RATE LIMIT] Waited {wait_time:.1f}s for '{self.provider}' (rate limit protection)"
             )
-            await asyncio.sleep(wait_time)
 
         # Make the API call
         if self.provider == "ollama":
@@ -423,10 +513,144 @@ class LLMManager:
                         # Try input + output tokens
                         tokens_used = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
 
-            self.rate_limiter.record_request(self.provider, tokens_used=tokens_used)
+            # Request slot was reserved by wait_if_needed_async; only add tokens
+            self.rate_limiter.record_request(
+                self.provider, tokens_used=tokens_used, count_request=False
+            )
 
         return response
 
+    def _prepare_batch(
+        self, specs: List[Dict[str, Any]]
+    ) -> tuple[List[Optional[LLMResponse]], List[tuple[int, Dict[str, Any]]]]:
+        """Resolve batch specs and serve cache hits.
+
+        Args:
+            specs: List of generate() keyword-argument dicts (``prompt`` required)
+
+        Returns:
+            Tuple of (results with cache hits and invalid specs filled in,
+            list of (index, generate kwargs) still needing a request)
+        """
+        results: List[Optional[LLMResponse]] = [None] * len(specs)
+        pending: List[tuple[int, Dict[str, Any]]] = []
+
+        for i, spec in enumerate(specs):
+            if not spec.get("prompt"):
+                results[i] = LLMResponse(
+                    text="",
+                    model=spec.get("model") or self.fast_model,
+                    success=False,
+                    error=f"Batch item {i} has no prompt",
+                )
+                continue
+
+            kwargs = {
+                "prompt": spec["prompt"],
+                "model": spec.get("model") or self.fast_model,
+                "system": spec.get("system"),
+                "temperature": spec.get("temperature", 0.7),
+                "max_tokens": spec.get("max_tokens"),
+                "json_mode": spec.get("json_mode", False),
+            }
+
+            cache_key = self._generate_cache_key(
+                self.provider,
+                kwargs["model"],
+                kwargs["prompt"],
+                kwargs["system"],
+                kwargs["temperature"],
+                kwargs["json_mode"],
+            )
+            cached = self._get_cached_response(cache_key)
+            if cached:
+                results[i] = cached
+            else:
+                pending.append((i, kwargs))
+
+        return results, pending
+
+    def generate_many(
+        self,
+        specs: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+    ) -> List[LLMResponse]:
+        """Generate responses for many prompts concurrently.
+
+        Cache hits are served first; only misses reach the network, at most
+        ``max_concurrency`` at a time, each going through generate() (and so
+        through the rate limiter and in-flight deduplication).
+
+        Args:
+            specs: List of dicts with generate() keyword arguments
+                (prompt, model, system, temperature, max_tokens, json_mode)
+            max_concurrency: Maximum concurrent requests (defaults to Config.LLM_MAX_CONCURRENCY)
+
+        Returns:
+            List of LLMResponse in input order. Failed items have success=False
+            and an error message; one failure never aborts the batch.
+        """
+        results, pending = self._prepare_batch(specs)
+        if not pending:
+            return results
+
+        workers = max(1, min(max_concurrency or Config.LLM_MAX_CONCURRENCY, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (i, kwargs, executor.submit(self.generate, **kwargs)) for i, kwargs in pending
+            ]
+            for i, kwargs, future in futures:
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = LLMResponse(
+                        text="", model=kwargs["model"], success=False, error=f"Batch item {i}: {e}"
+                    )
+
+        return results
+
+    async def generate_many_async(
+        self,
+        specs: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+    ) -> List[LLMResponse]:
+        """Async counterpart of generate_many() using generate_async().
+
+        Attaches the loop's pooled aiohttp session for the batch, so it also
+        works outside ``async with LLMManager()``.
+
+        Args:
+            specs: List of dicts with generate() keyword arguments
+            max_concurrency: Maximum concurrent requests (defaults to Config.LLM_MAX_CONCURRENCY)
+
+        Returns:
+            List of LLMResponse in input order (failures reported per item)
+        """
+        results, pending = self._prepare_batch(specs)
+        if not pending:
+            return results
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or Config.LLM_MAX_CONCURRENCY))
+
+        async def run(i: int, kwargs: Dict[str, Any]) -> LLMResponse:
+            async with semaphore:
+                try:
+                    return await self.generate_async(**kwargs)
+                except Exception as e:
+                    return LLMResponse(
+                        text="", model=kwargs["model"], success=False, error=f"Batch item {i}: {e}"
+                    )
+
+        if AIOHTTP_AVAILABLE:
+            async with self:  # Attach the loop's pooled session for the batch
+                responses = await asyncio.gather(*(run(i, kwargs) for i, kwargs in pending))
+        else:
+            responses = await asyncio.gather(*(run(i, kwargs) for i, kwargs in pending))
+        for (i, _), response in zip(pending, responses):
+            results[i] = response
+
+        return results
+
     def _ollama_generate(
         self,
         prompt: str,
@@ -470,7 +694,7 @@ class LLMManager:
             if json_mode:
                 payload["format"] = "json"
 
-            response = requests.post(url, json=payload, timeout=300)
+            response = get_session().post(url, json=payload, timeout=300)
             response.raise_for_status()
 
             result = response.json()
@@ -579,7 +803,7 @@ class LLMManager:
                     "Content-Type": "application/json",
                 }
 
-                response = requests.post(url, json=payload, headers=headers, timeout=60)
+                response = get_session().post(url, json=payload, headers=headers, timeout=60)
                 response.raise_for_status()
 
                 result = response.json()
@@ -851,7 +1075,7 @@ class LLMManager:
                 if system:
                     payload["system"] = system
 
-                response = requests.post(url, json=payload, headers=headers, timeout=60)
+                response = get_session().post(url, json=payload, headers=headers, timeout=60)
                 response.raise_for_status()
 
                 result = response.json()
@@ -1126,7 +1350,7 @@ class LLMManager:
                     "Content-Type": "application/json",
                 }
 
-                response = requests.post(
+                response = get_session().post(
                     url, json=payload, headers=headers, timeout=60 if not is_reasoner else 300
                 )
                 response.raise_for_status()
@@ -1405,7 +1629,7 @@ class LLMManager:
                     "X-Title": "Qupled",
                 }
 
-                response = requests.post(url, json=payload, headers=headers, timeout=120)
+                response = get_session().post(url, json=payload, headers=headers, timeout=120)
                 response.raise_for_status()
 
                 result = response.json()
@@ -1668,7 +1892,10 @@ class LLMManager:
                     if tokens_used == 0:
                         tokens_used = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
 
-            self.rate_limiter.record_request(self.provider, tokens_used=tokens_used)
+            # Request slot was reserved by wait_if_needed; only add tokens
+            self.rate_limiter.record_request(
+                self.provider, tokens_used=tokens_used, count_request=False
+            )
 
         return response
 
@@ -1760,7 +1987,7 @@ class LLMManager:
                     "Content-Type": "application/json",
                 }
 
-                response = requests.post(url, json=payload, headers=headers, timeout=120)
+                response = get_session().post(url, json=payload, headers=headers, timeout=120)
                 response.raise_for_status()
 
                 result = response.json()
@@ -1894,7 +2121,7 @@ class LLMManager:
                     "X-Title": "Qupled",
                 }
 
-                response = requests.post(url, json=payload, headers=headers, timeout=120)
+                response = get_session().post(url, json=payload, headers=headers, timeout=120)
                 response.raise_for_status()
 
                 result = response.json()
@@ -1986,7 +2213,7 @@ class LLMManager:
                     "X-Title": "Qupled",
                 }
 
-                response = requests.post(url, json=payload, headers=headers, timeout=120)
+                response = get_session().post(url, json=payload, headers=headers, timeout=120)
                 response.raise_for_status()
 
                 result = response.json()
@@ -2070,11 +2297,8 @@ class LLMManager:
         """
         model = model or self.fast_model
 
-        # Apply rate limiting before making request
-        wait_time = self.rate_limiter.wait_if_needed(self.provider)
-        if wait_time > 0:
-            import asyncio
-            await asyncio.sleep(wait_time)
+        # Apply rate limiting before making request (awaits without blocking the loop)
+        await self.rate_limiter.wait_if_needed_async(self.provider)
 
         if self.provider == "deepseek":
             async for chunk in self._deepseek_generate_stream(
@@ -2141,28 +2365,30 @@ class LLMManager:
 
         try:
             timeout = aiohttp.ClientTimeout(total=300 if is_reasoner else 120)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, json=payload, headers=headers) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        yield f"Error: {error_text}"
-                        return
-
-                    async for line in response.content:
-                        line = line.decode("utf-8").strip()
-                        if not line or not line.startswith("data: "):
-                            continue
-                        if line == "data: [DONE]":
-                            break
+            session = get_aiohttp_session()
+            async with session.post(
+                url, json=payload, headers=headers, timeout=timeout
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    yield f"Error: {error_text}"
+                    return
+
+                async for line in response.content:
+                    line = line.decode("utf-8").strip()
+                    if not line or not line.startswith("data: "):
+                        continue
+                    if line == "data: [DONE]":
+                        break
 
-                        try:
-                            data = json.loads(line[6:])  # Skip "data: " prefix
-                            delta = data.get("choices", [{}])[0].get("delta", {})
-                            content = delta.get("content", "")
-                            if content:
-                                yield content
-                        except json.JSONDecodeError:
-                            continue
+                    try:
+                        data = json.loads(line[6:])  # Skip "data: " prefix
+                        delta = data.get("choices", [{}])[0].get("delta", {})
+                        content = delta.get("content", "")
+                        if content:
+                            yield content
+                    except json.JSONDecodeError:
+                        continue
 
         except Exception as e:
             yield f"Error: {str(e)}"
@@ -2199,7 +2425,7 @@ class LLMManager:
 
             payload = {"model": model, "prompt": text}
 
-            response = requests.post(url, json=payload, timeout=60)
+            response = get_session().post(url, json=payload, timeout=60)
             response.raise_for_status()
 
             result = response.json()
@@ -2221,7 +2447,7 @@ class LLMManager:
         if self.provider == "ollama":
             try:
                 url = f"{self.base_url}/api/tags"
-                response = requests.get(url, timeout=10)
+                response = get_session().get(url, timeout=10)
                 response.raise_for_status()
 
                 models = response.json().get("models", [])
@@ -2242,7 +2468,7 @@ class LLMManager:
         if self.provider == "ollama":
             try:
                 url = f"{self.base_url}/api/tags"
-                response = requests.get(url, timeout=10)
+                response = get_session().get(url, timeout=10)
                 response.raise_for_status()
 
                 models = response.json().get("models", [])
@@ -0,0 +1,399 @@
+"""
+Persistent response cache for LLM calls.
+
+Stores every cached response in a single SQLite database (WAL mode) instead of
+one JSON file per prompt. Provides:
+- TTL expiry backed by an index (expired rows are purged in bulk)
+- A byte budget with least-recently-used eviction
+- Atomic writes that are safe across threads and processes
+- One-shot import of the legacy ``{sha256}.json`` cache directory
+
+``MemoryCache`` is a bounded in-process LRU tier placed in front of it.
+"""
+
+import copy
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Purge expired rows every N writes (in addition to on open)
+PURGE_INTERVAL = 500
+
+# When over budget, evict down to this fraction of max_bytes so that
+# eviction is amortized instead of running on every write
+EVICTION_TARGET_RATIO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_created ON responses(created_at);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+
+CREATE TABLE IF NOT EXISTS cache_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+INSERT OR IGNORE INTO cache_meta (name, value) VALUES ('total_bytes', '0');
+
+CREATE TRIGGER IF NOT EXISTS trg_responses_insert AFTER INSERT ON responses
+BEGIN
+    UPDATE cache_meta SET value = CAST(value AS INTEGER) + NEW.size
+    WHERE name = 'total_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_responses_delete AFTER DELETE ON responses
+BEGIN
+    UPDATE cache_meta SET value = CAST(value AS INTEGER) - OLD.size
+    WHERE name = 'total_bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_responses_update AFTER UPDATE OF size ON responses
+BEGIN
+    UPDATE cache_meta SET value = CAST(value AS INTEGER) - OLD.size + NEW.size
+    WHERE name = 'total_bytes';
+END;
+"""
+
+
+class ResponseCache:
+    """Single-file SQLite cache for LLM responses.
+
+    Each thread gets its own connection; SQLite's WAL journal and busy timeout
+    serialize writers across threads and processes sharing the same file.
+
+    Example:
+        cache = ResponseCache(Config.LLM_CACHE_PATH, ttl=3600, max_bytes=256 * 1024**2)
+        cache.set(key, {"text": "...", "model": "deepseek-chat", "success": True})
+        data = cache.get(key)
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        ttl: float,
+        max_bytes: Optional[int] = None,
+        legacy_dir: Optional[Path] = None,
+    ):
+        """Initialize the cache, creating the database if needed.
+
+        Args:
+            db_path: Path to SQLite cache file
+            ttl: Time-to-live in seconds for cached entries
+            max_bytes: Byte budget for payloads (None = unbounded)
+            legacy_dir: Directory of legacy ``{key}.json`` files to import once
+        """
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        self.purge_expired()
+
+        if legacy_dir is not None:
+            self.migrate_legacy_dir(legacy_dir)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get (or open) this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; write transactions are opened explicitly
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached payload.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached payload dict, or None if missing or expired
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[tuple[Dict[str, Any], float]]:
+        """Look up a cached payload together with its creation timestamp.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (payload, created_at), or None if missing or expired
+        """
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT payload, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        payload, created_at = row
+        now = time.time()
+        if now - created_at > self.ttl:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+
+        conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(payload), created_at
+
+    def set(self, key: str, data: Dict[str, Any], created_at: Optional[float] = None):
+        """Store a payload, evicting least-recently-used entries if over budget.
+
+        Args:
+            key: Cache key
+            data: JSON-serializable payload
+            created_at: Creation timestamp (defaults to now; used by migration)
+        """
+        payload = json.dumps(data, separators=(",", ":"))
+        now = time.time()
+        created_at = now if created_at is None else created_at
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                INSERT INTO responses (key, payload, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    payload = excluded.payload,
+                    size = excluded.size,
+                    created_at = excluded.created_at,
+                    last_access = excluded.last_access
+                """,
+                (key, payload, len(payload), created_at, now),
+            )
+            self._evict_if_needed(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._writes_lock:
+            self._writes += 1
+            should_purge = self._writes % PURGE_INTERVAL == 0
+        if should_purge:
+            self.purge_expired()
+
+    def _total_bytes(self, conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM cache_meta WHERE name = 'total_bytes'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _evict_if_needed(self, conn: sqlite3.Connection):
+        """Evict LRU entries until under budget. Must run inside a write transaction."""
+        if self.max_bytes is None:
+            return
+
+        total = self._total_bytes(conn)
+        if total <= self.max_bytes:
+            return
+
+        excess = total - int(self.max_bytes * EVICTION_TARGET_RATIO)
+        cursor = conn.execute(
+            """
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, size,
+                           SUM(size) OVER (ORDER BY last_access, key) AS running
+                    FROM responses
+                )
+                WHERE running - size < ?
+            )
+            """,
+            (excess,),
+        )
+        logger.debug(f"LLM cache over budget, evicted {cursor.rowcount} entries")
+
+    def purge_expired(self) -> int:
+        """Delete all expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        cursor = self._conn().execute(
+            "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+        )
+        return cursor.rowcount
+
+    def migrate_legacy_dir(self, legacy_dir: Path) -> int:
+        """Import legacy one-file-per-key JSON cache entries, then delete the files.
+
+        Expired entries are dropped. Safe to call repeatedly and from concurrent
+        processes (files already consumed by another process are skipped).
+
+        Args:
+            legacy_dir: Directory containing ``{key}.json`` files
+
+        Returns:
+            Number of entries imported
+        """
+        legacy_dir = Path(legacy_dir)
+        if not legacy_dir.is_dir():
+            return 0
+
+        imported = 0
+        cutoff = time.time() - self.ttl
+        for cache_file in legacy_dir.glob("*.json"):
+            try:
+                with open(cache_file, "r") as f:
+                    cache_data = json.load(f)
+                timestamp = cache_data.pop("timestamp", 0)
+                if timestamp >= cutoff:
+                    self.set(cache_file.stem, cache_data, created_at=timestamp)
+                    imported += 1
+                cache_file.unlink()
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.warning(f"Skipping legacy cache file {cache_file.name}: {e}")
+
+        try:
+            legacy_dir.rmdir()
+        except OSError:
+            pass  # Not empty (unreadable files) or removed concurrently
+
+        if imported:
+            logger.info(f"Migrated {imported} legacy LLM cache entries into {self.db_path}")
+        return imported
+
+    def stats(self) -> Dict[str, Any]:
+        """Get storage statistics.
+
+        Returns:
+            Dict with entry count, total bytes, and byte budget
+        """
+        conn = self._conn()
+        entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "entries": entries,
+            "bytes": self._total_bytes(conn),
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        """Delete all cached entries."""
+        self._conn().execute("DELETE FROM responses")
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class MemoryCache:
+    """Bounded in-process LRU cache with entry and byte budgets.
+
+    Used as the L1 tier in front of ``ResponseCache`` so repeated prompts within
+    a process skip SQLite and JSON parsing entirely. Thread-safe.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        """Initialize the memory tier.
+
+        Args:
+            ttl: Time-to-live in seconds for cached entries
+            max_entries: Maximum number of entries held
+            max_bytes: Maximum total payload size (serialized JSON length)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple[Dict[str, Any], int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a payload, refreshing its LRU position.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Copy of the cached payload (callers may mutate it), or None if
+            missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            data, size, created_at = entry
+            if time.time() - created_at > self.ttl:
+                del self._entries[key]
+                self._bytes -= size
+                return None
+
+            self._entries.move_to_end(key)
+        return copy.deepcopy(data)
+
+    def set(self, key: str, data: Dict[str, Any], created_at: Optional[float] = None):
+        """Store a payload, evicting least-recently-used entries if over budget.
+
+        Args:
+            key: Cache key
+            data: JSON-serializable payload (copied; later changes do not leak in)
+            created_at: Creation timestamp (defaults to now)
+        """
+        size = len(json.dumps(data, separators=(",", ":")))
+        if size > self.max_bytes:
+            return  # Would evict everything else; leave it to the disk tier
+
+        data = copy.deepcopy(data)
+
+        created_at = time.time() if created_at is None else created_at
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (data, size, created_at)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def stats(self) -> Dict[str, Any]:
+        """Get memory tier statistics.
+
+        Returns:
+            Dict with entry count, total bytes, and budgets
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
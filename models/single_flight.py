@@ -0,0 +1,136 @@
+"""
+Single-flight coalescing of identical in-flight calls.
+
+When several threads or coroutines request the same key at once, only the
+first caller (the leader) runs the work; the others wait on its future and
+receive the same result. Futures are ``concurrent.futures.Future`` objects so
+they can be awaited from asyncio (via ``asyncio.wrap_future``) and blocked on
+from plain threads alike.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared future whose async leader was cancelled; waiters retry."""
+
+
+class SingleFlight:
+    """Per-key deduplication of concurrent calls.
+
+    Example:
+        flight = SingleFlight()
+        result, shared = flight.do(cache_key, lambda: expensive_call())
+        result, shared = await flight.do_async(cache_key, lambda: expensive_coro())
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (future, thread ident of an async leader or None)
+        self._inflight: Dict[str, Tuple[Future, Optional[int]]] = {}
+        self.coalesced = 0  # Total duplicate calls avoided
+
+    def _join_or_lead(self, key: str, async_leader: bool) -> Tuple[Future, bool, Optional[int]]:
+        """Return (future, is_leader, leader_loop_thread) for key."""
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is not None:
+                self.coalesced += 1
+                return entry[0], False, entry[1]
+
+            future: Future = Future()
+            loop_thread = threading.get_ident() if async_leader else None
+            self._inflight[key] = (future, loop_thread)
+            return future, True, loop_thread
+
+    def _finish(self, key: str, future: Future):
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is not None and entry[0] is future:
+                del self._inflight[key]
+
+    def _uncount(self):
+        """Undo the coalesced count of a waiter that does the work after all."""
+        with self._lock:
+            self.coalesced -= 1
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn once per concurrent key from synchronous code.
+
+        Args:
+            key: Deduplication key
+            fn: Zero-argument callable doing the work
+
+        Returns:
+            Tuple of (result, shared) where shared is True if another caller ran fn
+        """
+        while True:
+            future, is_leader, loop_thread = self._join_or_lead(key, async_leader=False)
+            if is_leader:
+                break
+            if loop_thread == threading.get_ident():
+                # Leader is a coroutine on this thread's event loop; blocking here
+                # would deadlock it, so do the work independently instead.
+                self._uncount()
+                return fn(), False
+            try:
+                return future.result(), True
+            except _LeaderCancelled:
+                self._uncount()  # Retry: join the next leader or become it
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._finish(key, future)
+        return result, False
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run the coroutine returned by fn once per concurrent key.
+
+        A cancelled leader does not cancel its waiters: one of them takes over.
+        A cancelled waiter leaves the shared call running.
+
+        Args:
+            key: Deduplication key
+            fn: Zero-argument callable returning an awaitable doing the work
+
+        Returns:
+            Tuple of (result, shared) where shared is True if another caller ran fn
+        """
+        while True:
+            future, is_leader, _ = self._join_or_lead(key, async_leader=True)
+            if is_leader:
+                break
+            try:
+                # Shielded: cancelling this waiter must not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future)), True
+            except _LeaderCancelled:
+                self._uncount()  # Retry: join the next leader or become it
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self._finish(key, future)  # Before waking waiters, so they do not rejoin it
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._finish(key, future)
+        return result, False
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._inflight)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark CatBoost committee fitting: sequential vs parallel members.
+
+Fits the active learning committee on synthetic 7-feature training sets of
+increasing size, with members fitted one after another (n_jobs=1) and
+concurrently, checks that both give identical predictions, and reports
+wall times for fit and fit_with_early_stopping.
+
+Usage:
+    python scripts/benchmark_committee_fit.py
+    python scripts/benchmark_committee_fit.py --sizes 200 1000 5000 --estimators 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.active_learning import CatBoostActiveLearner  # noqa: E402
+
+
+def make_training_set(n: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Synthetic pair features with a noisy, mostly similarity-driven label."""
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, 7))
+    X[:, 4:6] = X[:, 4:6] > 0.5  # Boolean features
+    score = 2.5 * X[:, 0] + X[:, 1] + 0.5 * X[:, 6] + rng.normal(0, 0.3, n)
+    return X, (score > 2.0).astype(int)
+
+
+def timed_fit(n_jobs: int, n_estimators: int, method: str, X, y):
+    learner = CatBoostActiveLearner(n_estimators=n_estimators, n_jobs=n_jobs)
+    start = time.perf_counter()
+    getattr(learner, method)(X, y)
+    return time.perf_counter() - start, learner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000, 3000])
+    parser.add_argument("--estimators", type=int, default=3, help="Committee size")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel members (default: auto)")
+    args = parser.parse_args()
+
+    parallel_jobs = args.jobs or min(args.estimators, os.cpu_count() or 1)
+    print(f"Committee of {args.estimators}, parallel n_jobs={parallel_jobs}, {os.cpu_count()} CPUs")
+    timed_fit(1, 1, "fit", *make_training_set(50))  # Warm up CatBoost before timing
+    print(f"{'method':<24} {'samples':>8} {'sequential':>11} {'parallel':>9} {'speedup':>8}")
+
+    for method in ("fit", "fit_with_early_stopping"):
+        for n in args.sizes:
+            X, y = make_training_set(n)
+            seq_time, seq = timed_fit(1, args.estimators, method, X, y)
+            par_time, par = timed_fit(parallel_jobs, args.estimators, method, X, y)
+            assert np.array_equal(
+                seq.predict_proba(X), par.predict_proba(X)
+            ), "parallel committee differs from sequential"
+            print(
+                f"{method:<24} {n:>8} {seq_time * 1000:>9.0f}ms {par_time * 1000:>7.0f}ms "
+                f"{seq_time / par_time:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark pairwise feature extraction: scalar extract_features vs extract_features_matrix.
+
+Uses synthetic items and random embeddings (no API calls) and checks that both
+paths produce the same features before reporting timings.
+
+Usage:
+    python scripts/benchmark_features.py
+    python scripts/benchmark_features.py --items 50 --groups 400 --repeat 3
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.features import (  # noqa: E402
+    EMBEDDING_DIM,
+    extract_features,
+    extract_features_matrix,
+    normalize_embeddings,
+)
+
+VERBS = ["Calculate", "Compute", "Derive", "Explain", "Prove", "Apply", "Solve"]
+WORDS = (
+    "velocity speed force mass energy momentum kinematic equations integral derivative "
+    "matrix eigenvalue probability distribution graph tree recursion induction limit series"
+).split()
+
+
+def make_items(prefix: str, n: int, rng: np.random.Generator) -> list[dict]:
+    """Generate n synthetic knowledge items."""
+    items = []
+    for i in range(n):
+        words = rng.choice(WORDS, size=rng.integers(4, 12))
+        items.append(
+            {
+                "id": f"{prefix}{i}",
+                "name": f"{prefix}_{'_'.join(words[:3])}",
+                "description": " ".join([VERBS[i % len(VERBS)], *words]),
+                "category": f"cat{i % 5}",
+            }
+        )
+    return items
+
+
+def time_best(fn, repeat: int) -> tuple[float, object]:
+    """Return (best wall time, last result) over repeat runs."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--items", type=int, default=20, help="Number of new items (N)")
+    parser.add_argument("--groups", type=int, default=200, help="Number of groups (M)")
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM, help="Embedding dimension")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path (best is reported)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    items = make_items("item", args.items, rng)
+    groups = make_items("group", args.groups, rng)
+    item_emb = normalize_embeddings(rng.standard_normal((len(items), args.dim)), args.dim)
+    group_emb = normalize_embeddings(rng.standard_normal((len(groups), args.dim)), args.dim)
+
+    def scalar():
+        return np.array(
+            [
+                [extract_features(a, b, ea, eb).to_vector() for b, eb in zip(groups, group_emb)]
+                for a, ea in zip(items, item_emb)
+            ]
+        )
+
+    def vectorized():
+        return extract_features_matrix(items, groups, item_emb, group_emb)
+
+    scalar_time, expected = time_best(scalar, args.repeat)
+    matrix_time, actual = time_best(vectorized, args.repeat)
+
+    max_cosine_diff = float(np.abs(actual[:, :, 0] - expected[:, :, 0]).max())
+    identical = np.array_equal(actual[:, :, 1:], expected[:, :, 1:])
+
+    pairs = args.items * args.groups
+    print(f"Pairs: {args.items} x {args.groups} = {pairs}  (dim={args.dim})")
+    print(f"  scalar extract_features:  {scalar_time * 1000:9.1f} ms")
+    print(f"  extract_features_matrix:  {matrix_time * 1000:9.1f} ms")
+    print(f"  speedup:                  {scalar_time / matrix_time:9.1f}x")
+    print(f"  non-cosine features identical: {identical}")
+    print(f"  max cosine difference:         {max_cosine_diff:.2e}")
+
+    if not identical or max_cosine_diff > 1e-5:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
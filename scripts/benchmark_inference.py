@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark committee inference: CatBoost predict_proba vs compiled NumPy trees.
+
+Fits one committee, checks that both paths give the same probabilities and
+uncertainties, and reports per-call latency of uncertainty() for batch sizes
+typical of decide() (1 pair) and decide_batch() (one item vs k candidates).
+
+Usage:
+    python scripts/benchmark_inference.py
+    python scripts/benchmark_inference.py --samples 1000 --batches 1 20 100 1000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.active_learning import CatBoostActiveLearner  # noqa: E402
+
+
+def per_call_us(fn, X, min_time: float = 0.2) -> float:
+    """Average microseconds per call, repeating for at least min_time seconds."""
+    fn(X)
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        fn(X)
+        calls += 1
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--samples", type=int, default=500, help="Training set size")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 20, 100, 1000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.random((args.samples, 7))
+    y = (X[:, 0] + 0.3 * X[:, 1] + rng.normal(0, 0.2, args.samples) > 0.7).astype(int)
+
+    compiled = CatBoostActiveLearner()
+    compiled.fit_with_early_stopping(X, y)
+    catboost = CatBoostActiveLearner(fast_inference=False)
+    catboost.fit_with_early_stopping(X, y)
+
+    queries = rng.random((max(args.batches), 7))
+    assert np.allclose(compiled.uncertainty(queries), catboost.uncertainty(queries), atol=1e-12)
+    assert np.allclose(compiled.predict_proba(queries), catboost.predict_proba(queries), atol=1e-12)
+
+    trees = len(compiled._compiled.leaf_values)
+    print(f"Committee of {compiled.n_estimators}, {trees} trees, trained on {args.samples} samples")
+    print(f"{'batch':>6} {'catboost':>11} {'compiled':>11} {'speedup':>8}")
+    for n in args.batches:
+        slow = per_call_us(catboost.uncertainty, queries[:n])
+        fast = per_call_us(compiled.uncertainty, queries[:n])
+        print(f"{n:>6} {slow:>9.0f}us {fast:>9.0f}us {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
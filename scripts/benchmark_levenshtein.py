@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: bit-parallel levenshtein_ratio vs the previous list-building DP.
+
+Runs all pairs of realistic snake_case knowledge-item names through both
+implementations, checks that results agree, and reports timings.
+
+Usage:
+    python scripts/benchmark_levenshtein.py
+    python scripts/benchmark_levenshtein.py --names 300 --min-ratio 0.7
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.features import levenshtein_ratio  # noqa: E402
+
+TERMS = (
+    "velocity calculation kinematic equations newton second law free body diagram "
+    "integration by parts taylor series expansion eigenvalue decomposition matrix inverse "
+    "binary search tree traversal dijkstra shortest path dynamic programming recurrence "
+    "bayes theorem conditional probability hypothesis testing confidence interval "
+    "fourier transform laplace boundary conditions thevenin equivalent circuit analysis"
+).split()
+
+
+def dp_ratio(s1: str, s2: str) -> float:
+    """Previous implementation (one Python list per DP row)."""
+    if not s1 and not s2:
+        return 1.0
+    if not s1 or not s2:
+        return 0.0
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    distances = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        new_distances = [i + 1]
+        for j, c2 in enumerate(s2):
+            if c1 == c2:
+                new_distances.append(distances[j])
+            else:
+                new_distances.append(1 + min(distances[j], distances[j + 1], new_distances[-1]))
+        distances = new_distances
+    return 1 - (distances[-1] / max(len(s1), len(s2)))
+
+
+def make_names(n: int, seed: int = 0) -> list[str]:
+    """Generate snake_case names of 2-6 terms (about 10-60 characters)."""
+    rng = random.Random(seed)
+    return ["_".join(rng.sample(TERMS, rng.randint(2, 6))) for _ in range(n)]
+
+
+def bench(fn, pairs) -> tuple[float, list[float]]:
+    start = time.perf_counter()
+    results = [fn(a, b) for a, b in pairs]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--names", type=int, default=150, help="Number of names (all pairs)")
+    parser.add_argument(
+        "--min-ratio", type=float, default=0.8, help="Threshold for the early-exit run"
+    )
+    args = parser.parse_args()
+
+    names = make_names(args.names)
+    pairs = [(a, b) for a in names for b in names]
+    avg_len = sum(len(n) for n in names) / len(names)
+
+    dp_time, expected = bench(dp_ratio, pairs)
+    bp_time, actual = bench(levenshtein_ratio, pairs)
+    bound_time, bounded = bench(lambda a, b: levenshtein_ratio(a, b, args.min_ratio), pairs)
+
+    assert actual == expected, "bit-parallel results differ from DP"
+    assert all(
+        r == e or (r == 0.0 and e < args.min_ratio) for r, e in zip(bounded, expected)
+    ), "bounded results differ above threshold"
+
+    print(f"{len(pairs)} pairs, average name length {avg_len:.1f} chars")
+    print(f"  list DP:                     {dp_time * 1000:8.1f} ms")
+    print(f"  bit-parallel:                {bp_time * 1000:8.1f} ms  ({dp_time / bp_time:.1f}x)")
+    print(
+        f"  bit-parallel, min_ratio={args.min_ratio}: {bound_time * 1000:8.1f} ms  "
+        f"({dp_time / bound_time:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
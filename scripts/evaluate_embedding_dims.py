@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Evaluate Matryoshka embedding truncation: embedding_similarity at each dimension.
+
+Embeds labelled knowledge items once at the backend's full dimension, then for
+each truncated dimension recomputes the embedding_similarity feature (column 0
+of extract_features_matrix; the other features do not depend on embeddings)
+and reports how far it moves from the full-dimension value, how well it still
+separates same-group from different-group pairs (ROC AUC), and the memory and
+matmul cost per dimension. Use it to pick QUPLED_EMBEDDING_DIMENSIONS.
+
+Items default to a small built-in set of paraphrase groups; pass --items with a
+JSON list of {"description": ..., "group": ...} objects to use your own data.
+
+Usage:
+    python scripts/evaluate_embedding_dims.py --backend hashing
+    python scripts/evaluate_embedding_dims.py --items items.json --dims 2048 1024 512 256
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.embedding_backends import create_embedding_backend  # noqa: E402
+from core.features import extract_features_matrix, normalize_embeddings  # noqa: E402
+
+PARAPHRASES = {
+    "kinematics": [
+        "Calculate velocity using kinematic equations",
+        "Compute the final speed of a body with the equations of motion",
+        "Find velocity from constant acceleration kinematics",
+    ],
+    "integration_by_parts": [
+        "Integrate a product of functions using integration by parts",
+        "Apply the integration by parts formula to evaluate an integral",
+        "Evaluate integrals of products with the by-parts rule",
+    ],
+    "eigenvalues": [
+        "Compute eigenvalues and eigenvectors of a square matrix",
+        "Find the eigenvalues of a matrix from its characteristic polynomial",
+        "Diagonalize a matrix by computing its eigen decomposition",
+    ],
+    "bayes": [
+        "Apply Bayes theorem to compute a conditional probability",
+        "Update a prior probability with Bayes rule given evidence",
+        "Compute posterior probabilities using Bayes formula",
+    ],
+    "dijkstra": [
+        "Find shortest paths in a weighted graph with Dijkstra's algorithm",
+        "Run Dijkstra to compute minimum distances from a source node",
+        "Compute single-source shortest paths on non-negative weighted graphs",
+    ],
+    "thevenin": [
+        "Derive the Thevenin equivalent of a linear circuit",
+        "Reduce a circuit to its Thevenin voltage source and resistance",
+        "Compute Thevenin equivalent resistance and open-circuit voltage",
+    ],
+    "taylor": [
+        "Expand a function in a Taylor series around a point",
+        "Approximate a function with its Taylor polynomial",
+        "Compute the Maclaurin series expansion of a function",
+    ],
+    "hypothesis_testing": [
+        "Perform a hypothesis test and compute the p-value",
+        "Test a null hypothesis with a t-test at a given significance level",
+        "Decide whether to reject the null hypothesis from sample data",
+    ],
+}
+
+
+def load_items(path: str | None) -> list[dict]:
+    """Load labelled items from JSON, or build them from the built-in paraphrases."""
+    if path:
+        return json.loads(Path(path).read_text())
+    return [
+        {"description": text, "group": group}
+        for group, texts in PARAPHRASES.items()
+        for text in texts
+    ]
+
+
+def roc_auc(scores: np.ndarray, labels: np.ndarray) -> float:
+    """ROC AUC via the Mann-Whitney U statistic (ties count half)."""
+    positives, negatives = scores[labels], scores[~labels]
+    if len(positives) == 0 or len(negatives) == 0:
+        return float("nan")
+    greater = (positives[:, None] > negatives[None, :]).sum()
+    ties = (positives[:, None] == negatives[None, :]).sum()
+    return float((greater + 0.5 * ties) / (len(positives) * len(negatives)))
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman rank correlation (ordinal ranks)."""
+    rank_a = np.argsort(np.argsort(a)).astype(np.float64)
+    rank_b = np.argsort(np.argsort(b)).astype(np.float64)
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--backend", help="Embedding backend (default: QUPLED_EMBEDDING_BACKEND)")
+    parser.add_argument("--items", help="JSON file with [{'description', 'group'}, ...]")
+    parser.add_argument(
+        "--dims",
+        type=int,
+        nargs="+",
+        default=[2048, 1024, 512, 256, 128, 64],
+        help="Truncated dimensions to evaluate (the full dimension is always included)",
+    )
+    args = parser.parse_args()
+
+    backend = create_embedding_backend(args.backend)
+    items = load_items(args.items)
+    raw = backend.embed([item["description"] for item in items])
+    full_dim = len(raw[0])
+    dims = [full_dim] + sorted({d for d in args.dims if d < full_dim}, reverse=True)
+
+    # Unordered pairs i < j; label = same group
+    groups = np.array([item.get("group") for item in items], dtype=object)
+    upper = np.triu_indices(len(items), k=1)
+    labels = (groups[:, None] == groups[None, :])[upper]
+
+    print(
+        f"Backend {backend.namespace}: {len(items)} items, {len(labels)} pairs "
+        f"({int(labels.sum())} same-group), full dim {full_dim}"
+    )
+    print(
+        f"{'dim':>6} {'bytes/vec':>10} {'matmul ms':>10} {'mean |d|':>9} {'max |d|':>8} "
+        f"{'spearman':>9} {'AUC':>6}"
+    )
+
+    reference = None
+    for dim in dims:
+        embeddings = normalize_embeddings(raw, dim)
+        similarity = extract_features_matrix(items, items, embeddings, embeddings)[:, :, 0][upper]
+        if reference is None:
+            reference = similarity
+
+        matrix = np.asarray(embeddings)
+        start = time.perf_counter()
+        for _ in range(10):
+            matrix @ matrix.T
+        matmul_ms = (time.perf_counter() - start) / 10 * 1000
+
+        diff = np.abs(similarity - reference)
+        print(
+            f"{dim:>6} {dim * 4:>10} {matmul_ms:>10.3f} {diff.mean():>9.4f} {diff.max():>8.4f} "
+            f"{spearman(similarity, reference):>9.4f} {roc_auc(similarity, labels):>6.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -67,6 +67,8 @@ from models.llm_manager import LLMManager
 try:
     from core.active_learning import ActiveClassifier
     from core.features import compute_embedding, cosine_similarity
+    from core.model_snapshots import ModelSnapshotStore
+    from core.transitive import PersistentTransitiveInference
     ACTIVE_LEARNING_AVAILABLE = True
 except ImportError:
     ACTIVE_LEARNING_AVAILABLE = False
@@ -78,6 +80,7 @@ except ImportError:
 TEST_DATA_PATH = Path("/home/laimk/git/qupled-cloud/test-data")
 TEST_RESULTS_PATH = Path(__file__).parent.parent / "test-results"
 TRAINING_CACHE_PATH = Path(__file__).parent.parent / ".qupled" / "training_cache.json"
+DECISIONS_DB_PATH = Path(__file__).parent.parent / ".qupled" / "decisions.db"
 
 COURSES = {
     "ADE-EXAMS": "Architettura degli Elaboratori",
@@ -244,7 +247,12 @@ class PipelineTester:
         """Lazy init active learning classifier with optional warm start."""
         if self.use_active_learning and ACTIVE_LEARNING_AVAILABLE:
             if self.active_classifier is None:
-                self.active_classifier = ActiveClassifier()
+                # Committee snapshots next to the training cache: warm starts skip the refit
+                # LLM decisions persist across runs, so repeated merges skip known pairs
+                self.active_classifier = ActiveClassifier(
+                    snapshots=ModelSnapshotStore(TRAINING_CACHE_PATH.parent / "models"),
+                    transitive=PersistentTransitiveInference(db_path=DECISIONS_DB_PATH),
+                )
 
                 # Warm start from training data
                 if self.training_path and Path(self.training_path).exists():
@@ -404,21 +412,20 @@ class PipelineTester:
             # Group exercises by KI name for description generation
             ki_exercises: dict[str, list[dict]] = {}
 
-            # Analyze each exercise to get KI names
+            # Analyze all exercises concurrently to get KI names
+            to_analyze = []
             for ex in result.exercise_details:
                 is_sub = ex.get("is_sub", False)
                 if not is_sub and ex.get("context"):
                     text_for_analysis = ex.get("context", "")
                 else:
                     text_for_analysis = ex.get("text_full", ex.get("text_preview", ""))
+                to_analyze.append({"exercise_text": text_for_analysis, "is_sub_question": is_sub})
 
-                analysis = self.analyzer.analyze_exercise(
-                    exercise_text=text_for_analysis,
-                    course_name=course_name,
-                    exercise_context=None,
-                    is_sub_question=is_sub,
-                )
+            analyses = self.analyzer.analyze_exercises(to_analyze, course_name=course_name)
 
+            for ex, analysis in zip(result.exercise_details, analyses):
+                is_sub = ex.get("is_sub", False)
                 ki_name = None
                 learning_approach = None
                 if analysis.knowledge_items:
@@ -513,7 +520,8 @@ class PipelineTester:
                 description = generate_item_description(exs, self.llm)
                 items.append(
                     {
-                        "id": len(items),  # Index as ID
+                        # Stable across runs: persisted merge decisions are keyed by it
+                        "id": f"{course_name}/{pdf_path.name}/{name}",
                         "name": name,
                         "description": description,
                         "exercises": exs,
@@ -1223,9 +1231,13 @@ class TestRunner:
 
         try:
             self.tester._init_llm()
+            self.tester._init_active_learning()
 
-            # Use classify_items to find groups
-            final_groups, _ = classify_items(items, [], self.tester.llm)
+            # Use classify_items to find groups (pairs decided in earlier runs skip the LLM)
+            final_groups, _ = classify_items(
+                items, [], self.tester.llm,
+                active_classifier=self.tester.active_classifier,
+            )
 
             found_cross_pdf = False
             for group in final_groups:
@@ -778,6 +778,33 @@ class Database:
             )
         """)
 
+        self.create_transitive_edges_table()
+
+    def create_transitive_edges_table(self):
+        """Create the transitive decision graph table and its indexes (idempotent)."""
+        # Pairwise merge decisions (active learning) keyed by stable knowledge
+        # item ids, stored once per pair (item_a < item_b)
+        # Web-ready: user_id nullable for CLI mode, included in unique constraint
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS transitive_edges (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT,                        -- NULL for CLI/global, set for web multi-tenant
+                item_a TEXT NOT NULL,
+                item_b TEXT NOT NULL,
+                is_match INTEGER NOT NULL,
+                confidence REAL NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(user_id, item_a, item_b)
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transitive_edges_a ON transitive_edges(user_id, item_a)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transitive_edges_b ON transitive_edges(user_id, item_b)"
+        )
+
     def _create_indexes(self):
         """Create database indexes for performance."""
         indexes = [
@@ -2598,3 +2625,77 @@ class Database:
                 "course_entries": course_count,
                 "global_entries": global_count,
             }
+
+    # Transitive decision graph operations (active learning)
+
+    def store_transitive_edge(
+        self,
+        item_a: str,
+        item_b: str,
+        is_match: bool,
+        confidence: float,
+        user_id: Optional[str] = None,
+    ):
+        """Store (or overwrite) the merge decision for a pair of knowledge items.
+
+        Args:
+            item_a: Stable knowledge item ID
+            item_b: Stable knowledge item ID (order does not matter)
+            is_match: Whether the items were judged the same skill
+            confidence: Decision confidence (0.0-1.0)
+            user_id: Optional user ID for multi-tenant isolation (None = CLI mode)
+        """
+        item_a, item_b = sorted((item_a, item_b))
+        # UNIQUE does not treat NULL user_ids as equal, so upsert by hand
+        cursor = self.conn.execute(
+            """
+            UPDATE transitive_edges
+            SET is_match = ?, confidence = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE user_id IS ? AND item_a = ? AND item_b = ?
+        """,
+            (int(is_match), confidence, user_id, item_a, item_b),
+        )
+        if cursor.rowcount == 0:
+            self.conn.execute(
+                """
+                INSERT INTO transitive_edges (user_id, item_a, item_b, is_match, confidence)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                (user_id, item_a, item_b, int(is_match), confidence),
+            )
+
+    def get_transitive_edges(
+        self, item_ids: List[str], user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get stored decisions touching any of the given knowledge items.
+
+        Args:
+            item_ids: Stable knowledge item IDs
+            user_id: Optional user ID for multi-tenant isolation.
+                    If None (CLI mode), returns edges with user_id IS NULL.
+
+        Returns:
+            List of edge dicts with item_a, item_b, is_match (bool), confidence
+        """
+        ids = list(dict.fromkeys(item_ids))
+        edges: Dict[tuple, Dict[str, Any]] = {}
+        # Stay well below SQLite's host parameter limit
+        for start in range(0, len(ids), 400):
+            chunk = ids[start : start + 400]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self.conn.execute(
+                f"""
+                SELECT item_a, item_b, is_match, confidence FROM transitive_edges
+                WHERE user_id IS ? AND (item_a IN ({placeholders}) OR item_b IN ({placeholders}))
+            """,
+                (user_id, *chunk, *chunk),
+            )
+            for row in cursor.fetchall():
+                edge = dict(row)
+                edge["is_match"] = bool(edge["is_match"])
+                edges[(edge["item_a"], edge["item_b"])] = edge
+        return list(edges.values())
+
+    def delete_transitive_edges(self, user_id: Optional[str] = None):
+        """Delete all stored decisions of a user (None = CLI mode)."""
+        self.conn.execute("DELETE FROM transitive_edges WHERE user_id IS ?", (user_id,))
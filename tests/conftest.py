@@ -0,0 +1,63 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def isolated_config(tmp_path, monkeypatch):
+    """Point all Config data/cache paths at a temporary directory."""
+    from config import Config
+
+    for attr in (
+        "DATA_DIR",
+        "FILES_PATH",
+        "PDFS_PATH",
+        "IMAGES_PATH",
+        "CACHE_PATH",
+        "STUDY_STRATEGY_CACHE_DIR",
+    ):
+        monkeypatch.setattr(Config, attr, tmp_path)
+    monkeypatch.setattr(Config, "LLM_CACHE_PATH", tmp_path / "llm_cache.db")
+    monkeypatch.setattr(Config, "RATE_LIMIT_DB_PATH", tmp_path / "rate_limits.db")
+    return Config
+
+
+@pytest.fixture(autouse=True)
+def isolated_embedding_store(tmp_path_factory, monkeypatch):
+    """Keep the persistent embedding store out of the repo's data directory."""
+    from config import Config
+    from core import features
+
+    monkeypatch.setattr(Config, "EMBEDDING_STORE_PATH", tmp_path_factory.mktemp("embeddings"))
+    monkeypatch.setattr(features, "_embedding_store", None)
+    monkeypatch.setattr(features, "_embedding_dispatcher", None)
+    monkeypatch.setattr(features, "_embedding_backend", None)
+
+
+@pytest.fixture
+def fake_embedding_backend(monkeypatch):
+    """Install an offline embedding backend that records each batch it embeds.
+
+    Vectors are [len(text), 1, 0, ...] so tests can tell texts apart.
+    """
+    import numpy as np
+
+    from core import features
+    from core.embedding_backends import EmbeddingBackend
+
+    class FakeBackend(EmbeddingBackend):
+        dim = 8
+        namespace = "fake"
+
+        def __init__(self):
+            self.calls = []
+
+        def embed(self, texts):
+            self.calls.append(list(texts))
+            return [np.array([len(t), 1.0] + [0.0] * (self.dim - 2), np.float32) for t in texts]
+
+    backend = FakeBackend()
+    monkeypatch.setattr(features, "_embedding_backend", backend)
+    return backend
@@ -3,6 +3,7 @@ Tests for active learning classification system.
 """
 
 import numpy as np
+import pytest
 
 
 class TestPairFeatures:
@@ -128,6 +129,230 @@ class TestTransitiveInference:
         assert "c" in component_a
         assert "d" not in component_a  # Different component
 
+    def test_component_index(self):
+        from core.transitive import TransitiveInference
+
+        ti = TransitiveInference()
+        ti.add_edge("a", "b", True, 0.95)
+        ti.add_edge("c", "d", True, 0.95)
+        ti.add_edge("b", "c", False, 0.9)
+        ti.add_edge("d", "e", True, 0.5)  # Too weak to merge components
+
+        assert not ti.same_component("a", "d")
+        assert ti.known_different("a", "d")
+
+        ti.add_edge("e", "f", True, 0.95)
+        ti.add_edge("b", "e", True, 0.95)  # Merges {a, b} and {e, f}
+
+        assert ti.same_component("a", "f")
+        assert ti.known_different("f", "c")  # Constraint follows the merged component
+        assert ti.get_component("f") == {"a", "b", "e", "f"}
+
+    def test_non_match_inference(self):
+        from core.transitive import TransitiveInference
+
+        ti = TransitiveInference()
+        ti.add_edge("a", "b", True, 0.95)
+        ti.add_edge("b", "c", False, 0.95)
+        ti.add_edge("c", "d", False, 0.95)
+
+        result = ti.infer("a", "c")
+        assert result is not None
+        assert result[0] is False
+        assert ti.infer("a", "d") is None  # Two non-matches infer nothing
+
+    def test_overwritten_edge_splits_component(self):
+        from core.transitive import TransitiveInference
+
+        ti = TransitiveInference()
+        ti.add_edge("a", "b", True, 0.95)
+        ti.add_edge("b", "c", True, 0.95)
+        assert ti.same_component("a", "c")
+
+        ti.add_edge("b", "c", False, 0.95)  # Corrected decision
+
+        assert not ti.same_component("a", "c")
+        assert ti.known_different("a", "c")
+        assert ti.infer("a", "c")[0] is False
+
+    def test_best_path_regardless_of_visit_order(self):
+        from core.transitive import TransitiveInference
+
+        ti = TransitiveInference(min_confidence=0.7)
+        ti.add_edge("a", "b", True, 0.8)  # Reaches b first, but weakly
+        ti.add_edge("a", "c", True, 0.99)
+        ti.add_edge("c", "b", True, 0.99)
+        ti.add_edge("b", "d", True, 0.95)
+
+        is_match, conf = ti.infer("a", "d")
+
+        assert is_match is True
+        assert conf == pytest.approx(0.99 * 0.99 * 0.95)
+
+    def test_path_length_bound(self):
+        from core.transitive import TransitiveInference
+
+        ti = TransitiveInference(min_confidence=0.5, max_path_length=2)
+        for x, y in [("a", "b"), ("b", "c"), ("c", "d")]:
+            ti.add_edge(x, y, True, 0.99)
+
+        assert ti.infer("a", "c") is not None
+        assert ti.infer("a", "d") is None
+
+    def test_cached_search_invalidated_by_new_edge(self, monkeypatch):
+        from core.transitive import TransitiveInference
+
+        ti = TransitiveInference()
+        ti.add_edge("a", "b", True, 0.9)
+        ti.add_edge("b", "c", True, 0.9)
+        ti.add_edge("x", "y", True, 0.9)
+
+        searches = []
+        search = ti._search
+        monkeypatch.setattr(ti, "_search", lambda source: searches.append(source) or search(source))
+
+        assert ti.infer("a", "c")[1] == pytest.approx(0.81)
+        assert ti.infer("c", "a")[1] == pytest.approx(0.81)
+        assert len(searches) == 1  # Reused in both directions
+
+        ti.add_edge("y", "z", True, 0.9)  # Outside the search: cache kept
+        ti.infer("a", "c")
+        assert len(searches) == 1
+
+        ti.add_edge("a", "c", False, 0.95)  # Corrected decision
+        ti.add_edge("c", "d", True, 0.95)
+        assert ti.infer("a", "d") == (False, pytest.approx(0.95 * 0.95))
+        assert len(searches) == 2
+
+    def test_seeded_from_graph_mapping(self):
+        from core.transitive import TransitiveInference
+
+        ti = TransitiveInference(graph={"a": {"b": (True, 0.9)}, "b": {"c": (True, 0.9)}})
+
+        assert ti.infer("a", "c") == (True, pytest.approx(0.81))
+        assert ti.graph["b"] == {"a": (True, 0.9), "c": (True, 0.9)}
+        with pytest.raises(TypeError):
+            ti.graph["a"]["c"] = (False, 0.9)  # Snapshot: use add_edge
+
+    def test_shared_between_threads(self):
+        import threading
+
+        from core.transitive import TransitiveInference
+
+        ti = TransitiveInference()
+        errors = []
+
+        def writer(offset):
+            for i in range(300):
+                ti.add_edge(f"n{i}", f"n{i + 1}", True, 0.99)
+                ti.add_edge(f"n{i}", f"m{i + offset}", i % 2 == 0, 0.9)
+
+        def reader():
+            try:
+                for i in range(300):
+                    ti.infer(f"n{i}", f"n{i + 2}")
+                    ti.get_component(f"n{i}")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(k,)) for k in range(2)]
+        threads += [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert ti.infer("n0", "n2") == (True, pytest.approx(0.99 * 0.99))
+
+
+class TestPersistentTransitiveInference:
+    """Test the database-backed decision graph."""
+
+    def test_decisions_survive_restart(self, tmp_path):
+        from core.transitive import PersistentTransitiveInference
+
+        db_path = tmp_path / "qupled.db"
+        ti = PersistentTransitiveInference(db_path=db_path)
+        ti.add_edge("a", "b", True, 0.95)
+        ti.add_edge("b", "c", True, 0.9)
+        ti.add_edge("b", "c", False, 0.9)  # Overwritten, not duplicated
+        ti.close()
+
+        reopened = PersistentTransitiveInference(db_path=db_path)
+        assert len(reopened) == 0  # Nothing loaded until needed
+
+        reopened.load(["a", "c"])
+
+        assert reopened.infer("a", "b") == (True, 0.95)
+        assert reopened.infer("a", "c")[0] is False
+
+    def test_loads_only_neighbourhood(self, tmp_path):
+        from core.transitive import PersistentTransitiveInference
+
+        db_path = tmp_path / "qupled.db"
+        ti = PersistentTransitiveInference(db_path=db_path)  # max_path_length=3
+        for x, y in [("a", "b"), ("b", "c"), ("c", "d"), ("d", "e"), ("x", "y")]:
+            ti.add_edge(x, y, True, 0.99)
+
+        reopened = PersistentTransitiveInference(db_path=db_path)
+        reopened.load(["a", "d"])
+
+        assert reopened.infer("a", "d") is not None  # Path a-b-c-d fully loaded
+        assert "x" not in reopened.graph
+        assert "e" in reopened.graph  # Edge d-e touches a seed
+
+    def test_scoped_by_user(self, tmp_path):
+        from core.transitive import PersistentTransitiveInference
+
+        db_path = tmp_path / "qupled.db"
+        PersistentTransitiveInference(db_path=db_path, user_id="u1").add_edge("a", "b", True, 0.95)
+
+        other = PersistentTransitiveInference(db_path=db_path, user_id="u2")
+        cli = PersistentTransitiveInference(db_path=db_path)
+        other.load(["a", "b"])
+        cli.load(["a", "b"])
+
+        assert other.infer("a", "b") is None
+        assert cli.infer("a", "b") is None
+
+    def test_creates_only_its_table(self, tmp_path):
+        import sqlite3
+
+        from core.transitive import PersistentTransitiveInference
+
+        db_path = tmp_path / "decisions.db"
+        PersistentTransitiveInference(db_path=db_path).add_edge("a", "b", True, 0.95)
+
+        conn = sqlite3.connect(db_path)
+        tables = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        conn.close()
+        assert {name for (name,) in tables} - {"sqlite_sequence"} == {"transitive_edges"}
+
+    def test_classifier_skips_llm_for_stored_pairs(self, tmp_path, fake_embedding_backend):
+        from core.active_learning import ActiveClassifier
+        from core.transitive import PersistentTransitiveInference
+
+        db_path = tmp_path / "qupled.db"
+        item = {"id": "ki-new", "name": "n", "description": "new item"}
+        groups = [{"id": "ki-1", "name": "g", "description": "group"}]
+        calls = []
+
+        def llm_classify(new_item, candidate_groups):
+            calls.append(new_item["id"])
+            return {"is_new": False, "confidence": 0.95}
+
+        first = ActiveClassifier(transitive=PersistentTransitiveInference(db_path=db_path))
+        first.classify(item, groups, llm_classify)
+        assert calls == ["ki-new"]
+
+        second = ActiveClassifier(transitive=PersistentTransitiveInference(db_path=db_path))
+        result = second.classify(item, groups, llm_classify)
+
+        assert calls == ["ki-new"]  # Decided in the earlier session
+        assert result.group_id == "ki-1"
+        assert result.method == "transitive"
+
 
 class TestActiveLearner:
     """Test the active learner (QBC)."""
@@ -341,6 +566,21 @@ class TestCatBoostActiveLearner:
 
         assert len(learner.X_train) == initial_samples + 1
 
+    def test_parallel_fit_matches_sequential(self):
+        """Members fitted concurrently give the same committee as sequential fits."""
+        from core.active_learning import CatBoostActiveLearner
+
+        rng = np.random.default_rng(0)
+        X = rng.random((60, 7))
+        y = (X[:, 0] > 0.5).astype(int)
+
+        sequential = CatBoostActiveLearner(n_estimators=3, n_jobs=1)
+        parallel = CatBoostActiveLearner(n_estimators=3, n_jobs=3)
+        sequential.fit_with_early_stopping(X, y)
+        parallel.fit_with_early_stopping(X, y)
+
+        np.testing.assert_array_equal(sequential.predict_proba(X), parallel.predict_proba(X))
+
 
 class TestFactoryFunction:
     """Test the active learner factory function."""
@@ -451,3 +691,206 @@ class TestBackwardCompatibility:
         assert result is True
         # Model state should be the same as before (no inline retrain)
         assert classifier.learner.is_fitted == initial_fitted
+
+
+class TestBatchedClassification:
+    """Test that batched scoring matches pair-by-pair decisions."""
+
+    def _fitted_classifier(self):
+        from core.active_learning import ActiveClassifier
+
+        rng = np.random.default_rng(0)
+        X = rng.random((60, 7))
+        y = (X[:, 0] > 0.5).astype(int)
+
+        classifier = ActiveClassifier()
+        classifier.load_training_data(
+            [{"features": row.tolist(), "label": int(label)} for row, label in zip(X, y)]
+        )
+        return classifier
+
+    def _pairs(self, n=25):
+        from core.features import PairFeatures
+
+        rng = np.random.default_rng(1)
+        groups = [{"id": f"g{i}", "description": f"Group {i}"} for i in range(n)]
+        features = [PairFeatures(*rng.random(4), True, False, rng.random()) for _ in range(n)]
+        return groups, features
+
+    def test_decide_batch_matches_decide(self):
+        classifier = self._fitted_classifier()
+        new_item = {"id": "new", "description": "New item"}
+        groups, features = self._pairs()
+        classifier.transitive.add_edge("new", "g3", True, 0.95)
+
+        batched = classifier.decide_batch(new_item, groups, features)
+        single = [classifier.decide(new_item, g, f) for g, f in zip(groups, features)]
+
+        assert batched == single
+        assert batched[3] == ("match", 0.95, False)
+
+    def test_one_model_call_per_committee_member(self, monkeypatch):
+        classifier = self._fitted_classifier()
+        groups, features = self._pairs()
+        calls = []
+        original = classifier.learner.predict_proba
+        monkeypatch.setattr(
+            classifier.learner,
+            "predict_proba",
+            lambda X: calls.append(len(X)) or original(X),
+        )
+
+        classifier.decide_batch({"id": "new"}, groups, features)
+
+        assert calls == [len(groups)]
+
+    def test_classify_embeds_in_one_batch(self, fake_embedding_backend):
+        classifier = self._fitted_classifier()
+        batches = fake_embedding_backend.calls
+        groups = [{"id": f"g{i}", "description": f"Group number {i}"} for i in range(10)]
+
+        result = classifier.classify(
+            {"id": "new", "description": "A new item"},
+            groups,
+            lambda item, candidates: {"is_new": True, "confidence": 0.9},
+        )
+
+        assert len(batches) == 1
+        assert len(batches[0]) == 11
+        assert result.is_new or result.group_id is not None
+
+    def test_classify_builds_feature_matrix_once(self, fake_embedding_backend, monkeypatch):
+        from core import features
+        from core.active_learning import ActiveClassifier
+
+        classifier = ActiveClassifier()  # Unfitted: every pair goes to the LLM
+        new_item = {"id": "new", "name": "Item", "description": "Write a loop"}
+        group = {"id": "g0", "name": "Items", "description": "Write a for loop"}
+        expected = features.extract_features(new_item, group).to_vector()
+        matrices, recorded = [], []
+        original = features.extract_features_matrix
+
+        def fail(*args, **kwargs):
+            raise AssertionError("classify must not extract features pair by pair")
+
+        monkeypatch.setattr(features, "extract_features", fail)
+        monkeypatch.setattr(
+            features,
+            "extract_features_matrix",
+            lambda *args: matrices.append(args) or original(*args),
+        )
+        monkeypatch.setattr(
+            classifier, "record_decision", lambda a, b, f, *args: recorded.append(f)
+        )
+
+        classifier.classify(
+            new_item, [group], lambda item, candidates: {"is_new": True, "confidence": 0.9}
+        )
+
+        assert len(matrices) == 1
+        np.testing.assert_allclose(recorded[0].to_vector(), expected, atol=1e-6)
+
+
+class TestFeatureMatrix:
+    """Test the vectorized N x M feature extraction."""
+
+    def _items(self, prefix, n, seed):
+        rng = np.random.default_rng(seed)
+        verbs = ["Calculate", "Compute", "Derive", "Explain"]
+        words = ["velocity", "speed", "force", "mass", "energy", "kinematic", "equations"]
+        items = []
+        for i in range(n):
+            desc = " ".join([verbs[i % 4]] + list(rng.choice(words, size=3 + i % 3)))
+            items.append(
+                {
+                    "name": f"{prefix}_{words[i % 7]}",
+                    "description": desc if i % 5 else "",
+                    "category": None if i % 6 == 0 else f"cat{i % 2}",
+                }
+            )
+        from core.features import normalize_embeddings
+
+        vectors = [rng.standard_normal(16) if i % 4 else np.zeros(16) for i in range(n)]
+        return items, normalize_embeddings(vectors, 16)
+
+    def test_matches_scalar_path(self):
+        from core.features import extract_features, extract_features_matrix
+
+        items, item_emb = self._items("item", 7, seed=0)
+        groups, group_emb = self._items("group", 9, seed=1)
+
+        matrix = extract_features_matrix(items, groups, item_emb, group_emb)
+
+        assert matrix.shape == (7, 9, 7)
+        for i, (item, ea) in enumerate(zip(items, item_emb)):
+            for j, (group, eb) in enumerate(zip(groups, group_emb)):
+                expected = extract_features(item, group, ea, eb).to_vector()
+                np.testing.assert_allclose(matrix[i, j, 0], expected[0], atol=1e-6)
+                np.testing.assert_array_equal(matrix[i, j, 1:], expected[1:])
+
+    def test_empty_inputs(self):
+        from core.features import extract_features_matrix
+
+        assert extract_features_matrix([], [{"description": "x"}]).shape == (0, 1, 7)
+
+
+class TestModelSnapshots:
+    """Test that fitted committees are saved and reloaded instead of refit."""
+
+    def _records(self, n, seed=0):
+        rng = np.random.default_rng(seed)
+        X = rng.random((n, 7))
+        y = (X[:, 0] > 0.5).astype(int)
+        return [{"features": row.tolist(), "label": int(label)} for row, label in zip(X, y)]
+
+    def _count_fits(self, monkeypatch):
+        from core.active_learning import CatBoostActiveLearner
+
+        fits = []
+        original = CatBoostActiveLearner.fit
+        monkeypatch.setattr(
+            CatBoostActiveLearner,
+            "fit",
+            lambda self, X, y: fits.append(len(X)) or original(self, X, y),
+        )
+        return fits
+
+    def _classifier(self, tmp_path, threshold=10):
+        from core.active_learning import ActiveClassifier
+        from core.model_snapshots import ModelSnapshotStore
+
+        return ActiveClassifier(snapshots=ModelSnapshotStore(tmp_path), retrain_threshold=threshold)
+
+    def test_reload_skips_refit(self, tmp_path, monkeypatch):
+        fits = self._count_fits(monkeypatch)
+        records = self._records(40)
+        first = self._classifier(tmp_path)
+        first.load_training_data(records)
+
+        second = self._classifier(tmp_path)
+        second.load_training_data(records)
+
+        assert fits == [40]
+        X = np.array([r["features"] for r in records[:5]])
+        np.testing.assert_allclose(second.learner.predict_proba(X), first.learner.predict_proba(X))
+
+    def test_refits_once_new_records_cross_threshold(self, tmp_path, monkeypatch):
+        fits = self._count_fits(monkeypatch)
+        records = self._records(40) + self._records(20, seed=1)
+        self._classifier(tmp_path).load_training_data(records[:40])
+
+        # 9 newer records: snapshot reused (but kept for incremental training)
+        classifier = self._classifier(tmp_path)
+        classifier.load_training_data(records[:49])
+        assert fits == [40]
+        assert len(classifier.learner.X_train) == 49
+        assert classifier.pending_records == 9  # Fitted on 40 of the 49
+
+        self._classifier(tmp_path).load_training_data(records[:50])
+        assert fits == [40, 50]
+
+    def test_changed_records_refit(self, tmp_path, monkeypatch):
+        fits = self._count_fits(monkeypatch)
+        self._classifier(tmp_path).load_training_data(self._records(40))
+        self._classifier(tmp_path).load_training_data(self._records(40, seed=2))
+        assert fits == [40, 40]
@@ -0,0 +1,117 @@
+"""
+Tests for the micro-batching dispatcher.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.batch_dispatcher import BatchDispatcher
+
+
+class TestBatchDispatcher:
+    """Test batching, fan-out, and error propagation."""
+
+    def test_concurrent_submissions_share_batches(self):
+        batches = []
+        dispatcher = BatchDispatcher(
+            lambda items: batches.append(list(items)) or [i * 2 for i in items],
+            max_batch_size=64,
+            max_wait=0.05,
+        )
+        barrier = threading.Barrier(16)
+
+        def call(i):
+            barrier.wait()
+            return dispatcher.submit(i).result(timeout=5)
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(call, range(16)))
+
+        assert results == [i * 2 for i in range(16)]
+        assert len(batches) < 16
+        assert sorted(i for batch in batches for i in batch) == list(range(16))
+
+    def test_batch_size_cap_and_deduplication(self):
+        batches = []
+        dispatcher = BatchDispatcher(
+            lambda items: batches.append(list(items)) or list(items),
+            max_batch_size=3,
+            max_wait=0.05,
+        )
+        futures = [dispatcher.submit(i % 5) for i in range(10)]
+
+        assert [f.result(timeout=5) for f in futures] == [i % 5 for i in range(10)]
+        assert all(len(batch) <= 3 for batch in batches)
+        assert all(len(batch) == len(set(batch)) for batch in batches)
+
+    def test_errors_reach_every_caller(self):
+        def fail(items):
+            raise RuntimeError("API down")
+
+        dispatcher = BatchDispatcher(fail, max_wait=0.01)
+        futures = [dispatcher.submit(i) for i in range(3)]
+
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+
+    def test_submit_async(self):
+        dispatcher = BatchDispatcher(lambda items: [i + 1 for i in items], max_wait=0.01)
+
+        async def main():
+            return await asyncio.gather(*(dispatcher.submit_async(i) for i in range(5)))
+
+        assert asyncio.run(main()) == [1, 2, 3, 4, 5]
+
+    def test_cancelled_caller_does_not_strand_batch(self):
+        release = threading.Event()
+        batches = []
+
+        def slow(items):
+            release.wait(5)
+            batches.append(list(items))
+            return [i * 10 for i in items]
+
+        dispatcher = BatchDispatcher(slow, max_wait=0.05)
+
+        async def main():
+            cancelled = asyncio.ensure_future(dispatcher.submit_async(1))
+            others = [asyncio.ensure_future(dispatcher.submit_async(i)) for i in (1, 2)]
+            await asyncio.sleep(0)  # Submitted to the same batch window
+            cancelled.cancel()
+            await asyncio.sleep(0.01)
+            release.set()
+            return await asyncio.wait_for(asyncio.gather(*others), timeout=5)
+
+        assert asyncio.run(main()) == [10, 20]
+        assert dispatcher.submit(3).result(timeout=5) == 30  # Worker still alive
+
+
+class TestEmbeddingDispatch:
+    """Test that concurrent compute_embedding misses become shared API calls."""
+
+    def test_threads_share_api_requests(self, monkeypatch, fake_embedding_backend):
+        from core import features
+
+        calls = fake_embedding_backend.calls
+        monkeypatch.setattr(
+            features,
+            "_embedding_dispatcher",
+            BatchDispatcher(features._embed_and_store, max_batch_size=64, max_wait=0.05),
+        )
+        texts = [f"text {'x' * i}" for i in range(12)]
+        barrier = threading.Barrier(len(texts))
+
+        def call(text):
+            barrier.wait()
+            return features.compute_embedding(text)
+
+        with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+            vectors = list(pool.map(call, texts))
+
+        assert [v[0] / v[1] for v in vectors] == pytest.approx([len(t) for t in texts])
+        assert len(calls) < len(texts)
+        assert features.get_embedding_store().get(texts[5]) is not None
@@ -0,0 +1,74 @@
+"""
+Tests for pluggable embedding backends.
+"""
+
+import numpy as np
+import pytest
+
+from core.embedding_backends import (
+    HashingBackend,
+    OllamaBackend,
+    OpenRouterBackend,
+    create_embedding_backend,
+)
+
+
+class TestHashingBackend:
+    """Test the offline hashed n-gram embedder."""
+
+    def test_deterministic_unit_vectors(self):
+        texts = ["Calculate velocity from kinematic equations", "Integration by parts"]
+        first = HashingBackend(dim=256).embed(texts)
+        second = HashingBackend(dim=256).embed(texts)
+
+        for a, b in zip(first, second):
+            assert a.dtype == np.float32
+            assert a.shape == (256,)
+            assert np.array_equal(a, b)
+            assert np.linalg.norm(a) == pytest.approx(1.0, abs=1e-5)
+
+    def test_similar_texts_score_higher(self):
+        query, near, far = HashingBackend().embed(
+            [
+                "Calculate velocity using kinematic equations",
+                "Compute the velocity with kinematic equations",
+                "Eigenvalue decomposition of a symmetric matrix",
+            ]
+        )
+        assert query @ near > query @ far + 0.2
+
+    def test_empty_text_is_zero_vector(self):
+        (vector,) = HashingBackend(dim=32).embed(["  "])
+        assert not vector.any()
+
+    def test_namespace_depends_on_dimension(self):
+        assert HashingBackend(dim=256).namespace != HashingBackend(dim=512).namespace
+
+
+class TestBackendSelection:
+    """Test backend factory and features wiring."""
+
+    def test_factory(self):
+        assert isinstance(create_embedding_backend("hashing"), HashingBackend)
+        assert isinstance(create_embedding_backend("openrouter"), OpenRouterBackend)
+        with pytest.raises(ValueError):
+            create_embedding_backend("word2vec")
+
+    def test_ollama_dimension(self):
+        assert OllamaBackend("nomic-embed-text:latest").dim == 768
+        with pytest.raises(ValueError):
+            OllamaBackend("unknown-model")
+
+    def test_openrouter_namespace_matches_store_layout(self):
+        assert OpenRouterBackend("qwen/qwen3-embedding-8b").namespace == "qwen--qwen3-embedding-8b"
+
+    def test_features_use_selected_backend(self):
+        from core import features
+
+        features.set_embedding_backend("hashing")
+        single = features.compute_embedding("velocity of a falling body")
+        batch = features.compute_embeddings_batch(["velocity of a falling body", ""])
+
+        assert single.shape == (features.get_embedding_backend().dim,)
+        assert np.array_equal(single, batch[0])
+        assert not batch[1].any()
@@ -0,0 +1,145 @@
+"""
+Tests for the persistent embedding store.
+"""
+
+import numpy as np
+import pytest
+
+from core.embedding_store import EmbeddingStore
+
+
+def _vec(seed, dim=8):
+    return np.random.default_rng(seed).standard_normal(dim)
+
+
+class TestEmbeddingStore:
+    """Test the memory-mapped store and its working set."""
+
+    def test_put_and_get(self, tmp_path):
+        store = EmbeddingStore(tmp_path, dim=8)
+        store.put("hello", _vec(0))
+
+        result = store.get("hello")
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, _vec(0), rtol=1e-6)
+        assert store.get("missing") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        store = EmbeddingStore(tmp_path, dim=8)
+        store.put_many({f"t{i}": _vec(i) for i in range(300)})  # Forces the file to grow
+        store.close()
+
+        reopened = EmbeddingStore(tmp_path, dim=8)
+        results = reopened.get_many(["t0", "t299", "nope"])
+
+        np.testing.assert_allclose(results[0], _vec(0), rtol=1e-6)
+        np.testing.assert_allclose(results[1], _vec(299), rtol=1e-6)
+        assert results[2] is None
+        assert reopened.stats()["disk_hits"] == 2
+
+    def test_sees_rows_written_by_another_instance(self, tmp_path):
+        reader = EmbeddingStore(tmp_path, dim=8)
+        reader.put("first", _vec(0))
+        writer = EmbeddingStore(tmp_path, dim=8)
+        writer.put_many({f"t{i}": _vec(i) for i in range(1, 400)})
+
+        np.testing.assert_allclose(reader.get("t399"), _vec(399), rtol=1e-6)
+
+    def test_working_set_is_bounded_lru(self, tmp_path):
+        store = EmbeddingStore(tmp_path, dim=8, max_memory_entries=2)
+        store.put_many({"a": _vec(1), "b": _vec(2)})
+        store.get("a")
+        store.put("c", _vec(3))
+
+        assert store.stats()["memory_entries"] == 2
+        store.get("a")
+        store.get("b")  # Evicted from memory, served from disk
+        stats = store.stats()
+        assert stats["memory_hits"] == 2
+        assert stats["disk_hits"] == 1
+
+    def test_rejects_mismatched_dimension(self, tmp_path):
+        EmbeddingStore(tmp_path, dim=8)
+        with pytest.raises(ValueError):
+            EmbeddingStore(tmp_path, dim=16)
+
+
+class TestFeaturesReadThrough:
+    """Test that compute_embedding(s) only call the API for unseen texts."""
+
+    def test_batch_then_single(self, fake_embedding_backend):
+        from core import features
+
+        calls = fake_embedding_backend.calls
+
+        batch = features.compute_embeddings_batch(["ab", "", "abc"])
+        assert calls == [["ab", "abc"]]
+        assert not batch[1].any()
+
+        features.compute_embeddings_batch(["abc", "abcd"])
+        single = features.compute_embedding("ab")
+        assert calls == [["ab", "abc"], ["abcd"]]
+        assert single[0] / single[1] == pytest.approx(2.0)  # Normalized [2, 1, 0, ...]
+
+
+class TestCompactEmbeddings:
+    """Test that embeddings are stored pre-normalized and optionally truncated."""
+
+    def test_normalize_truncates_and_keeps_zeros(self):
+        from core.features import normalize_embeddings
+
+        unit, zero = normalize_embeddings([[3.0, 4.0, 12.0], [0.0, 0.0, 0.0]], dim=2)
+
+        assert unit.dtype == np.float32
+        np.testing.assert_allclose(unit, [0.6, 0.8], rtol=1e-6)
+        assert not zero.any()
+
+    def test_truncated_unit_embeddings(self, monkeypatch, fake_embedding_backend):
+        from config import Config
+        from core import features
+
+        monkeypatch.setattr(Config, "EMBEDDING_DIMENSIONS", 4)
+        vector = features.compute_embedding("abc")
+
+        assert features.get_embedding_store().dim == 4
+        assert vector.shape == (4,) and vector.dtype == np.float32
+        assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-6)
+        assert features.compute_embedding("").shape == (4,)
+
+    def test_similarity_is_dot_product(self, fake_embedding_backend, monkeypatch):
+        from core import features
+
+        a = {"description": "ab"}
+        b = {"description": "abcd"}
+        unit_a, unit_b = features.compute_embedding("ab"), features.compute_embedding("abcd")
+        expected = float(np.dot(unit_a, unit_b))
+
+        def fail(*args, **kwargs):
+            raise AssertionError("store embeddings are already unit-norm")
+
+        # Store vectors go straight to np.dot: no cosine, no re-normalization
+        monkeypatch.setattr(features, "cosine_similarity", fail)
+        monkeypatch.setattr(features, "_unit_rows", fail)
+
+        assert features.extract_features(a, b).embedding_similarity == pytest.approx(expected)
+        assert features.extract_features_matrix([a], [b])[0, 0, 0] == pytest.approx(expected)
+
+    def test_raw_embeddings_are_normalized(self, fake_embedding_backend):
+        from core import features
+
+        a, b = {"description": "x"}, {"description": "y"}
+        raw_a, raw_b = np.array([6.0, 8.0, 0.0]), np.array([0.0, 5.0, 0.0])
+
+        similarity = features.extract_features(a, b, raw_a, raw_b).embedding_similarity
+        matrix = features.extract_features_matrix([a], [b], [raw_a], [raw_b])
+
+        assert similarity == pytest.approx(0.8)
+        assert matrix[0, 0, 0] == pytest.approx(0.8, abs=1e-6)
+
+    def test_fallback_slots_are_distinct(self, fake_embedding_backend):
+        from core import features
+
+        first, second = features.compute_embeddings_batch(["", None])
+        first[0] = 1.0
+
+        assert not second.any()
@@ -0,0 +1,55 @@
+"""
+Tests for compiled NumPy inference of the CatBoost committee.
+"""
+
+import numpy as np
+import pytest
+
+from core.active_learning import CatBoostActiveLearner
+from core.fast_inference import CompiledCommittee
+
+
+def _training_set(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, 7))
+    X[:, 4:6] = X[:, 4:6] > 0.5
+    y = (X[:, 0] + 0.3 * X[:, 1] + rng.normal(0, 0.2, n) > 0.7).astype(int)
+    return X, y
+
+
+class TestCompiledCommittee:
+    """Test that compiled trees reproduce CatBoost's probabilities."""
+
+    @pytest.mark.parametrize("method", ["fit", "fit_with_early_stopping"])
+    def test_matches_catboost(self, method):
+        X, y = _training_set()
+        learner = CatBoostActiveLearner(fast_inference=False)
+        getattr(learner, method)(X, y)
+        compiled = CompiledCommittee.from_catboost(learner.committee)
+
+        # Random queries plus training rows (values sitting exactly on borders)
+        queries = np.vstack([_training_set(500, seed=1)[0], X[:50]])
+        expected = np.array([clf.predict_proba(queries)[:, 1] for clf in learner.committee])
+
+        np.testing.assert_allclose(compiled.member_probas(queries), expected, atol=1e-12)
+        np.testing.assert_allclose(
+            compiled.predict_proba(queries), learner.predict_proba(queries), atol=1e-12
+        )
+
+    def test_learner_uses_compiled_path(self):
+        X, y = _training_set()
+        fast = CatBoostActiveLearner()
+        slow = CatBoostActiveLearner(fast_inference=False)
+        fast.fit(X, y)
+        slow.fit(X, y)
+
+        assert fast._compiled is not None and slow._compiled is None
+        np.testing.assert_allclose(fast.predict_proba(X), slow.predict_proba(X), atol=1e-12)
+        np.testing.assert_allclose(fast.uncertainty(X), slow.uncertainty(X), atol=1e-12)
+
+    def test_single_row(self):
+        X, y = _training_set()
+        learner = CatBoostActiveLearner()
+        learner.fit(X, y)
+
+        assert learner.predict_proba(X[:1]).shape == (1, 2)
@@ -0,0 +1,118 @@
+"""
+Tests for LLMManager.generate_many batch generation.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from models.llm_manager import LLMManager, LLMResponse
+
+
+def _fake_provider(calls, fail_on=None, delay=0.02):
+    lock = threading.Lock()
+
+    def generate(prompt, model, system, temperature, max_tokens, json_mode):
+        with lock:
+            calls.append(prompt)
+        time.sleep(delay)
+        if prompt == fail_on:
+            raise RuntimeError("provider exploded")
+        return LLMResponse(text=f"echo:{prompt}", model=model, success=True)
+
+    return generate
+
+
+class TestGenerateMany:
+    """Test bounded-concurrency batch generation."""
+
+    def test_results_in_input_order(self, isolated_config, monkeypatch):
+        llm = LLMManager(provider="deepseek", quiet=True)
+        calls = []
+        monkeypatch.setattr(llm, "_deepseek_generate", _fake_provider(calls))
+
+        specs = [{"prompt": f"p{i}", "temperature": 0.0} for i in range(6)]
+        results = llm.generate_many(specs, max_concurrency=3)
+
+        assert [r.text for r in results] == [f"echo:p{i}" for i in range(6)]
+        assert sorted(calls) == sorted(f"p{i}" for i in range(6))
+
+    def test_failures_reported_per_item(self, isolated_config, monkeypatch):
+        llm = LLMManager(provider="deepseek", quiet=True)
+        calls = []
+        monkeypatch.setattr(llm, "_deepseek_generate", _fake_provider(calls, fail_on="bad"))
+
+        results = llm.generate_many([{"prompt": "ok"}, {"prompt": "bad"}, {}])
+
+        assert results[0].success is True
+        assert results[1].success is False and "provider exploded" in results[1].error
+        assert results[2].success is False
+
+    def test_cache_hits_skip_network(self, isolated_config, monkeypatch):
+        llm = LLMManager(provider="deepseek", quiet=True)
+        calls = []
+        monkeypatch.setattr(llm, "_deepseek_generate", _fake_provider(calls))
+
+        key = llm._generate_cache_key("deepseek", llm.fast_model, "cached", None, 0.0, False)
+        llm._save_to_cache(key, LLMResponse(text="from cache", model="m", success=True))
+
+        results = llm.generate_many(
+            [{"prompt": "cached", "temperature": 0.0}, {"prompt": "fresh", "temperature": 0.0}]
+        )
+
+        assert results[0].text == "from cache"
+        assert calls == ["fresh"]
+
+    def test_async_variant(self, isolated_config, monkeypatch):
+        llm = LLMManager(provider="deepseek", quiet=True)
+        active = 0
+        peak = 0
+
+        async def fake_async(prompt, model, system, temperature, max_tokens, json_mode):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return LLMResponse(text=prompt, model=model, success=True)
+
+        monkeypatch.setattr(llm, "_deepseek_generate_async", fake_async)
+
+        specs = [{"prompt": f"p{i}"} for i in range(8)]
+        results = asyncio.run(llm.generate_many_async(specs, max_concurrency=2))
+
+        assert [r.text for r in results] == [f"p{i}" for i in range(8)]
+        assert peak <= 2
+
+
+def test_scanner_context_goes_through_llm_manager(isolated_config, monkeypatch):
+    from core import exercise_scanner
+    from core.rate_limiter import RateLimitTracker
+
+    monkeypatch.setattr(isolated_config, "DEEPSEEK_API_KEY", "test-key")
+    calls = []
+    waits = []
+
+    def fake_deepseek(self, prompt, model, system, temperature, max_tokens, json_mode):
+        calls.append((prompt, system, max_tokens))
+        return LLMResponse(text='{"context_summary": "ctx"}', model=model, success=True)
+
+    monkeypatch.setattr(LLMManager, "_deepseek_generate", fake_deepseek)
+    wait = RateLimitTracker.wait_if_needed
+    monkeypatch.setattr(
+        RateLimitTracker,
+        "wait_if_needed",
+        lambda self, provider: waits.append(provider) or wait(self, provider),
+    )
+    parents = {"1": {"text": "parent text"}}
+    standalone = [{"exercise_number": "2", "text": "standalone text"}]
+
+    logger = logging.getLogger(__name__)
+
+    results = exercise_scanner._get_context_summaries(parents, standalone, logger)
+
+    assert results == {"1": "ctx", "2": "ctx"}
+    assert len(calls) == 2
+    assert all(system == exercise_scanner.CONTEXT_EXTRACTION_SYSTEM for _, system, _ in calls)
+    assert waits == ["deepseek", "deepseek"]  # Rate limited like any other call
@@ -0,0 +1,94 @@
+"""
+Tests for the pooled per-event-loop aiohttp sessions.
+"""
+
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+
+class FakeSession:
+    def __init__(self, connector=None):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_aiohttp(monkeypatch):
+    """Stand-in aiohttp module (sessions are only created and closed)."""
+    import models.llm_manager
+
+    module = SimpleNamespace(TCPConnector=lambda **kwargs: None, ClientSession=FakeSession)
+    monkeypatch.setitem(sys.modules, "aiohttp", module)
+    monkeypatch.setattr(models.llm_manager, "AIOHTTP_AVAILABLE", True)
+    return module
+
+
+class TestAiohttpSessions:
+    """Test that sessions are shared for a loop's lifetime and closed with it."""
+
+    def test_session_outlives_requests_until_loop_ends(self, fake_aiohttp, isolated_config):
+        from models.llm_manager import LLMManager
+
+        async def main():
+            sessions = []
+            for _ in range(2):
+                async with LLMManager(provider="deepseek", quiet=True) as llm:
+                    sessions.append(llm._session)
+            assert sessions[0] is sessions[1]
+            assert not sessions[0].closed  # Keep-alive between batches
+            return sessions[0]
+
+        assert asyncio.run(main()).closed  # Closed at loop shutdown
+
+    def test_close_async_clients_closes_now(self, fake_aiohttp):
+        from models.http_clients import close_async_clients, get_aiohttp_session
+
+        async def main():
+            session = get_aiohttp_session()
+            await close_async_clients()
+            assert session.closed
+            assert get_aiohttp_session() is not session
+
+        asyncio.run(main())
+
+    def test_each_loop_gets_its_own_session(self, fake_aiohttp, isolated_config):
+        from models.llm_manager import LLMManager
+
+        async def main(llm):
+            async with llm:
+                async with llm:  # Nested entries keep the session attached
+                    pass
+                session = llm._session
+                assert session is not None and not session.closed
+            assert llm._session is None
+            assert not session.closed  # Kept until the loop shuts down
+            return session
+
+        llm = LLMManager(provider="deepseek", quiet=True)
+        sessions = [asyncio.run(main(llm)) for _ in range(2)]
+
+        assert sessions[0] is not sessions[1]
+        assert all(session.closed for session in sessions)  # Nothing left open per loop
+
+    def test_generate_many_async_holds_session(self, fake_aiohttp, isolated_config, monkeypatch):
+        from models.llm_manager import LLMManager, LLMResponse
+
+        llm = LLMManager(provider="deepseek", quiet=True)
+        sessions = []
+
+        async def fake_async(prompt, model, system, temperature, max_tokens, json_mode):
+            sessions.append(llm._session)
+            return LLMResponse(text=prompt, model=model, success=True)
+
+        monkeypatch.setattr(llm, "_deepseek_generate_async", fake_async)
+
+        results = asyncio.run(llm.generate_many_async([{"prompt": "a"}, {"prompt": "b"}]))
+
+        assert [r.text for r in results] == ["a", "b"]
+        assert sessions[0] is sessions[1]
+        assert sessions[0].closed  # asyncio.run shut the loop down
@@ -0,0 +1,94 @@
+"""
+Property tests for the bit-parallel Levenshtein implementation.
+"""
+
+import random
+
+import pytest
+
+from core.features import levenshtein_distance, levenshtein_ratio
+
+
+def reference_distance(s1: str, s2: str) -> int:
+    """The original list-building DP (reference implementation)."""
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    distances = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        new_distances = [i + 1]
+        for j, c2 in enumerate(s2):
+            if c1 == c2:
+                new_distances.append(distances[j])
+            else:
+                new_distances.append(1 + min(distances[j], distances[j + 1], new_distances[-1]))
+        distances = new_distances
+    return distances[-1]
+
+
+def reference_ratio(s1: str, s2: str) -> float:
+    if not s1 and not s2:
+        return 1.0
+    if not s1 or not s2:
+        return 0.0
+    return 1 - (reference_distance(s1, s2) / max(len(s1), len(s2)))
+
+
+def random_pairs(n, alphabet, max_len, seed):
+    rng = random.Random(seed)
+    for _ in range(n):
+        a = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_len)))
+        if rng.random() < 0.5:
+            # Derive b from a by a few edits so that close pairs are common
+            b = list(a)
+            for _ in range(rng.randint(0, 4)):
+                op = rng.randint(0, 2)
+                pos = rng.randint(0, len(b))
+                if op == 0:
+                    b.insert(pos, rng.choice(alphabet))
+                elif b and op == 1:
+                    b[min(pos, len(b) - 1)] = rng.choice(alphabet)
+                elif b:
+                    del b[min(pos, len(b) - 1)]
+            b = "".join(b)
+        else:
+            b = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_len)))
+        yield a, b
+
+
+class TestLevenshtein:
+    """Compare against the reference DP on many random inputs."""
+
+    @pytest.mark.parametrize(
+        "alphabet,max_len",
+        [("ab", 12), ("abcdefghij_", 40), ("abcdefghijklmnopqrstuvwxyz_", 120), ("aàé€𝔸", 20)],
+    )
+    def test_distance_matches_reference(self, alphabet, max_len):
+        for a, b in random_pairs(300, alphabet, max_len, seed=len(alphabet)):
+            assert levenshtein_distance(a, b) == reference_distance(a, b), (a, b)
+
+    def test_ratio_matches_reference(self):
+        for a, b in random_pairs(300, "abcdefgh_", 30, seed=7):
+            assert levenshtein_ratio(a, b) == reference_ratio(a, b)
+
+    def test_symmetric(self):
+        for a, b in random_pairs(100, "abc_", 20, seed=3):
+            assert levenshtein_distance(a, b) == levenshtein_distance(b, a)
+
+    def test_bounded_distance(self):
+        for a, b in random_pairs(300, "abcde_", 30, seed=11):
+            exact = reference_distance(a, b)
+            for bound in (0, 1, 3, 8):
+                expected = exact if exact <= bound else bound + 1
+                assert levenshtein_distance(a, b, max_distance=bound) == expected
+
+    def test_min_ratio_keeps_values_above_threshold(self):
+        for a, b in random_pairs(300, "abcdefgh_", 30, seed=5):
+            exact = reference_ratio(a, b)
+            result = levenshtein_ratio(a, b, min_ratio=0.6)
+            assert result == exact or (result == 0.0 and exact < 0.6)
+
+    def test_known_values(self):
+        assert levenshtein_distance("kitten", "sitting") == 3
+        assert levenshtein_distance("", "abc") == 3
+        assert levenshtein_ratio("", "") == 1.0
+        assert levenshtein_ratio("velocity_calculation", "speed_calculation") == pytest.approx(0.6)
@@ -0,0 +1,253 @@
+"""
+Tests for the concurrent classify_items pipeline.
+"""
+
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+
+
+class FakeLLM:
+    """Deterministic answers derived from the prompt, with random latency."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        time.sleep(random.random() * 0.005)  # Shuffle completion order
+
+        item = re.search(r"^(?:Item|New item): (.*)$", prompt, re.M)
+        words = item.group(1).split() if item else []
+        if prompt.startswith("Assign this item") or prompt.startswith("What broad"):
+            listed = "- " + words[0].title() in prompt or "- " + words[0] in prompt
+            return _response({"category": words[0], "is_new": not listed})
+        if prompt.startswith("Classify this item"):
+            for number, description in re.findall(r"^(\d+)\. .* - (.*)$", prompt, re.M):
+                if description.split()[1] == words[1]:
+                    return _response({"group": int(number), "confidence": 0.9})
+            return _response({"group": "NEW", "confidence": 0.9})
+        # Pick the name / description: the longest option
+        options = re.findall(r"^(\d+)\. (.*)$", prompt, re.M)
+        return _response({"pick": int(max(options, key=lambda o: len(o[1]))[0])})
+
+
+def _response(data):
+    return SimpleNamespace(text=json.dumps(data))
+
+
+def _items(n, seed):
+    rng = random.Random(seed)
+    topics = ["kinematics", "optics", "circuits", "waves"]
+    skills = ["derive", "compute", "estimate", "sketch", "prove"]
+    return [
+        {
+            "id": f"ki-{i}",
+            "name": f"item_{i}" + "_x" * rng.randrange(3),
+            "description": f"{rng.choice(topics)} {rng.choice(skills)} case {i}",
+        }
+        for i in range(n)
+    ]
+
+
+def _summary(groups, assignments):
+    return (
+        [
+            (g["id"], g["name"], g["description"], g["category"], [i["id"] for i in g["items"]])
+            for g in groups
+        ],
+        assignments,
+    )
+
+
+class TestConcurrentClassifyItems:
+    """classify_items gives the same results at any concurrency."""
+
+    def _run(self, items, groups, max_concurrency):
+        from core.merger import classify_items
+
+        llm = FakeLLM()
+        result = classify_items(
+            [dict(item) for item in items], groups, llm, max_concurrency=max_concurrency
+        )
+        return _summary(*result), llm.prompts
+
+    def test_matches_sequential_without_categories(self):
+        items = _items(30, seed=1)
+
+        sequential, sequential_prompts = self._run(items, [], max_concurrency=1)
+        concurrent, concurrent_prompts = self._run(items, [], max_concurrency=8)
+
+        assert concurrent == sequential
+        # Stale speculative category prompts are discarded, never used
+        assert set(sequential_prompts) <= set(concurrent_prompts)
+
+    def test_matches_sequential_with_existing_categories(self):
+        items = _items(30, seed=2)
+        groups = [
+            {
+                "id": "g-optics",
+                "name": "optics_base",
+                "description": "optics compute base",
+                "category": "optics",
+                "items": [{"id": "g-optics", "name": "optics_base"}],
+            },
+            {
+                "id": "g-waves",
+                "name": "waves_base",
+                "description": "waves sketch base",
+                "category": "waves",
+                "items": [],
+            },
+        ]
+
+        sequential, sequential_prompts = self._run(items, groups, max_concurrency=1)
+        concurrent, concurrent_prompts = self._run(items, groups, max_concurrency=8)
+
+        assert concurrent == sequential
+        assert sorted(concurrent_prompts) == sorted(sequential_prompts)  # Nothing speculative
+
+    def test_active_classifier_runs_one_category_at_a_time(self):
+        import threading
+
+        from core.merger import classify_items
+
+        lock = threading.Lock()
+        running = []
+        overlaps = []
+
+        class SerialCheckingClassifier:
+            def classify(self, item, groups, llm_classify_fn):
+                with lock:
+                    running.append(item["id"])
+                    overlaps.append(len(running) > 1)
+                time.sleep(0.002)
+                with lock:
+                    running.remove(item["id"])
+                return SimpleNamespace(is_new=True, group_id=None, confidence=1.0)
+
+            def get_stats(self):
+                return {
+                    "llm_calls": 0,
+                    "predictions": 0,
+                    "transitive_inferences": 0,
+                    "llm_call_rate": 0.0,
+                }
+
+        items = [dict(item, category=item["description"].split()[0]) for item in _items(20, 3)]
+        groups = [
+            {"id": f"g-{c}", "name": c, "description": f"{c} base", "category": c, "items": []}
+            for c in ("kinematics", "optics", "circuits", "waves")
+        ]
+
+        classify_items(
+            items,
+            groups,
+            FakeLLM(),
+            active_classifier=SerialCheckingClassifier(),
+            max_candidates=0,
+            max_concurrency=8,
+        )
+
+        assert len(overlaps) == 20
+        assert not any(overlaps)
+
+
+class TestClassifyItemBatch:
+    """Test multi-item classification prompts."""
+
+    GROUPS = [
+        {"id": "g1", "name": "g1", "description": "kinematics derive base"},
+        {"id": "g2", "name": "g2", "description": "optics compute base"},
+    ]
+
+    def _llm(self, *answers):
+        prompts = []
+        answers = list(answers)
+
+        def generate(prompt, **kwargs):
+            prompts.append(prompt)
+            return _response(answers.pop(0))
+
+        return SimpleNamespace(generate=generate, prompts=prompts)
+
+    def test_parses_groups_new_and_same_as(self):
+        from core.merger import classify_item_batch
+
+        items = [{"name": f"i{n}", "description": f"item {n}"} for n in range(4)]
+        llm = self._llm(
+            {
+                "items": [
+                    {"item": 1, "group": 2, "confidence": 0.9},
+                    {"item": 2, "group": "NEW", "confidence": 0.8},
+                    {"item": 3, "same_as": 2, "confidence": 0.9},
+                    {"item": 4, "group": 1, "confidence": 0.4},  # Below threshold
+                ]
+            }
+        )
+
+        results = classify_item_batch(items, self.GROUPS, llm)
+
+        assert len(llm.prompts) == 1
+        assert "Item 4: item 3" in llm.prompts[0]
+        assert results == [
+            {"group_id": "g2", "is_new": False, "confidence": 0.9},
+            {"group_id": None, "is_new": True, "confidence": 0.8},
+            {"group_id": None, "is_new": False, "confidence": 0.9, "same_as": 1},
+            {"group_id": None, "is_new": True, "confidence": 0.4},
+        ]
+
+    def test_malformed_entries_are_none(self):
+        from core.merger import classify_item_batch
+
+        items = [{"name": f"i{n}", "description": f"item {n}"} for n in range(5)]
+        llm = self._llm(
+            {
+                "items": [
+                    {"item": 1, "group": 7, "confidence": 0.9},  # No such group
+                    {"item": 2, "same_as": 2, "confidence": 0.9},  # Not an earlier item
+                    {"item": 3, "group": "two", "confidence": 0.9},
+                    {"item": 4, "group": 1, "confidence": 1.5},
+                    {"item": 5, "group": 1, "confidence": 0.9},
+                    {"item": 5, "group": 2, "confidence": 0.9},  # Duplicate: first wins
+                ]
+            }
+        )
+
+        results = classify_item_batch(items, self.GROUPS, llm)
+
+        assert results[:4] == [None] * 4
+        assert results[4]["group_id"] == "g1"
+        assert classify_item_batch(items, self.GROUPS, self._llm({"oops": 1})) == [None] * 5
+
+    def test_classify_items_falls_back_per_item(self):
+        from core.merger import classify_items
+
+        items = [
+            {"id": f"ki-{n}", "name": f"i{n}", "description": f"item {n}", "category": "c"}
+            for n in range(3)
+        ]
+        groups = [dict(g, category="c", items=[]) for g in self.GROUPS]
+        llm = self._llm(
+            {
+                "items": [
+                    {"item": 1, "group": "NEW", "confidence": 0.9},
+                    {"item": 3, "same_as": 1, "confidence": 0.9},
+                ]
+            },
+            {"group": 2, "confidence": 0.9},  # Single-item retry for item 2
+            {"pick": 1},  # Canonical names and descriptions of changed groups
+            {"pick": 1},
+            {"pick": 1},
+            {"pick": 1},
+        )
+
+        _, assignments = classify_items(
+            items, groups, llm, max_candidates=0, max_concurrency=1, batch_size=8
+        )
+
+        assert llm.prompts[1].startswith("Classify this item")
+        assert "\n3. i0 - item 0" in llm.prompts[1]  # Retry sees item 1's new group
+        assert assignments == [("ki-1", "g2"), ("ki-2", "ki-0")]
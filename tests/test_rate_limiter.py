@@ -0,0 +1,222 @@
+"""
+Tests for the provider rate limit tracker.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from core.rate_limiter import RateLimitTracker, SharedRateLimitTracker, create_rate_limiter
+
+
+def _tracker(tmp_path, **limits):
+    return RateLimitTracker(limits, cache_path=tmp_path / "rate_limits.json")
+
+
+def _fill_window(tracker, provider, age):
+    """Fill provider's request window with entries that are `age` seconds old."""
+    window = tracker._get_or_create_window(provider)
+    rpm = tracker.limits[provider].requests_per_minute
+    for _ in range(rpm):
+        window.requests.append(time.time() - age)
+
+
+def _reserve_slots(db_path, attempts):
+    """Try to take `attempts` slots from a shared tracker (runs in a worker process)."""
+    tracker = SharedRateLimitTracker({"groq": {"requests_per_minute": 6}}, db_path=db_path)
+    return sum(1 for _ in range(attempts) if tracker._reserve("groq") <= 0)
+
+
+class TestAsyncAdmission:
+    """Test the non-blocking asyncio admission path."""
+
+    def test_no_wait_under_limit(self, tmp_path):
+        tracker = _tracker(tmp_path, groq={"requests_per_minute": 5})
+
+        waits = asyncio.run(tracker.wait_if_needed_async("groq"))
+
+        assert waits == 0.0
+        assert len(tracker.usage["groq"].requests) == 1  # Slot reserved
+
+    def test_does_not_block_event_loop(self, tmp_path):
+        tracker = _tracker(tmp_path, groq={"requests_per_minute": 1})
+        _fill_window(tracker, "groq", age=59.7)  # Frees up in ~0.4s
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def main():
+            return await asyncio.gather(tracker.wait_if_needed_async("groq"), ticker())
+
+        waited, _ = asyncio.run(main())
+
+        assert waited > 0.2
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.2  # Ticker kept running while limiter waited
+
+    def test_waiters_admitted_in_fifo_order(self, tmp_path):
+        tracker = _tracker(tmp_path, groq={"requests_per_minute": 2})
+        _fill_window(tracker, "groq", age=59.7)
+        order = []
+
+        async def waiter(n):
+            await tracker.wait_if_needed_async("groq")
+            order.append(n)
+
+        async def main():
+            tasks = []
+            for n in range(2):
+                tasks.append(asyncio.create_task(waiter(n)))
+                await asyncio.sleep(0)  # Enqueue in a known order
+            await asyncio.gather(*tasks)
+
+        asyncio.run(main())
+
+        assert order == [0, 1]
+        assert not tracker._async_waiters["groq"]
+
+    def test_providers_do_not_block_each_other(self, tmp_path):
+        tracker = _tracker(
+            tmp_path, groq={"requests_per_minute": 1}, deepseek={"requests_per_minute": 10}
+        )
+        _fill_window(tracker, "groq", age=59.7)
+
+        async def main():
+            groq = asyncio.create_task(tracker.wait_if_needed_async("groq"))
+            await asyncio.sleep(0)
+            start = time.monotonic()
+            await tracker.wait_if_needed_async("deepseek")
+            elapsed = time.monotonic() - start
+            await groq
+            return elapsed
+
+        assert asyncio.run(main()) < 0.1
+
+    def test_record_without_counting_reserved_slot(self, tmp_path):
+        tracker = _tracker(tmp_path, groq={"requests_per_minute": 5, "tokens_per_minute": 1000})
+
+        asyncio.run(tracker.wait_if_needed_async("groq"))
+        tracker.record_request("groq", tokens_used=100, count_request=False)
+
+        stats = tracker.get_usage_stats("groq")
+        assert stats["requests"]["used"] == 1
+        assert stats["tokens"]["used"] == 100
+
+
+class TestAccounting:
+    """Test running totals and debounced persistence."""
+
+    def test_token_total_follows_window(self, tmp_path):
+        tracker = _tracker(tmp_path, groq={"tokens_per_minute": 1000})
+        window = tracker._get_or_create_window("groq")
+        window.add_tokens(time.time() - 120, 700)  # Already outside the window
+        tracker.record_request("groq", tokens_used=200)
+
+        assert tracker.check_limit("groq")
+        assert window.token_total == 200
+
+        tracker.record_request("groq", tokens_used=800)
+        assert not tracker.check_limit("groq")
+        assert tracker.get_usage_stats("groq")["tokens"]["used"] == 1000
+
+    def test_state_is_flushed_lazily(self, tmp_path):
+        tracker = _tracker(tmp_path, groq={"requests_per_minute": 50})
+        for _ in range(20):
+            tracker.record_request("groq", tokens_used=10)
+
+        assert not tracker.cache_path.exists()  # Not written per request
+
+        tracker.flush()
+        restored = _tracker(tmp_path, groq={"requests_per_minute": 50})
+        assert len(restored.usage["groq"].requests) == 20
+        assert restored.usage["groq"].token_total == 200
+
+    def test_concurrent_flushes_leave_valid_file(self, tmp_path):
+        import json
+        import threading
+
+        tracker = _tracker(tmp_path, groq={"requests_per_minute": 5000})
+
+        def record_and_save():
+            for _ in range(50):
+                tracker.record_request("groq", tokens_used=1)
+                tracker._save_cache()
+
+        threads = [threading.Thread(target=record_and_save) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tracker.flush()
+
+        assert len(json.loads(tracker.cache_path.read_text())["groq"]["requests"]) == 200
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class TestSharedBackend:
+    """Test the SQLite backend shared across trackers and processes."""
+
+    def test_instances_share_one_budget(self, tmp_path):
+        limits = {"groq": {"requests_per_minute": 2, "tokens_per_minute": 500}}
+        a = SharedRateLimitTracker(limits, db_path=tmp_path / "rl.db")
+        b = SharedRateLimitTracker(limits, db_path=tmp_path / "rl.db")
+
+        assert a.wait_if_needed("groq") == 0.0
+        a.record_request("groq", tokens_used=300, count_request=False)
+        assert b.wait_if_needed("groq") == 0.0
+
+        assert not b.check_limit("groq")
+        stats = b.get_usage_stats("groq")
+        assert stats["requests"]["used"] == 2
+        assert stats["tokens"]["used"] == 300
+
+        b.reset("groq")
+        assert a.check_limit("groq")
+
+    def test_async_reserve_does_not_block_loop(self, tmp_path):
+        import sqlite3
+
+        db_path = tmp_path / "rl.db"
+        tracker = SharedRateLimitTracker({"groq": {"requests_per_minute": 6}}, db_path=db_path)
+        blocker = sqlite3.connect(str(db_path), isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")  # Another process holds the write lock
+
+        async def main():
+            ticks = 0
+            reserve = asyncio.create_task(tracker.wait_if_needed_async("groq"))
+            for _ in range(10):
+                await asyncio.sleep(0.02)
+                ticks += 1
+            assert not reserve.done()
+            blocker.execute("COMMIT")
+            await asyncio.wait_for(reserve, timeout=5)
+            return ticks
+
+        assert asyncio.run(main()) == 10
+        assert tracker.get_usage_stats("groq")["requests"]["used"] == 1
+        blocker.close()
+
+    def test_processes_never_exceed_budget(self, tmp_path):
+        db_path = tmp_path / "rl.db"
+        SharedRateLimitTracker({"groq": {"requests_per_minute": 6}}, db_path=db_path)
+
+        # Spawned workers: SQLite connections must not be inherited across fork
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=3, mp_context=spawn) as pool:
+            admitted = sum(pool.map(_reserve_slots, [db_path] * 3, [5] * 3))
+
+        assert admitted == 6
+
+    def test_factory_selects_backend(self, isolated_config):
+        limits = {"groq": {"requests_per_minute": 1}}
+
+        assert type(create_rate_limiter(limits, backend="local")) is RateLimitTracker
+        assert isinstance(create_rate_limiter(limits, backend="shared"), SharedRateLimitTracker)
+        with pytest.raises(ValueError):
+            create_rate_limiter(limits, backend="redis")
@@ -0,0 +1,187 @@
+"""
+Tests for the SQLite-backed LLM response cache.
+"""
+
+import json
+import threading
+import time
+
+from models.response_cache import MemoryCache, ResponseCache
+
+
+class TestResponseCache:
+    """Test the single-file response cache."""
+
+    def test_set_and_get(self, tmp_path):
+        cache = ResponseCache(tmp_path / "cache.db", ttl=60)
+        cache.set("k1", {"text": "hello", "success": True})
+
+        assert cache.get("k1") == {"text": "hello", "success": True}
+        assert cache.get("missing") is None
+
+    def test_expired_entry_is_miss(self, tmp_path):
+        cache = ResponseCache(tmp_path / "cache.db", ttl=60)
+        cache.set("old", {"text": "stale"}, created_at=time.time() - 120)
+
+        assert cache.get("old") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_purge_expired(self, tmp_path):
+        cache = ResponseCache(tmp_path / "cache.db", ttl=60)
+        cache.set("old", {"text": "stale"}, created_at=time.time() - 120)
+        cache.set("new", {"text": "fresh"})
+
+        assert cache.purge_expired() == 1
+        assert cache.get("new") is not None
+
+    def test_lru_eviction_respects_budget(self, tmp_path):
+        payload = {"text": "x" * 100}
+        entry_size = len(json.dumps(payload, separators=(",", ":")))
+        cache = ResponseCache(tmp_path / "cache.db", ttl=60, max_bytes=entry_size * 5)
+
+        for i in range(5):
+            cache.set(f"k{i}", payload)
+            time.sleep(0.001)
+
+        # Touch k0 so that k1 becomes least recently used
+        assert cache.get("k0") is not None
+        cache.set("k5", payload)
+
+        stats = cache.stats()
+        assert stats["bytes"] <= entry_size * 5
+        assert cache.get("k0") is not None
+        assert cache.get("k1") is None
+        assert cache.get("k5") is not None
+
+    def test_total_bytes_tracks_replacements(self, tmp_path):
+        cache = ResponseCache(tmp_path / "cache.db", ttl=60)
+        cache.set("k", {"text": "a" * 50})
+        cache.set("k", {"text": "b"})
+
+        stats = cache.stats()
+        assert stats["entries"] == 1
+        assert stats["bytes"] == len(json.dumps({"text": "b"}, separators=(",", ":")))
+
+    def test_concurrent_writers(self, tmp_path):
+        cache = ResponseCache(tmp_path / "cache.db", ttl=60)
+
+        def writer(n):
+            for i in range(50):
+                cache.set(f"{n}-{i}", {"text": str(i)})
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert cache.stats()["entries"] == 200
+
+    def test_migrates_legacy_json_files(self, tmp_path):
+        legacy_dir = tmp_path / "llm"
+        legacy_dir.mkdir()
+        (legacy_dir / "fresh.json").write_text(
+            json.dumps({"timestamp": time.time(), "text": "ok", "success": True})
+        )
+        (legacy_dir / "stale.json").write_text(
+            json.dumps({"timestamp": time.time() - 7200, "text": "old", "success": True})
+        )
+
+        cache = ResponseCache(tmp_path / "cache.db", ttl=3600, legacy_dir=legacy_dir)
+
+        assert cache.get("fresh") == {"text": "ok", "success": True}
+        assert cache.get("stale") is None
+        assert not legacy_dir.exists()
+
+
+class TestMemoryCache:
+    """Test the in-process L1 tier."""
+
+    def test_entry_budget_evicts_lru(self):
+        cache = MemoryCache(ttl=60, max_entries=2)
+        cache.set("a", {"text": "1"})
+        cache.set("b", {"text": "2"})
+        cache.get("a")
+        cache.set("c", {"text": "3"})
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    def test_byte_budget(self):
+        cache = MemoryCache(ttl=60, max_entries=100, max_bytes=100)
+        for i in range(10):
+            cache.set(str(i), {"text": "x" * 20})
+
+        assert cache.stats()["bytes"] <= 100
+        assert cache.get("9") is not None
+
+    def test_expired_entry_is_miss(self):
+        cache = MemoryCache(ttl=60)
+        cache.set("old", {"text": "stale"}, created_at=time.time() - 120)
+
+        assert cache.get("old") is None
+
+    def test_payloads_are_copied(self):
+        cache = MemoryCache(ttl=60)
+        payload = {"text": "x", "metadata": {"usage": 1}}
+        cache.set("k", payload)
+        payload["metadata"]["usage"] = 2
+
+        cache.get("k")["metadata"]["usage"] = 3
+
+        assert cache.get("k") == {"text": "x", "metadata": {"usage": 1}}
+
+
+class TestLLMManagerCacheTiers:
+    """Test that LLMManager serves repeats from memory and writes through to disk."""
+
+    def test_per_tier_hit_counters(self, isolated_config):
+        from models.llm_manager import LLMManager, LLMResponse
+
+        llm = LLMManager(provider="deepseek", quiet=True)
+        key = llm._generate_cache_key("deepseek", "m", "prompt", None, 0.0, True)
+        llm._save_to_cache(key, LLMResponse(text="{}", model="m", success=True))
+
+        assert llm._get_cached_response(key).text == "{}"
+
+        # Fresh memory tier: next hit must come from disk, then from memory
+        llm.memory_cache.clear()
+        assert llm._get_cached_response(key) is not None
+        assert llm._get_cached_response(key) is not None
+
+        stats = llm.get_cache_stats()
+        assert stats["memory_hits"] == 2
+        assert stats["disk_hits"] == 1
+        assert stats["hits"] == 3
+
+    def test_mutating_a_cached_response_keeps_the_cache(self, isolated_config):
+        from models.llm_manager import LLMManager, LLMResponse
+
+        llm = LLMManager(provider="deepseek", quiet=True)
+        key = llm._generate_cache_key("deepseek", "m", "prompt", None, 0.0, True)
+        llm._save_to_cache(key, LLMResponse(text="{}", model="m", success=True, metadata={}))
+
+        llm._get_cached_response(key).metadata["cached"] = True
+
+        assert llm._get_cached_response(key).metadata == {}
+
+    def test_hit_counters_are_thread_safe(self, isolated_config):
+        from models.llm_manager import LLMManager, LLMResponse
+
+        llm = LLMManager(provider="deepseek", quiet=True)
+        key = llm._generate_cache_key("deepseek", "m", "prompt", None, 0.0, True)
+        llm._save_to_cache(key, LLMResponse(text="{}", model="m", success=True))
+
+        def hit():
+            for _ in range(500):
+                llm._get_cached_response(key)
+
+        threads = [threading.Thread(target=hit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert llm.get_cache_stats()["memory_hits"] == 4000
+        assert llm.get_cache_stats()["hits"] == 4000
@@ -0,0 +1,166 @@
+"""
+Tests for background retraining with atomic committee swaps.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from core.active_learning import ActiveClassifier, CatBoostActiveLearner
+from core.features import PairFeatures
+
+
+def _records(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, 7))
+    y = (X[:, 0] > 0.5).astype(int)
+    return [{"features": row.tolist(), "label": int(label)} for row, label in zip(X, y)]
+
+
+def _record(classifier, i, is_match):
+    features = PairFeatures(0.9 if is_match else 0.4, 0.5, 0.5, 0.9, True, True, 0.5)
+    assert classifier.record_decision(
+        {"id": f"a{i}"}, {"id": f"b{i}"}, features, is_match, 0.95 if is_match else 0.05
+    )
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestAtomicSwap:
+    """Test that decide() keeps serving the old committee during a fit."""
+
+    def test_decide_does_not_wait_for_fit(self, monkeypatch):
+        classifier = ActiveClassifier()
+        classifier.load_training_data(_records(40))
+        old_learner = classifier.learner
+
+        started, release = threading.Event(), threading.Event()
+        original = CatBoostActiveLearner.fit_with_early_stopping
+
+        def slow_fit(self, X, y):
+            started.set()
+            release.wait(10)
+            original(self, X, y)
+
+        monkeypatch.setattr(CatBoostActiveLearner, "fit_with_early_stopping", slow_fit)
+        X, y, _ = classifier.training_snapshot()
+        fit = threading.Thread(
+            target=classifier.refit, args=(X, y), kwargs={"early_stopping": True}
+        )
+        fit.start()
+        started.wait(10)
+
+        features = PairFeatures(0.9, 0.5, 0.5, 0.9, True, True, 0.5)
+        begin = time.perf_counter()
+        with classifier._lock:  # Even with writers blocked, decide() proceeds
+            decision = classifier.decide({"id": "x"}, {"id": "y"}, features)
+        assert time.perf_counter() - begin < 1.0
+        assert decision[0] in ("match", "no_match", "uncertain")
+        assert classifier.learner is old_learner
+
+        release.set()
+        fit.join(10)
+        assert classifier.learner is not old_learner
+        assert classifier.learner.is_fitted
+
+    def test_older_fit_never_replaces_newer(self):
+        classifier = ActiveClassifier()
+        classifier.load_training_data(_records(40))
+        newest = classifier.learner
+
+        X, y = (np.array([r["features"] for r in _records(30)]), np.array([0, 1] * 15))
+        assert not classifier.refit(X, y)
+        assert classifier.learner is newest
+
+    def test_smaller_reload_replaces_committee(self):
+        classifier = ActiveClassifier()
+        classifier.load_training_data(_records(40))
+        stale = classifier.training_snapshot()
+        old_learner = classifier.learner
+
+        classifier.load_training_data(_records(25, seed=1))
+
+        assert classifier.learner is not old_learner
+        assert classifier.pending_records == 0
+        X, y, generation = stale  # A fit of the replaced data finishing late
+        assert not classifier.refit(X, y, generation=generation)
+
+    def test_triggered_retrain_runs_outside_lock(self, monkeypatch):
+        classifier = ActiveClassifier(min_training_samples=10)
+        for i in range(9):
+            _record(classifier, i, is_match=i % 2 == 0)
+        assert not classifier.learner.is_fitted
+
+        held = []
+        original = CatBoostActiveLearner.fit
+
+        def checking_fit(self, X, y):
+            held.append(classifier._lock.locked())
+            original(self, X, y)
+
+        monkeypatch.setattr(CatBoostActiveLearner, "fit", checking_fit)
+        features = PairFeatures(0.4, 0.5, 0.5, 0.9, True, True, 0.5)
+        classifier.record_decision(
+            {"id": "a9"}, {"id": "b9"}, features, False, 0.05, trigger_retrain=True
+        )
+
+        assert held == [False]
+        assert classifier.learner.is_fitted
+        assert classifier.pending_records == 0
+
+
+class TestRetrainScheduler:
+    """Test count and staleness triggers."""
+
+    def test_retrains_on_record_count(self):
+        classifier = ActiveClassifier(min_training_samples=10)
+        scheduler = classifier.start_background_retrain(
+            min_new_records=12, max_staleness=3600, poll_interval=0.01
+        )
+        try:
+            for i in range(11):
+                _record(classifier, i, is_match=i % 2 == 0)
+            time.sleep(0.1)
+            assert scheduler.retrains == 0
+
+            _record(classifier, 11, is_match=False)
+            _wait_for(lambda: scheduler.retrains == 1)
+            assert classifier.learner.is_fitted
+            assert classifier.pending_records == 0
+        finally:
+            classifier.stop_background_retrain(timeout=10)
+
+    def test_triggered_retrain_wakes_scheduler(self):
+        classifier = ActiveClassifier(min_training_samples=10)
+        scheduler = classifier.start_background_retrain(
+            min_new_records=1000, max_staleness=3600, poll_interval=0.01
+        )
+        try:
+            for i in range(9):
+                _record(classifier, i, is_match=i % 2 == 0)
+            features = PairFeatures(0.9, 0.5, 0.5, 0.9, True, True, 0.5)
+            classifier.record_decision(
+                {"id": "a9"}, {"id": "b9"}, features, True, 0.95, trigger_retrain=True
+            )
+            _wait_for(lambda: scheduler.retrains == 1)
+        finally:
+            classifier.stop_background_retrain(timeout=10)
+
+    def test_retrains_stale_records(self):
+        classifier = ActiveClassifier(min_training_samples=10)
+        scheduler = classifier.start_background_retrain(
+            min_new_records=1000, max_staleness=0.05, poll_interval=0.01
+        )
+        try:
+            for i in range(10):
+                _record(classifier, i, is_match=i % 2 == 0)
+            _wait_for(lambda: scheduler.retrains == 1)
+            assert scheduler.last_error is None
+        finally:
+            classifier.stop_background_retrain(timeout=10)
@@ -0,0 +1,193 @@
+"""
+Tests for single-flight coalescing of concurrent LLM requests.
+"""
+
+import asyncio
+import threading
+import time
+
+from models.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test per-key deduplication across threads and coroutines."""
+
+    def test_threads_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+        barrier = threading.Barrier(5)
+        results = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.05)
+            return "done"
+
+        def caller():
+            barrier.wait()
+            results.append(flight.do("key", work))
+
+        threads = [threading.Thread(target=caller) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert [r for r, _ in results] == ["done"] * 5
+        assert sum(shared for _, shared in results) == 4
+        assert flight.coalesced == 4
+        assert flight.in_flight() == 0
+
+    def test_different_keys_do_not_coalesce(self):
+        flight = SingleFlight()
+
+        assert flight.do("a", lambda: 1) == (1, False)
+        assert flight.do("b", lambda: 2) == (2, False)
+        assert flight.coalesced == 0
+
+    def test_coroutines_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def main():
+            return await asyncio.gather(*(flight.do_async("key", work) for _ in range(4)))
+
+        results = asyncio.run(main())
+
+        assert len(calls) == 1
+        assert [r for r, _ in results] == ["done"] * 4
+        assert flight.coalesced == 3
+
+    def test_leader_exception_propagates_to_waiters(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def failing():
+            started.set()
+            time.sleep(0.05)
+            raise RuntimeError("boom")
+
+        def caller(fn):
+            try:
+                flight.do("key", fn)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        leader = threading.Thread(target=caller, args=(failing,))
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=caller, args=(lambda: "unused",))
+        follower.start()
+        leader.join()
+        follower.join()
+
+        assert errors == ["boom", "boom"]
+
+    def test_cancelled_leader_hands_over_to_waiter(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def main():
+            leader = asyncio.create_task(flight.do_async("key", work))
+            await asyncio.sleep(0)
+            followers = [asyncio.create_task(flight.do_async("key", work)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            results = await asyncio.gather(*followers)
+            return leader, results
+
+        leader, results = asyncio.run(main())
+
+        assert leader.cancelled()
+        assert len(calls) == 2  # One waiter became the new leader
+        assert sorted(results) == [("done", False), ("done", True)]
+        assert flight.coalesced == 1
+        assert flight.in_flight() == 0
+
+    def test_cancelled_waiter_leaves_call_running(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def main():
+            leader = asyncio.create_task(flight.do_async("key", work))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(flight.do_async("key", work))
+            await asyncio.sleep(0.01)
+            follower.cancel()
+            return await leader, follower
+
+        result, follower = asyncio.run(main())
+
+        assert result == ("done", False)
+        assert follower.cancelled()
+
+
+def test_llm_manager_coalesces_identical_prompts(isolated_config, monkeypatch):
+    from models.llm_manager import LLMManager, LLMResponse
+
+    llm = LLMManager(provider="deepseek", quiet=True)
+    calls = []
+
+    def fake_deepseek(prompt, model, system, temperature, max_tokens, json_mode):
+        calls.append(prompt)
+        time.sleep(0.05)
+        return LLMResponse(text="{}", model=model, success=True)
+
+    monkeypatch.setattr(llm, "_deepseek_generate", fake_deepseek)
+    barrier = threading.Barrier(3)
+
+    def caller():
+        barrier.wait()
+        llm.generate("same prompt", temperature=0.0, json_mode=True)
+
+    threads = [threading.Thread(target=caller) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert llm.get_cache_stats()["coalesced"] == 2
+
+
+def test_llm_manager_keys_on_max_tokens(isolated_config, monkeypatch):
+    from models.llm_manager import LLMManager, LLMResponse
+
+    llm = LLMManager(provider="deepseek", quiet=True)
+    calls = []
+
+    def fake_deepseek(prompt, model, system, temperature, max_tokens, json_mode):
+        calls.append(max_tokens)
+        time.sleep(0.05)
+        return LLMResponse(text="{}", model=model, success=True)
+
+    monkeypatch.setattr(llm, "_deepseek_generate", fake_deepseek)
+    barrier = threading.Barrier(2)
+
+    def caller(max_tokens):
+        barrier.wait()
+        llm.generate("same prompt", temperature=0.0, max_tokens=max_tokens)
+
+    threads = [threading.Thread(target=caller, args=(n,)) for n in (16, 512)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(calls) == [16, 512]  # A short response is not shared with a longer call
+    assert llm.get_cache_stats()["coalesced"] == 0
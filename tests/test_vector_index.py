@@ -0,0 +1,171 @@
+"""
+Tests for the candidate vector index used by the merger.
+"""
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.vector_index import CandidateIndex, VectorIndex
+
+
+def _clustered(n, dim=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    return centers[rng.integers(clusters, size=n)] + 0.3 * rng.standard_normal((n, dim))
+
+
+class TestVectorIndex:
+    """Test exact and IVF search, upserts and removals."""
+
+    def test_exact_search_before_training(self):
+        data = _clustered(50)
+        index = VectorIndex(min_train_size=1000)
+        for i, v in enumerate(data):
+            index.add(i, v)
+
+        hits = index.search(data[7], k=3)
+        assert hits[0][0] == 7
+        assert hits[0][1] > hits[1][1] >= hits[2][1]
+
+    def test_ivf_recall(self):
+        data = _clustered(2000)
+        index = VectorIndex(min_train_size=500, nprobe=8)
+        for i, v in enumerate(data):
+            index.add(i, v)
+
+        unit = data / np.linalg.norm(data, axis=1, keepdims=True)
+        queries = data[:50] + 0.1 * np.random.default_rng(1).standard_normal(data[:50].shape)
+        recall = []
+        for q in queries:
+            exact = set(np.argsort(-(unit @ (q / np.linalg.norm(q))))[:10])
+            found = {key for key, _ in index.search(q, k=10)}
+            recall.append(len(exact & found) / 10)
+
+        assert index._centroids is not None
+        assert np.mean(recall) > 0.9
+
+    def test_update_and_remove(self):
+        data = _clustered(600)
+        index = VectorIndex(min_train_size=500)
+        for i, v in enumerate(data):
+            index.add(i, v)
+
+        index.add(3, data[42])  # Re-embedded description
+        assert {key for key, _ in index.search(data[42], k=2)} == {3, 42}
+
+        index.remove(42)
+        assert 42 not in index
+        assert all(key != 42 for key, _ in index.search(data[42], k=5))
+        assert len(index) == 599
+
+        index.add("new", data[100])  # Incremental insert after training
+        assert {key for key, _ in index.search(data[100], k=2)} == {"new", 100}
+
+
+def _embed(texts):
+    """Deterministic bag-of-letters embedding."""
+    out = []
+    for t in texts:
+        v = np.zeros(26)
+        for ch in t.lower():
+            if "a" <= ch <= "z":
+                v[ord(ch) - 97] += 1
+        out.append(v)
+    return out
+
+
+class TestCandidateIndex:
+    """Test syncing group descriptions into per-category indexes."""
+
+    def test_reembeds_changed_descriptions(self):
+        calls = []
+
+        def embed(texts):
+            calls.append(list(texts))
+            return _embed(texts)
+
+        index = CandidateIndex(embed_fn=embed)
+        groups = [
+            {"id": 1, "description": "aaaa", "category": "c"},
+            {"id": 2, "description": "bbbb", "category": "c"},
+            {"id": 3, "description": "cccc", "category": "c"},
+        ]
+        index.sync(groups)
+        index.sync(groups)
+        assert calls == [["aaaa", "bbbb", "cccc"]]
+
+        groups[2]["description"] = "aaab"
+        index.sync(groups)
+        assert calls[-1] == ["aaab"]
+
+        picked = index.candidates({"description": "aaaa"}, groups, k=2)
+        assert [g["id"] for g in picked] == [1, 3]
+
+    def test_zero_embeddings_keep_every_group(self):
+        groups = [{"id": i, "description": f"d{i}", "category": "c"} for i in range(5)]
+
+        index = CandidateIndex(embed_fn=lambda texts: [np.zeros(4) for _ in texts])
+        assert index.candidates({"description": "d4"}, groups, k=2) == groups
+
+        def embed(texts):  # Groups embedded, query failed
+            return [np.zeros(4) if t == "query" else np.ones(4) for t in texts]
+
+        index = CandidateIndex(embed_fn=embed)
+        assert index.candidates({"description": "query"}, groups, k=2) == groups
+
+
+class TestMergerCandidates:
+    """Test that classify_items only prompts with top-k candidate groups."""
+
+    def test_prompt_lists_only_candidates(self):
+        from core.merger import classify_items
+
+        prompts = []
+
+        def generate(prompt, **kwargs):
+            prompts.append(prompt)
+            return SimpleNamespace(text=json.dumps({"group": 1, "confidence": 0.9}))
+
+        llm = SimpleNamespace(generate=generate)
+        words = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"]
+        groups = [
+            {"id": i, "name": f"g{i}", "description": w * 3, "category": "c", "items": []}
+            for i, w in enumerate(words)
+        ]
+        item = {"id": 100, "name": "x", "description": "deltadelta", "category": "c"}
+
+        _, assignments = classify_items(
+            [item], groups, llm, max_candidates=3, candidate_index=CandidateIndex(embed_fn=_embed)
+        )
+
+        assert "\n3. " in prompts[0]
+        assert "\n4. " not in prompts[0]
+        assert assignments == [(100, 3)]  # "delta" group ranked first
+
+    def test_internal_index_is_not_resynced(self, monkeypatch):
+        from core import merger
+
+        synced = []
+
+        class RecordingIndex(CandidateIndex):
+            def sync(self, groups):
+                synced.append([g["id"] for g in groups])
+                super().sync(groups)
+
+        monkeypatch.setattr(merger, "CandidateIndex", lambda: RecordingIndex(embed_fn=_embed))
+        llm = SimpleNamespace(
+            generate=lambda prompt, **kwargs: SimpleNamespace(
+                text=json.dumps({"group": 1, "confidence": 0.9, "pick": 1})
+            )
+        )
+        groups = [
+            {"id": i, "name": f"g{i}", "description": "ab" * (i + 1), "category": "c", "items": []}
+            for i in range(4)
+        ]
+        item = {"id": 100, "name": "x", "description": "abab", "category": "c"}
+
+        merger.classify_items([item], groups, llm, max_candidates=2)
+
+        assert len(synced) == 1  # Built for candidate lookup only, not re-synced at the end